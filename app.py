@@ -3,12 +3,12 @@ TTS Guard — Main Entry Point
 Welcome page with branding, key stats, guided tour, and sidebar configuration.
 """
 
-import streamlit as st
 import os
+
+import streamlit as st
 from datetime import date
-from database import init_db, reset_db, has_data, get_active_contracts_count, get_all_clients, get_all_buildings, get_financial_summary
-from seed_data import seed
-from theme import get_colors, inject_css, is_dark_mode
+from database import bootstrap, reset_db, get_active_contracts_count, get_all_clients, get_all_buildings, get_financial_summary
+from theme import get_colors, inject_css, is_dark_mode, logo_src
 
 # ---------------------------------------------------------------------------
 # PAGE CONFIG
@@ -30,18 +30,27 @@ dark = is_dark_mode()
 c = get_colors()
 inject_css()
 
+# ---------------------------------------------------------------------------
+# DIAGNOSTICS (hidden view: ?view=diagnostics, only with TTS_DIAGNOSTICS=1)
+# ---------------------------------------------------------------------------
+# Off by default: the view shows SQL text and can turn profiling on for
+# every session, so it is not left open to anyone who knows the URL
+DIAGNOSTICS_ENABLED = os.environ.get("TTS_DIAGNOSTICS", "") not in ("", "0")
+
+if DIAGNOSTICS_ENABLED and st.query_params.get("view") == "diagnostics":
+    from diagnostics import render_diagnostics
+    render_diagnostics()
+    st.stop()
+
 # ---------------------------------------------------------------------------
 # DATABASE INIT
 # ---------------------------------------------------------------------------
-init_db()
-if not has_data():
-    seed()
+# Schema and seed check run once per server process, not on every rerun
+bootstrap()
 
 # ---------------------------------------------------------------------------
 # SIDEBAR
 # ---------------------------------------------------------------------------
-LOGO_PATH = os.path.join(os.path.dirname(__file__), "assets", "logo.png")
-
 with st.sidebar:
     # Theme toggle
     theme_col1, theme_col2 = st.columns([3, 1])
@@ -57,14 +66,12 @@ with st.sidebar:
 
     # Logo
     logo_bg = "#012f5d"
-    if os.path.exists(LOGO_PATH):
-        import base64
-        with open(LOGO_PATH, "rb") as f:
-            logo_b64 = base64.b64encode(f.read()).decode()
+    logo = logo_src()
+    if logo is not None:
         st.markdown(
             f'<div style="background-color: {logo_bg}; padding: 16px 20px; '
             f'border-radius: 10px; text-align: center; margin-bottom: 8px;">'
-            f'<img src="data:image/png;base64,{logo_b64}" width="180" />'
+            f'<img src="{logo}" width="180" />'
             f'</div>',
             unsafe_allow_html=True,
         )
@@ -112,6 +119,7 @@ with st.sidebar:
         col1, col2 = st.columns(2)
         with col1:
             if st.button("✅ Confirm", use_container_width=True):
+                from seed_data import seed
                 reset_db()
                 seed()
                 st.session_state.reset_confirm = False
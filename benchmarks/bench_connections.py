@@ -0,0 +1,101 @@
+"""
+TTS Guard — Connection Benchmark
+Per-call latency of the Dashboard's query set with a fresh sqlite3
+connection per call (the old get_connection) versus the pooled connection.
+
+Run from the repository root:
+    python -m benchmarks.bench_connections [--iterations 200]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+import database
+from seed_data import seed
+
+# The queries the Dashboard page issues on every rerun
+DASHBOARD_QUERIES = [
+    ("get_active_contracts_count", lambda: database.get_active_contracts_count()),
+    ("get_overdue_inspections", lambda: database.get_overdue_inspections()),
+    ("get_upcoming_inspections", lambda: database.get_upcoming_inspections(14)),
+    ("get_completed_this_month", lambda: database.get_completed_this_month()),
+    ("get_financial_summary", lambda: database.get_financial_summary()),
+    ("get_recent_complaints", lambda: database.get_recent_complaints(5)),
+    ("get_client_summary", lambda: database.get_client_summary()),
+]
+
+
+@contextmanager
+def _per_call_connection():
+    """The pre-pool behaviour: connect, set foreign_keys, close."""
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _time_queries(iterations):
+    """Return {query name: [seconds per call]} over N Dashboard reruns."""
+    timings = {name: [] for name, _ in DASHBOARD_QUERIES}
+    for _ in range(iterations):
+        for name, fn in DASHBOARD_QUERIES:
+            start = time.perf_counter()
+            fn()
+            timings[name].append(time.perf_counter() - start)
+    return timings
+
+
+def run(iterations=200):
+    """Benchmark both connection strategies and return the results."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="tts_bench_"), "bench.db")
+    database.configure(path=db_path)
+    database.init_db()
+    if not database.has_data():
+        seed()
+    # Measure the queries themselves, not result-cache hits
+    database.query_cache.enabled = False
+
+    pooled_connection = database.connection
+    results = {}
+    try:
+        database.connection = _per_call_connection
+        _time_queries(5)  # warm the OS page cache
+        results["per-call"] = _time_queries(iterations)
+    finally:
+        database.connection = pooled_connection
+
+    _time_queries(5)
+    results["pooled"] = _time_queries(iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    before, after = results["per-call"], results["pooled"]
+
+    print(f"{'query':<30}{'per-call ms':>14}{'pooled ms':>12}{'speedup':>10}")
+    total_before = total_after = 0.0
+    for name, _ in DASHBOARD_QUERIES:
+        b = statistics.median(before[name]) * 1000
+        a = statistics.median(after[name]) * 1000
+        total_before += b
+        total_after += a
+        print(f"{name:<30}{b:>14.3f}{a:>12.3f}{b / a:>9.1f}x")
+    print(f"{'Dashboard rerun (sum)':<30}{total_before:>14.3f}{total_after:>12.3f}"
+          f"{total_before / total_after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
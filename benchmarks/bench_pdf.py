@@ -0,0 +1,87 @@
+"""
+TTS Guard — PDF Rendering Benchmark
+Pages per second for inspection reports of increasing size, writing the
+equipment table with one cell() call per column (add_table_row) versus
+the batched row writer (add_table_rows).
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf [--repeat 5]
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+import pdf_report
+
+SIZES = [10, 500, 5000]
+_PAGE_RE = re.compile(rb"/Type /Page\b")
+
+
+def _equipment(n):
+    return [
+        {"type": f"Smoke Detector (Zone {i % 9})", "status": "Failed" if i % 7 == 0 else "Passed"}
+        for i in range(n)
+    ]
+
+
+def _render(details, per_cell):
+    """Render one report; per_cell switches the table back to add_table_row."""
+    original = pdf_report.InspectionReport.add_table_rows
+    if per_cell:
+        def add_table_rows(self, rows, widths):
+            for idx, values in enumerate(rows):
+                self.add_table_row(values, widths, fill=(idx % 2 == 0))
+        pdf_report.InspectionReport.add_table_rows = add_table_rows
+    try:
+        return pdf_report.generate_inspection_pdf(
+            building_name="Benchmark Tower",
+            client_name="Benchmark Client",
+            inspection_date="2026-01-15",
+            technician="Bench",
+            items_checked=len(details),
+            items_passed=len(details),
+            items_failed=0,
+            equipment_details=details,
+            notes="Benchmark run.",
+            report_date="2026-01-15",
+        )
+    finally:
+        pdf_report.InspectionReport.add_table_rows = original
+
+
+def run(repeat=5):
+    """Return {size: {mode: (pages, median seconds)}}."""
+    results = {}
+    for size in SIZES:
+        details = _equipment(size)
+        results[size] = {}
+        for mode, per_cell in (("per-cell", True), ("batched", False)):
+            pdf = _render(details, per_cell)  # warm up: logo, templates
+            pages = len(_PAGE_RE.findall(pdf))
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                _render(details, per_cell)
+                timings.append(time.perf_counter() - start)
+            results[size][mode] = (pages, statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'items':>6}{'pages':>7}{'per-cell pg/s':>16}{'batched pg/s':>15}{'speedup':>10}")
+    for size, modes in results.items():
+        pages, before = modes["per-cell"]
+        _, after = modes["batched"]
+        print(f"{size:>6}{pages:>7}{pages / before:>16.1f}{pages / after:>15.1f}"
+              f"{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
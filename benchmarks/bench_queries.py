@@ -0,0 +1,388 @@
+"""
+TTS Guard — Query Benchmark
+Latency of every database.py read function against generated data sets of
+increasing size (synthetic_data.SCALES): p50/p95, rows returned and the
+EXPLAIN QUERY PLAN of each statement the function runs.
+
+warm: the pooled connection has already run the query, so its page
+cache is hot. cold: each call gets a freshly opened connection pool. The
+operating system's file cache is not dropped in either mode, and the
+result cache is disabled throughout.
+
+Results are written as JSON. With --baseline, a query whose p95 grew by
+more than --max-ratio fails the run, as does one over a --budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_queries [--scales small,medium] [--modes warm,cold]
+        [--iterations 20] [--out results.json]
+        [--baseline previous.json] [--max-ratio 1.5] [--budget get_client_summary=50]
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import database
+import synthetic_data
+
+DATA_DIR = os.path.join(tempfile.gettempdir(), "tts_guard_bench")
+SEED = 42
+# Per-item results are kept for recent inspections only, as in production
+ITEM_MONTHS = 3
+MODES = ("warm", "cold")
+# Differences below this are timer noise, never a regression
+MIN_DELTA_MS = 1.0
+
+# name -> function(ctx) returning the call's keyword arguments.
+# ctx holds representative ids looked up in the generated data.
+QUERIES = {
+    "get_all_clients": lambda ctx: {},
+    "get_client_by_id": lambda ctx: {"client_id": ctx["client_id"]},
+    "get_client_summary": lambda ctx: {},
+    "get_all_buildings": lambda ctx: {},
+    "get_buildings_by_client": lambda ctx: {"client_id": ctx["client_id"]},
+    "get_all_client_buildings": lambda ctx: {},
+    "get_building_details": lambda ctx: {"building_id": ctx["building_id"]},
+    "get_overdue_inspections": lambda ctx: {},
+    "get_upcoming_inspections": lambda ctx: {"days": 14},
+    "get_completed_this_month": lambda ctx: {},
+    "get_recent_inspections": lambda ctx: {"days": 30},
+    "get_inspections_page": lambda ctx: {},
+    "get_inspections_by_month": lambda ctx: {"year": ctx["year"], "month": ctx["month"]},
+    "get_inspection_items": lambda ctx: {"inspection_id": ctx["inspection_id"]},
+    "get_items_for_inspections": lambda ctx: {"inspection_ids": ctx["inspection_ids"]},
+    "get_equipment_history": lambda ctx: {"equipment_id": ctx["equipment_id"]},
+    "get_failure_rate_by_equipment": lambda ctx: {"building_id": ctx["building_id"]},
+    "get_failure_rate_by_type": lambda ctx: {},
+    "get_failure_rate_by_building": lambda ctx: {},
+    "get_status_engine": lambda ctx: {},
+    "get_equipment_by_building": lambda ctx: {"building_id": ctx["building_id"]},
+    "get_equipment_for_buildings": lambda ctx: {"building_ids": ctx["building_ids"]},
+    "get_equipment_grouped_by_type": lambda ctx: {"building_id": ctx["building_id"]},
+    "get_all_complaints": lambda ctx: {},
+    "get_recent_complaints": lambda ctx: {"limit": 5},
+    "get_complaints_page": lambda ctx: {},
+    "get_complaints_by_month": lambda ctx: {"year": ctx["year"], "month": ctx["month"]},
+    "get_month_rollup": lambda ctx: {"year": ctx["year"], "month": ctx["month"]},
+    "get_month_rollup_by_client": lambda ctx: {"year": ctx["year"], "month": ctx["month"]},
+    "get_monthly_trend": lambda ctx: {"months": 24},
+    "get_compliance_trend": lambda ctx: {"days": 90},
+    "get_active_contracts_count": lambda ctx: {},
+    "get_contract_by_building": lambda ctx: {"building_id": ctx["building_id"]},
+    "get_scheduled_inspections": lambda ctx: {},
+    "is_building_scheduled": lambda ctx: {"building_id": ctx["building_id"]},
+    "get_financial_summary": lambda ctx: {},
+    "get_client_financial_breakdown": lambda ctx: {},
+    "get_payment_history": lambda ctx: {"limit": 20},
+    "get_payments_page": lambda ctx: {},
+    "get_monthly_revenue": lambda ctx: {"months": 6},
+    "get_outstanding_invoices": lambda ctx: {},
+    "get_client_financial_detail": lambda ctx: {"client_id": ctx["client_id"]},
+    "get_all_client_financials": lambda ctx: {},
+    "get_dashboard_snapshot": lambda ctx: {},
+}
+
+
+def read_functions():
+    """Names of the public read functions in database.py."""
+    return sorted(
+        name for name in dir(database)
+        if name.startswith(("get_", "is_")) and name != "get_cache_stats"
+        and callable(getattr(database, name))
+    )
+
+
+# ---------------------------------------------------------------------------
+# DATA SETS
+# ---------------------------------------------------------------------------
+
+def prepare(scale, data_dir=DATA_DIR, seed=SEED):
+    """
+    Return the path of a generated database for scale, building it if needed.
+
+    Status queries are relative to today, so a file is only reused on the
+    day it was generated.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"{scale}-seed{seed}-{date.today().isoformat()}.db")
+    if not os.path.exists(path):
+        building = path + ".building"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(building + suffix):
+                os.remove(building + suffix)
+        print(f"Generating {scale} data set...", flush=True)
+        database.configure(path=building)
+        counts = synthetic_data.generate(*synthetic_data.SCALES[scale], seed=seed,
+                                         item_months=ITEM_MONTHS)
+        database.record_compliance_snapshots(90)  # history for get_compliance_trend
+        database.configure()  # closing the last connection checkpoints the WAL
+        os.replace(building, path)
+        print(f"  {counts['equipment']:,} equipment, {counts['inspections']:,} inspections "
+              f"in {counts['seconds']:.1f}s", flush=True)
+    return path
+
+
+def _context():
+    """Representative ids: the most recent inspection's building and client, last month."""
+    today = date.today()
+    year, month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    with database.connection() as conn:
+        latest = conn.execute("""
+            SELECT i.id, i.building_id, b.client_id
+            FROM inspections i JOIN buildings b ON b.id = i.building_id
+            ORDER BY i.inspection_date DESC, i.id DESC LIMIT 1
+        """).fetchone()
+        equipment_id = conn.execute(
+            "SELECT MIN(id) FROM equipment WHERE building_id = ?", (latest["building_id"],)
+        ).fetchone()[0]
+        month_rows = conn.execute("""
+            SELECT id, building_id FROM inspections
+            WHERE inspection_date >= ? AND inspection_date < date(?, '+1 month')
+            ORDER BY id LIMIT 200
+        """, (f"{year}-{month:02d}-01", f"{year}-{month:02d}-01")).fetchall()
+    return {
+        "client_id": latest["client_id"],
+        "building_id": latest["building_id"],
+        "inspection_id": latest["id"],
+        "equipment_id": equipment_id,
+        "year": year,
+        "month": month,
+        "inspection_ids": [row["id"] for row in month_rows],
+        "building_ids": sorted({row["building_id"] for row in month_rows}),
+    }
+
+
+# ---------------------------------------------------------------------------
+# MEASUREMENT
+# ---------------------------------------------------------------------------
+
+def _row_count(result):
+    if isinstance(result, database.Page):
+        return len(result.rows)
+    if isinstance(result, database.DashboardSnapshot):
+        return (len(result.overdue) + len(result.upcoming) + len(result.client_summary)
+                + len(result.compliance_trend))
+    if result is None:
+        return 0
+    if isinstance(result, (dict, bool, int, float, sqlite3.Row)):
+        return 1
+    return len(result)
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _query_plans(fn, kwargs):
+    """Run fn once, recording each SELECT it issues, and return their plans."""
+    statements = []
+    with database.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            fn(**kwargs)
+        finally:
+            conn.set_trace_callback(None)
+        plans, seen = [], set()
+        for sql in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "WITH")) or sql in seen:
+                continue
+            seen.add(sql)
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            depth = {0: -1}
+            lines = []
+            for node_id, parent, _, detail in rows:
+                depth[node_id] = depth.get(parent, -1) + 1
+                lines.append("  " * depth[node_id] + detail)
+            plans.append({"sql": " ".join(sql.split()), "plan": lines})
+    return plans
+
+
+def _time_calls(fn, kwargs, mode, iterations, path):
+    timings = []
+    for _ in range(iterations):
+        if mode == "cold":
+            database.configure(path=path)
+            with database.connection():
+                pass  # schema check on first use, not part of the query
+        # As timeit does: a collection pause is not the query's cost
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn(**kwargs)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return timings
+
+
+def run(scales, modes=MODES, iterations=20, data_dir=DATA_DIR, seed=SEED, queries=None):
+    """Benchmark every query at each scale and return the JSON-ready report."""
+    names = queries or list(QUERIES)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": seed,
+        "iterations": iterations,
+        "uncovered": [name for name in read_functions() if name not in QUERIES],
+        "scales": {},
+    }
+    # Measure the queries themselves, not result-cache hits
+    database.query_cache.enabled = False
+    for scale in scales:
+        path = prepare(scale, data_dir, seed)
+        database.configure(path=path)
+        ctx = _context()
+        results = {}
+        for name in names:
+            fn = getattr(database, name)
+            kwargs = QUERIES[name](ctx)
+            result = fn(**kwargs)  # also warms the page cache
+            entry = {"rows": _row_count(result), "plans": _query_plans(fn, kwargs)}
+            for mode in modes:
+                timings = _time_calls(fn, kwargs, mode, iterations, path)
+                if mode == "cold":
+                    database.configure(path=path)
+                entry[mode] = {
+                    "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+                    "p95_ms": round(_percentile(timings, 95) * 1000, 3),
+                    "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+                }
+            results[name] = entry
+        counts = {}
+        with database.connection() as conn:
+            for table in ("buildings", "equipment", "inspections", "inspection_items",
+                          "payments", "complaints"):
+                counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        report["scales"][scale] = {"tables": counts, "queries": results}
+    database.configure()
+    database.query_cache.enabled = True
+    return report
+
+
+# ---------------------------------------------------------------------------
+# THRESHOLDS
+# ---------------------------------------------------------------------------
+
+def check(report, baseline=None, max_ratio=1.5, budgets=None, min_delta_ms=MIN_DELTA_MS):
+    """
+    Return a list of failure messages.
+
+    A query fails if its p95 exceeds max_ratio times the baseline p95 (and
+    by more than min_delta_ms) at the same scale and mode, or if its p95 is
+    over its budget in ms. budgets maps query name, or "*" for any query,
+    to milliseconds.
+    """
+    failures = []
+    budgets = budgets or {}
+    for scale, data in report["scales"].items():
+        for name, entry in data["queries"].items():
+            for mode in MODES:
+                if mode not in entry:
+                    continue
+                p95 = entry[mode]["p95_ms"]
+                budget = budgets.get(name, budgets.get("*"))
+                if budget is not None and p95 > budget:
+                    failures.append(f"{scale}/{mode} {name}: p95 {p95:.1f} ms over budget {budget:g} ms")
+                try:
+                    before = baseline["scales"][scale]["queries"][name][mode]["p95_ms"]
+                except (KeyError, TypeError):
+                    continue
+                if p95 > before * max_ratio and p95 - before > min_delta_ms:
+                    failures.append(f"{scale}/{mode} {name}: p95 {before:.1f} -> {p95:.1f} ms "
+                                    f"({p95 / before:.2f}x, limit {max_ratio:g}x)")
+    return failures
+
+
+def _parse_budgets(values):
+    budgets = {}
+    for value in values or []:
+        name, _, ms = value.partition("=")
+        if not ms:
+            raise argparse.ArgumentTypeError(f"Budget must be NAME=MS: {value}")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def _print_report(report, modes):
+    for scale, data in report["scales"].items():
+        tables = ", ".join(f"{rows:,} {table}" for table, rows in data["tables"].items())
+        print(f"\n{scale}: {tables}")
+        header = f"{'query':<32}{'rows':>8}"
+        for mode in modes:
+            header += f"{mode + ' p50':>12}{mode + ' p95':>12}"
+        print(header)
+        for name, entry in data["queries"].items():
+            line = f"{name:<32}{entry['rows']:>8}"
+            for mode in modes:
+                line += f"{entry[mode]['p50_ms']:>12.2f}{entry[mode]['p95_ms']:>12.2f}"
+            print(line)
+    if report["uncovered"]:
+        print(f"\nNot benchmarked (add to QUERIES): {', '.join(report['uncovered'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"Comma-separated, from {', '.join(synthetic_data.SCALES)}")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--queries", help="Comma-separated subset of query names")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Where generated databases are kept")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+    parser.add_argument("--max-ratio", type=float, default=1.5,
+                        help="Allowed p95 growth over the baseline")
+    parser.add_argument("--budget", action="append", metavar="NAME=MS",
+                        help="p95 limit for a query ('*' for all); repeatable")
+    args = parser.parse_args()
+
+    scales = args.scales.split(",")
+    modes = args.modes.split(",")
+    for scale in scales:
+        if scale not in synthetic_data.SCALES:
+            parser.error(f"Unknown scale: {scale}")
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"Unknown mode: {mode}")
+    queries = args.queries.split(",") if args.queries else None
+    for name in queries or []:
+        if name not in QUERIES:
+            parser.error(f"Unknown query: {name}")
+    budgets = _parse_budgets(args.budget)
+
+    report = run(scales, modes, args.iterations, args.data_dir, args.seed, queries)
+    _print_report(report, modes)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report["failures"] = check(report, baseline, args.max_ratio, budgets)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+    if report["failures"]:
+        print(f"\n{len(report['failures'])} regression(s):")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
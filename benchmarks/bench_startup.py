@@ -0,0 +1,302 @@
+"""
+TTS Guard — Startup Benchmark
+Import time of the app's modules and cold-start time to interactive: a
+fresh interpreter, as after a server restart, running its first page.
+
+imports: each module imported in a fresh interpreter, on its own and
+after streamlit (what a page pays on a running server, since streamlit
+and its own dependencies are already loaded by then).
+
+cold start: a fresh interpreter runs app.py or a page through Streamlit's
+AppTest and then reruns it once, against a copy of a seeded database
+("seeded") or no database at all ("empty", which includes creating the
+schema and seeding). time to interactive is from process start until the
+first run of the script has finished.
+
+Results are written as JSON. With --baseline, a number that grew by more
+than --max-ratio fails the run, as does one over a --budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [--runs 5] [--pages app,Dashboard]
+        [--databases seeded,empty] [--out results.json]
+        [--baseline previous.json] [--max-ratio 1.5] [--budget Dashboard=4000]
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(tempfile.gettempdir(), "tts_guard_bench")
+DATABASES = ("seeded", "empty")
+# Differences below this are process start-up noise, never a regression
+MIN_DELTA_MS = 50.0
+
+MODULES = [
+    "streamlit",
+    "pandas",
+    "plotly.graph_objects",
+    "fpdf",
+    "database",
+    "theme",
+    "pagination",
+    "page_metrics",
+    "seed_data",
+    "report_service",
+    "monthly_reports",
+    "pdf_report",
+]
+
+
+def pages():
+    """Page name -> script path, app.py first."""
+    found = {"app": os.path.join(ROOT, "app.py")}
+    for path in sorted(glob.glob(os.path.join(ROOT, "pages", "*.py"))):
+        found[os.path.splitext(os.path.basename(path))[0].split("_", 2)[-1]] = path
+    return found
+
+
+def _python(code, *args):
+    """Run code in a fresh interpreter from the repository root; return its JSON output."""
+    result = subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Subprocess failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------------
+# IMPORTS
+# ---------------------------------------------------------------------------
+
+_IMPORT_CODE = """
+import json, sys, time
+if sys.argv[2] == "after":
+    import streamlit
+start = time.perf_counter()
+__import__(sys.argv[1])
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def time_imports(modules=MODULES, runs=5):
+    """Median ms to import each module in a fresh interpreter, alone and after streamlit."""
+    results = {}
+    for module in modules:
+        entry = {}
+        for when in ("alone", "after"):
+            timings = [_python(_IMPORT_CODE, module, when) for _ in range(runs)]
+            entry[f"{when}_ms"] = round(statistics.median(timings) * 1000, 1)
+        results[module] = entry
+    return results
+
+
+# ---------------------------------------------------------------------------
+# COLD START
+# ---------------------------------------------------------------------------
+
+# argv: process start (time.time()), script path, database path
+_COLD_START_CODE = """
+import json, sys, time
+launched = time.time()
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import database
+database.configure(path=sys.argv[3])
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[2], default_timeout=300).run()
+first = time.perf_counter()
+at.run()
+rerun = time.perf_counter()
+errors = [e.message for e in at.exception]
+print(json.dumps({
+    "interpreter_ms": (launched - float(sys.argv[1])) * 1000,
+    "import_ms": (imported - start) * 1000,
+    "first_run_ms": (first - imported) * 1000,
+    "rerun_ms": (rerun - first) * 1000,
+    "errors": errors,
+}))
+"""
+
+
+def seeded_database(data_dir=DATA_DIR):
+    """Return the path of a seeded database, creating it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, "startup-seeded.db")
+    if not os.path.exists(path):
+        building = path + ".building"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(building + suffix):
+                os.remove(building + suffix)
+        # Closing the last connection checkpoints the WAL into the file
+        _python("import database, json, sys; database.configure(path=sys.argv[1]); "
+                "database.bootstrap(); database.configure(); print(json.dumps(0))", building)
+        os.replace(building, path)
+    return path
+
+
+def cold_start(script, db, runs=5, data_dir=DATA_DIR):
+    """Run script in runs fresh interpreters; return median and max of each phase."""
+    seeded = seeded_database(data_dir) if db == "seeded" else None
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tts_guard.db")
+            if seeded is not None:
+                shutil.copy(seeded, path)
+            sample = _python(_COLD_START_CODE, repr(time.time()), script, path)
+        if sample["errors"]:
+            raise RuntimeError(f"{script} raised: {sample['errors'][0]}")
+        sample["interactive_ms"] = (sample["interpreter_ms"] + sample["import_ms"]
+                                    + sample["first_run_ms"])
+        samples.append(sample)
+    phases = ("interactive_ms", "interpreter_ms", "import_ms", "first_run_ms", "rerun_ms")
+    return {
+        phase: {
+            "median": round(statistics.median(s[phase] for s in samples), 1),
+            "max": round(max(s[phase] for s in samples), 1),
+        }
+        for phase in phases
+    }
+
+
+def run(page_names, databases=DATABASES, runs=5, data_dir=DATA_DIR):
+    """Time imports and cold starts and return the JSON-ready report."""
+    scripts = pages()
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": runs,
+        "imports": time_imports(runs=runs),
+        "cold_start": {},
+    }
+    for db in databases:
+        report["cold_start"][db] = {
+            name: cold_start(scripts[name], db, runs, data_dir) for name in page_names
+        }
+    return report
+
+
+# ---------------------------------------------------------------------------
+# THRESHOLDS
+# ---------------------------------------------------------------------------
+
+def check(report, baseline=None, max_ratio=1.5, budgets=None, min_delta_ms=MIN_DELTA_MS):
+    """
+    Return a list of failure messages.
+
+    A page fails if its median time to interactive exceeds max_ratio times
+    the baseline (and by more than min_delta_ms), or its budget in ms; a
+    module fails the same way on its import time after streamlit. budgets
+    maps a page or module name, or "*" for any page, to milliseconds.
+    """
+    failures = []
+    budgets = budgets or {}
+
+    def compare(label, value, before, budget):
+        if budget is not None and value > budget:
+            failures.append(f"{label}: {value:.0f} ms over budget {budget:g} ms")
+        if before is not None and value > before * max_ratio and value - before > min_delta_ms:
+            failures.append(f"{label}: {before:.0f} -> {value:.0f} ms "
+                            f"({value / before:.2f}x, limit {max_ratio:g}x)")
+
+    for db, results in report["cold_start"].items():
+        for name, entry in results.items():
+            try:
+                before = baseline["cold_start"][db][name]["interactive_ms"]["median"]
+            except (KeyError, TypeError):
+                before = None
+            compare(f"{db}/{name} interactive", entry["interactive_ms"]["median"], before,
+                    budgets.get(name, budgets.get("*")))
+    for module, entry in report["imports"].items():
+        try:
+            before = baseline["imports"][module]["after_ms"]
+        except (KeyError, TypeError):
+            before = None
+        compare(f"import {module}", entry["after_ms"], before, budgets.get(module))
+    return failures
+
+
+def _parse_budgets(values):
+    budgets = {}
+    for value in values or []:
+        name, _, ms = value.partition("=")
+        if not ms:
+            raise argparse.ArgumentTypeError(f"Budget must be NAME=MS: {value}")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def _print_report(report):
+    print(f"\n{'module':<24}{'alone ms':>12}{'after st ms':>14}")
+    for module, entry in report["imports"].items():
+        print(f"{module:<24}{entry['alone_ms']:>12.1f}{entry['after_ms']:>14.1f}")
+    for db, results in report["cold_start"].items():
+        print(f"\ncold start, {db} database (median ms)")
+        print(f"{'page':<14}{'interactive':>13}{'interpreter':>13}{'imports':>10}"
+              f"{'first run':>11}{'rerun':>9}")
+        for name, entry in results.items():
+            print(f"{name:<14}{entry['interactive_ms']['median']:>13.0f}"
+                  f"{entry['interpreter_ms']['median']:>13.0f}{entry['import_ms']['median']:>10.0f}"
+                  f"{entry['first_run_ms']['median']:>11.0f}{entry['rerun_ms']['median']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", default="app,Dashboard",
+                        help=f"Comma-separated, from {', '.join(pages())}")
+    parser.add_argument("--databases", default=",".join(DATABASES))
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Where the seeded database is kept")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+    parser.add_argument("--max-ratio", type=float, default=1.5,
+                        help="Allowed growth over the baseline")
+    parser.add_argument("--budget", action="append", metavar="NAME=MS",
+                        help="Limit for a page's time to interactive ('*' for all) "
+                             "or a module's import time; repeatable")
+    args = parser.parse_args()
+
+    page_names = args.pages.split(",")
+    for name in page_names:
+        if name not in pages():
+            parser.error(f"Unknown page: {name}")
+    databases = args.databases.split(",")
+    for db in databases:
+        if db not in DATABASES:
+            parser.error(f"Unknown database: {db}")
+    budgets = _parse_budgets(args.budget)
+
+    report = run(page_names, databases, args.runs, args.data_dir)
+    _print_report(report)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report["failures"] = check(report, baseline, args.max_ratio, budgets)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+    if report["failures"]:
+        print(f"\n{len(report['failures'])} regression(s):")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
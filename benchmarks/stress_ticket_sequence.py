@@ -0,0 +1,105 @@
+"""
+TTS Guard — Ticket Sequence Stress Test
+Several writer threads create complaints concurrently, singly and in
+batches, on separate pooled connections. Fails unless every ticket is
+unique and the year's numbers run 1..N without gaps.
+
+Run from the repository root:
+    python -m benchmarks.stress_ticket_sequence [--threads 8] [--tickets 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+import database
+
+
+def _writer(worker, tickets, batch, results, errors):
+    issued = []
+    try:
+        remaining = tickets
+        rounds = 0
+        while remaining > 0:
+            # Alternate single inserts with batch reservations
+            n = min(batch, remaining) if rounds % 2 else 1
+            rounds += 1
+            rows = [{
+                "client_id": 1,
+                "building_id": 1,
+                "message": f"stress worker {worker}",
+                "priority": "low",
+            } for _ in range(n)]
+            issued.extend(database.insert_complaints(rows))
+            remaining -= n
+    except Exception as e:  # reported by the main thread
+        errors.append((worker, repr(e)))
+    results[worker] = issued
+
+
+def run(threads=8, tickets=200, batch=5):
+    """Run the stress test and return (issued tickets, errors, seconds)."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="tts_stress_"), "stress.db")
+    database.configure(path=db_path, pool_size=threads)
+    database.init_db()
+    with database.transaction() as conn:
+        # Start from an empty year so the expected range is 1..N
+        conn.execute("DELETE FROM complaints")
+        conn.execute("DELETE FROM ticket_sequences")
+
+    results, errors = {}, []
+    workers = [
+        threading.Thread(target=_writer, args=(i, tickets, batch, results, errors))
+        for i in range(threads)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    issued = [t for worker_tickets in results.values() for t in worker_tickets]
+    return issued, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tickets", type=int, default=200, help="Tickets per thread")
+    parser.add_argument("--batch", type=int, default=5, help="Batch size for bulk inserts")
+    args = parser.parse_args()
+
+    issued, errors, elapsed = run(args.threads, args.tickets, args.batch)
+    expected = args.threads * args.tickets
+    year = date.today().year
+    numbers = sorted(int(t.rsplit("-", 1)[1]) for t in issued)
+
+    with database.connection() as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM complaints").fetchone()[0]
+
+    print(f"{len(issued)} tickets from {args.threads} threads in {elapsed:.2f}s "
+          f"({len(issued) / elapsed:.0f} tickets/s)")
+    failures = []
+    if errors:
+        failures.append(f"{len(errors)} writer errors, first: {errors[0]}")
+    if len(set(issued)) != len(issued):
+        failures.append("duplicate ticket numbers issued")
+    if numbers != list(range(1, expected + 1)):
+        failures.append(f"ticket numbers are not TTS-{year}-0001..{expected:04d}")
+    if stored != expected:
+        failures.append(f"{stored} complaints stored, expected {expected}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: all tickets unique and contiguous")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
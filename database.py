@@ -1,164 +1,514 @@
 """
 TTS Guard — Database Layer
 SQLite schema (8 tables) and all query functions.
+Schema changes after the base tables live in migrations.py.
 """
 
 import sqlite3
+import threading
+import time
 import pandas as pd
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 import os
 
+from migrations import apply_migrations, backfill_day_numbers, update_day_numbers
+from query_cache import QueryCache
+from sql_profiler import ProfilingConnection
+from status_engine import StatusEngine, day_number
+
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_guard.db")
 
 _db_initialized = False
+_init_lock = threading.RLock()
+_init_running = False
+
+
+# ---------------------------------------------------------------------------
+# CONNECTION POOL
+# ---------------------------------------------------------------------------
 
+# PRAGMA profiles, applied once when a pooled connection is opened.
+# cache_size is negative => size in KiB rather than pages.
+CONNECTION_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    },
+    "low_memory": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "foreign_keys": "ON",
+    },
+}
+
+DB_PROFILE = "default"
+POOL_SIZE = 8
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections with per-thread reuse.
 
-def get_connection():
-    """Return a sqlite3 connection with Row factory for dict-like access."""
-    global _db_initialized
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    A thread that already holds a connection gets the same one back on
+    nested acquire, so helpers can call each other without opening a
+    second connection. When the outermost holder releases it, the
+    connection goes back to the idle list for the next thread.
+    """
+
+    def __init__(self, path, max_size=POOL_SIZE, profile=DB_PROFILE, timeout=30.0):
+        self.path = path
+        self.max_size = max_size
+        self.pragmas = CONNECTION_PROFILES[profile] if isinstance(profile, str) else dict(profile)
+        self.timeout = timeout
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _connect(self):
+        # Connections move between Streamlit script threads, but are only
+        # ever used by the thread that currently holds them. The profiling
+        # class behaves as a plain connection until sql_profiler.enable().
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               factory=ProfilingConnection)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self):
+        """Return the calling thread's connection, checking one out if needed."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        deadline = time.monotonic() + self.timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise TimeoutError(
+                        f"No database connection available after {self.timeout:.0f}s "
+                        f"(pool size {self.max_size})"
+                    )
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """Give back a connection obtained from acquire()."""
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        # Never hand a half-finished transaction to the next thread
+        if conn.in_transaction:
+            conn.rollback()
+
+        with self._cond:
+            if self._closed:
+                conn.close()
+                self._open -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager around acquire()/release()."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; connections in use close on release."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+            self._cond.notify_all()
+
+    def held(self):
+        """Return the connection the calling thread holds, if any."""
+        return getattr(self._local, "conn", None)
+
+    def stats(self):
+        """Return open/idle connection counts."""
+        with self._cond:
+            return {"open": self._open, "idle": len(self._idle), "max_size": self.max_size}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, max_size=POOL_SIZE, profile=DB_PROFILE)
+    return _pool
+
+
+def configure(path=None, profile=None, pool_size=None):
+    """
+    Point the database layer at another file or PRAGMA profile.
+    Closes the current pool; the next query opens a fresh one.
+    """
+    global DB_PATH, DB_PROFILE, POOL_SIZE, _pool, _db_initialized, _version_conn
+    global _snapshots_recorded_through
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        with _version_lock:
+            if _version_conn is not None:
+                _version_conn.close()
+                _version_conn = None
+        query_cache.clear()
+        if path is not None:
+            DB_PATH = path
+        if profile is not None:
+            DB_PROFILE = profile
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        _db_initialized = False
+        _snapshots_recorded_through = None
+
+
+@contextmanager
+def connection():
+    """
+    Yield a pooled sqlite3 connection with Row factory for dict-like access.
+    Nested use within one thread shares the same connection.
+    """
     if not _db_initialized:
-        # Set flag first to prevent recursion (init_db also calls get_connection)
-        _db_initialized = True
-        _ensure_tables_exist()
-    return conn
+        bootstrap()
+    with _get_pool().connection() as conn:
+        yield conn
 
 
-def _ensure_tables_exist():
-    """Auto-create tables and seed if DB is empty (handles direct page navigation)."""
-    init_db()
-    if not has_data():
-        from seed_data import seed
-        seed()
+@contextmanager
+def transaction():
+    """
+    Yield a pooled connection inside a write transaction (BEGIN IMMEDIATE),
+    committing on success and rolling back on error. Nested use joins the
+    transaction already open on this thread.
+    """
+    with connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+@contextmanager
+def read_transaction():
+    """
+    Yield a pooled connection inside a read transaction (BEGIN), so every
+    statement sees the database as of the first read even while other
+    connections commit. Nested use joins the transaction already open.
+    """
+    with connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()  # nothing was written; just end the snapshot
+
+
+# ---------------------------------------------------------------------------
+# QUERY CACHE
+# ---------------------------------------------------------------------------
+
+_version_conn = None
+_version_lock = threading.Lock()
+
+
+def data_version():
+    """
+    Return a token that changes whenever any connection, in this process or
+    another, commits to the database, and when the date rolls over (the
+    status queries are relative to today).
+    """
+    global _version_conn
+    with _version_lock:
+        if _version_conn is None:
+            # PRAGMA data_version only moves for commits made by *other*
+            # connections, so this one is kept for watching and never writes
+            _version_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        version = _version_conn.execute("PRAGMA data_version").fetchone()[0]
+    return (version, date.today())
+
+
+def _in_write_transaction():
+    """True if this thread is inside an uncommitted transaction."""
+    conn = _pool.held() if _pool is not None else None
+    return conn is not None and conn.in_transaction
+
+
+# Shared by every session in the process; see query_cache.QueryCache
+query_cache = QueryCache(version=data_version, bypass=_in_write_transaction)
+cached = query_cache.cached
+
+
+def get_cache_stats():
+    """Return query cache hit/miss statistics."""
+    return query_cache.stats()
+
+
+def bootstrap():
+    """
+    Create the schema and seed an empty database, with compliance history
+    for the trend charts, once per process (and again after configure()). The first query runs this, so any page can
+    be opened first; other threads wait until it has finished.
+    """
+    global _db_initialized, _init_running
+    if _db_initialized:
+        return
+    with _init_lock:
+        # init_db and seed use connection() themselves; let them through
+        if _db_initialized or _init_running:
+            return
+        _init_running = True
+        try:
+            init_db()
+            if not has_data():
+                from seed_data import seed
+                seed()
+                record_compliance_snapshots(TREND_DAYS)  # history for the trend charts
+            _db_initialized = True
+        finally:
+            _init_running = False
 
 
 def init_db():
-    """Create all 8 tables if they don't exist."""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.executescript("""
-        CREATE TABLE IF NOT EXISTS clients (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            short_name TEXT NOT NULL,
-            contact_person TEXT,
-            phone TEXT,
-            email TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS buildings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            client_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            area TEXT,
-            FOREIGN KEY (client_id) REFERENCES clients(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS contracts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            building_id INTEGER NOT NULL,
-            start_date TEXT NOT NULL,
-            end_date TEXT NOT NULL,
-            visits_per_year INTEGER DEFAULT 4,
-            annual_value REAL NOT NULL,
-            payment_terms TEXT DEFAULT 'quarterly',
-            status TEXT DEFAULT 'active',
-            FOREIGN KEY (building_id) REFERENCES buildings(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS equipment (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            building_id INTEGER NOT NULL,
-            type TEXT NOT NULL,
-            status TEXT DEFAULT 'OK',
-            FOREIGN KEY (building_id) REFERENCES buildings(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS inspections (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            building_id INTEGER NOT NULL,
-            inspection_date TEXT NOT NULL,
-            technician TEXT NOT NULL,
-            items_checked INTEGER DEFAULT 0,
-            items_passed INTEGER DEFAULT 0,
-            items_failed INTEGER DEFAULT 0,
-            notes TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (building_id) REFERENCES buildings(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS complaints (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ticket_number TEXT NOT NULL UNIQUE,
-            client_id INTEGER NOT NULL,
-            building_id INTEGER NOT NULL,
-            message TEXT NOT NULL,
-            priority TEXT DEFAULT 'medium',
-            status TEXT DEFAULT 'open',
-            assigned_technician TEXT,
-            inspection_id INTEGER,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (client_id) REFERENCES clients(id),
-            FOREIGN KEY (building_id) REFERENCES buildings(id),
-            FOREIGN KEY (inspection_id) REFERENCES inspections(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS scheduled_inspections (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            building_id INTEGER NOT NULL,
-            scheduled_date TEXT NOT NULL,
-            assigned_technician TEXT NOT NULL,
-            status TEXT DEFAULT 'scheduled',
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (building_id) REFERENCES buildings(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            contract_id INTEGER NOT NULL,
-            payment_date TEXT NOT NULL,
-            amount REAL NOT NULL,
-            method TEXT DEFAULT 'bank_transfer',
-            reference_number TEXT,
-            status TEXT DEFAULT 'received',
-            notes TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (contract_id) REFERENCES contracts(id)
-        );
-    """)
-
-    conn.commit()
-    conn.close()
+    """Create all 8 tables if they don't exist, then apply pending migrations."""
+    with connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.executescript("""
+            CREATE TABLE IF NOT EXISTS clients (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                short_name TEXT NOT NULL,
+                contact_person TEXT,
+                phone TEXT,
+                email TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS buildings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                area TEXT,
+                FOREIGN KEY (client_id) REFERENCES clients(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS contracts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                building_id INTEGER NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                visits_per_year INTEGER DEFAULT 4,
+                annual_value REAL NOT NULL,
+                payment_terms TEXT DEFAULT 'quarterly',
+                status TEXT DEFAULT 'active',
+                FOREIGN KEY (building_id) REFERENCES buildings(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS equipment (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                building_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                status TEXT DEFAULT 'OK',
+                FOREIGN KEY (building_id) REFERENCES buildings(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS inspections (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                building_id INTEGER NOT NULL,
+                inspection_date TEXT NOT NULL,
+                technician TEXT NOT NULL,
+                items_checked INTEGER DEFAULT 0,
+                items_passed INTEGER DEFAULT 0,
+                items_failed INTEGER DEFAULT 0,
+                notes TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (building_id) REFERENCES buildings(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS complaints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_number TEXT NOT NULL UNIQUE,
+                client_id INTEGER NOT NULL,
+                building_id INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                priority TEXT DEFAULT 'medium',
+                status TEXT DEFAULT 'open',
+                assigned_technician TEXT,
+                inspection_id INTEGER,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (client_id) REFERENCES clients(id),
+                FOREIGN KEY (building_id) REFERENCES buildings(id),
+                FOREIGN KEY (inspection_id) REFERENCES inspections(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS scheduled_inspections (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                building_id INTEGER NOT NULL,
+                scheduled_date TEXT NOT NULL,
+                assigned_technician TEXT NOT NULL,
+                status TEXT DEFAULT 'scheduled',
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (building_id) REFERENCES buildings(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS payments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                contract_id INTEGER NOT NULL,
+                payment_date TEXT NOT NULL,
+                amount REAL NOT NULL,
+                method TEXT DEFAULT 'bank_transfer',
+                reference_number TEXT,
+                status TEXT DEFAULT 'received',
+                notes TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (contract_id) REFERENCES contracts(id)
+            );
+        """)
+
+        conn.commit()
+        apply_migrations(conn)
+        # Before any query relies on the day-number columns
+        backfill_day_numbers(conn)
 
 
 def reset_db():
     """Drop all tables and re-create."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    tables = [
-        "payments", "scheduled_inspections", "complaints",
-        "inspections", "equipment", "contracts", "buildings", "clients"
-    ]
-    for table in tables:
-        cursor.execute(f"DROP TABLE IF EXISTS {table}")
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        tables = [
+            "building_status", "ticket_sequences", "contract_ledger",
+            "inspection_items", "monthly_rollup", "compliance_snapshots",
+            "client_compliance_snapshots", "day_number_backfill",
+            "payments", "scheduled_inspections", "complaints",
+            "inspections", "equipment", "contracts", "buildings", "clients"
+        ]
+        for table in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        # Dropped tables take their indexes with them; replay every migration
+        cursor.execute("PRAGMA user_version = 0")
+        conn.commit()
     init_db()
 
 
 def has_data():
     """Check if the database has seed data."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM clients")
-    count = cursor.fetchone()[0]
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM clients")
+        count = cursor.fetchone()[0]
     return count > 0
 
 
+# ---------------------------------------------------------------------------
+# KEYSET PAGINATION
+# ---------------------------------------------------------------------------
+
+PAGE_SIZE = 25
+
+# One page of a newest-first listing. first/last are the (sort value, id)
+# keys of the first and last rows, used as the cursor for the neighbouring
+# pages; they are None when the page is empty.
+Page = namedtuple("Page", "rows first last has_prev has_next")
+
+
+def _keyset_page(sql, key, cursor=None, direction="next", page_size=PAGE_SIZE,
+                 where=(), params=()):
+    """
+    Fetch one page of `sql`, a SELECT with {where} and {order} placeholders
+    whose ORDER BY is the two key columns.
+
+    key is ((sort expression, result column), (id expression, result column)).
+    direction "next" returns the page_size rows after cursor, "prev" the
+    page_size rows before it. The cursor is a row comparison on an index
+    ordered by (sort column, rowid), so every page costs the same however
+    deep it is.
+    """
+    where, params = list(where), list(params)
+    if cursor is not None:
+        op = "<" if direction == "next" else ">"
+        where.append(f"({key[0][0]}, {key[1][0]}) {op} (?, ?)")
+        params += list(cursor)
+    query = sql.format(
+        where=f"WHERE {' AND '.join(where)}" if where else "",
+        order="DESC" if direction == "next" else "ASC",
+    )
+    with connection() as conn:
+        df = pd.read_sql_query(query, conn, params=params + [page_size + 1])
+
+    # One extra row tells whether there is another page in this direction
+    more = len(df) > page_size
+    df = df.iloc[:page_size]
+    if direction == "prev":
+        df = df.iloc[::-1]
+    df = df.reset_index(drop=True)
+
+    # to_dict gives native Python values; sqlite3 cannot bind numpy ints
+    ends = df[[key[0][1], key[1][1]]].iloc[[0, -1]].to_dict("records") if len(df) else []
+    first, last = (tuple(end.values()) for end in ends) if ends else (None, None)
+    if direction == "next":
+        return Page(df, first, last, cursor is not None, more)
+    return Page(df, first, last, more, True)
+
+
 # ---------------------------------------------------------------------------
 # TECHNICIANS (constant)
 # ---------------------------------------------------------------------------
@@ -175,120 +525,151 @@ TECHNICIANS = [
 # CLIENT QUERIES
 # ---------------------------------------------------------------------------
 
+@cached
 def get_all_clients():
     """Return all clients as a DataFrame."""
-    conn = get_connection()
-    df = pd.read_sql_query("SELECT * FROM clients ORDER BY name", conn)
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM clients ORDER BY name", conn)
     return df
 
 
+@cached
 def get_client_by_id(client_id):
     """Return a single client as a dict."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM clients WHERE id = ?", (client_id,))
-    row = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM clients WHERE id = ?", (client_id,))
+        row = cursor.fetchone()
     return dict(row) if row else None
 
 
+@cached
 def get_client_summary():
     """
     Return client summary: name, building count, equipment count,
     total annual value, overdue count.
     """
-    today = date.today().isoformat()
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT
-            cl.id as client_id,
-            cl.name as "Client",
-            cl.short_name,
-            COUNT(DISTINCT b.id) as "Buildings",
-            COUNT(DISTINCT e.id) as "Equipment",
-            COALESCE(SUM(DISTINCT c.annual_value), 0) as "Annual Value (AED)",
-            (
-                SELECT COUNT(DISTINCT b2.id)
-                FROM buildings b2
-                JOIN contracts c2 ON c2.building_id = b2.id AND c2.status = 'active'
-                LEFT JOIN (
-                    SELECT building_id, MAX(inspection_date) as last_date
-                    FROM inspections GROUP BY building_id
-                ) li ON li.building_id = b2.id
-                LEFT JOIN scheduled_inspections si
-                    ON si.building_id = b2.id AND si.status = 'scheduled'
-                WHERE b2.client_id = cl.id
-                AND si.id IS NULL
-                AND (
-                    li.last_date IS NULL
-                    OR julianday(?) - julianday(li.last_date) > 365.0 / c2.visits_per_year
-                )
-            ) as overdue_count
-        FROM clients cl
-        LEFT JOIN buildings b ON b.client_id = cl.id
-        LEFT JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
-        LEFT JOIN equipment e ON e.building_id = b.id
-        GROUP BY cl.id
-        ORDER BY "Annual Value (AED)" DESC
-    """, conn, params=[today])
-    conn.close()
+    today = day_number(date.today())
+    with connection() as conn:
+        df = pd.read_sql_query(
+            _DUE_CTE + _CLIENT_SUMMARY_QUERY, conn,
+            params={"day": today, "horizon": today, "days": 0},
+        )
     return df
 
 
+# Per client: buildings and equipment (building_status keeps the count),
+# annual value summed per active contract, as _CLIENT_FINANCIAL_ROLLUP
+# does, and overdue buildings taken from the due CTE
+_CLIENT_SUMMARY_QUERY = """
+    SELECT
+        cl.id as client_id,
+        cl.name as "Client",
+        cl.short_name,
+        COALESCE(bc.buildings, 0) as "Buildings",
+        COALESCE(bc.equipment, 0) as "Equipment",
+        COALESCE(av.annual_value, 0) as "Annual Value (AED)",
+        COALESCE(od.overdue_count, 0) as overdue_count
+    FROM clients cl
+    LEFT JOIN (
+        SELECT b.client_id, COUNT(*) as buildings, SUM(bs.equipment_count) as equipment
+        FROM buildings b
+        JOIN building_status bs ON bs.building_id = b.id
+        GROUP BY b.client_id
+    ) bc ON bc.client_id = cl.id
+    LEFT JOIN (
+        SELECT b.client_id, SUM(c.annual_value) as annual_value
+        FROM contracts c
+        JOIN buildings b ON b.id = c.building_id
+        WHERE c.status = 'active'
+        GROUP BY b.client_id
+    ) av ON av.client_id = cl.id
+    LEFT JOIN (
+        SELECT client_id, COUNT(*) as overdue_count
+        FROM due
+        WHERE status = 'overdue'
+        GROUP BY client_id
+    ) od ON od.client_id = cl.id
+    ORDER BY "Annual Value (AED)" DESC, cl.id
+"""
+
+
 # ---------------------------------------------------------------------------
 # BUILDING QUERIES
 # ---------------------------------------------------------------------------
 
+@cached
 def get_all_buildings():
     """Return all buildings with client info."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT b.*, cl.name as client_name, cl.short_name
-        FROM buildings b
-        JOIN clients cl ON cl.id = b.client_id
-        ORDER BY cl.name, b.name
-    """, conn)
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT b.*, cl.name as client_name, cl.short_name
+            FROM buildings b
+            JOIN clients cl ON cl.id = b.client_id
+            ORDER BY cl.name, b.name
+        """, conn)
     return df
 
 
+@cached
 def get_buildings_by_client(client_id):
     """Return buildings for a specific client."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT b.*,
-            (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id) as equipment_count,
-            (SELECT MAX(i.inspection_date) FROM inspections i WHERE i.building_id = b.id) as last_inspection,
-            c.annual_value,
-            c.visits_per_year,
-            c.payment_terms
-        FROM buildings b
-        LEFT JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
-        WHERE b.client_id = ?
-        ORDER BY b.name
-    """, conn, params=[client_id])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT b.*,
+                (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id) as equipment_count,
+                (SELECT MAX(i.inspection_date) FROM inspections i WHERE i.building_id = b.id) as last_inspection,
+                c.annual_value,
+                c.visits_per_year,
+                c.payment_terms
+            FROM buildings b
+            LEFT JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
+            WHERE b.client_id = ?
+            ORDER BY b.name
+        """, conn, params=[client_id])
     return df
 
 
+@cached
+def get_all_client_buildings():
+    """
+    Return every client's buildings in one query, ordered by client then name.
+    Same columns as get_buildings_by_client; equipment count and last
+    inspection come from building_status instead of per-row subqueries.
+    """
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT b.*,
+                bs.equipment_count,
+                bs.last_inspection_date as last_inspection,
+                c.annual_value,
+                c.visits_per_year,
+                c.payment_terms
+            FROM buildings b
+            JOIN building_status bs ON bs.building_id = b.id
+            LEFT JOIN contracts c ON c.id = bs.contract_id
+            ORDER BY b.client_id, b.name
+        """, conn)
+    return df
+
+
+@cached
 def get_building_details(building_id):
     """Return full details for a building."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT b.*, cl.name as client_name, cl.short_name,
-            cl.contact_person, cl.phone, cl.email,
-            c.annual_value, c.visits_per_year, c.start_date, c.end_date,
-            c.id as contract_id, c.payment_terms,
-            (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id) as equipment_count
-        FROM buildings b
-        JOIN clients cl ON cl.id = b.client_id
-        LEFT JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
-        WHERE b.id = ?
-    """, (building_id,))
-    row = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT b.*, cl.name as client_name, cl.short_name,
+                cl.contact_person, cl.phone, cl.email,
+                c.annual_value, c.visits_per_year, c.start_date, c.end_date,
+                c.id as contract_id, c.payment_terms,
+                (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id) as equipment_count
+            FROM buildings b
+            JOIN clients cl ON cl.id = b.client_id
+            LEFT JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
+            WHERE b.id = ?
+        """, (building_id,))
+        row = cursor.fetchone()
     return dict(row) if row else None
 
 
@@ -296,9 +677,29 @@ def get_building_details(building_id):
 # INSPECTION QUERIES
 # ---------------------------------------------------------------------------
 
-def _get_inspection_status_query():
-    """Return the base query for computing building inspection status."""
-    return """
+def _get_inspection_status_query(with_schedule=False):
+    """
+    Return the base query for computing building inspection status.
+    Reads the materialized building_status table (one row per building);
+    only buildings with an active contract are included. with_schedule
+    adds is_scheduled and the earliest pending visit's date and technician.
+    Its two parameters are today's day number.
+    """
+    schedule_columns = schedule_join = ""
+    if with_schedule:
+        schedule_columns = """,
+            bs.is_scheduled,
+            si.scheduled_date,
+            si.assigned_technician"""
+        schedule_join = """
+        LEFT JOIN (
+            SELECT building_id, MIN(scheduled_date) as scheduled_date,
+                assigned_technician
+            FROM scheduled_inspections
+            WHERE status = 'scheduled'
+            GROUP BY building_id
+        ) si ON si.building_id = bs.building_id"""
+    return f"""
         SELECT
             b.id as building_id,
             b.name as building_name,
@@ -309,162 +710,464 @@ def _get_inspection_status_query():
             c.annual_value,
             c.visits_per_year,
             c.id as contract_id,
-            (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id) as equipment_count,
-            li.last_date as last_inspection_date,
+            bs.equipment_count,
+            bs.last_inspection_date,
             CASE
-                WHEN li.last_date IS NULL THEN 999
-                ELSE CAST(julianday(?) - julianday(li.last_date) AS INTEGER)
+                WHEN bs.last_inspection_day IS NULL THEN 999
+                ELSE ? - bs.last_inspection_day
             END as days_since_last,
             CASE
-                WHEN li.last_date IS NULL THEN -999
-                ELSE CAST(
-                    (365.0 / c.visits_per_year) - (julianday(?) - julianday(li.last_date))
-                    AS INTEGER
-                )
-            END as days_until_next
-        FROM buildings b
+                WHEN bs.last_inspection_day IS NULL THEN -999
+                ELSE CAST((365.0 / c.visits_per_year) - (? - bs.last_inspection_day) AS INTEGER)
+            END as days_until_next{schedule_columns}
+        FROM building_status bs
+        JOIN buildings b ON b.id = bs.building_id
         JOIN clients cl ON cl.id = b.client_id
-        JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
-        LEFT JOIN (
-            SELECT building_id, MAX(inspection_date) as last_date
-            FROM inspections GROUP BY building_id
-        ) li ON li.building_id = b.id
-        LEFT JOIN scheduled_inspections si
-            ON si.building_id = b.id AND si.status = 'scheduled'
+        JOIN contracts c ON c.id = bs.contract_id{schedule_join}
     """
 
 
-def get_overdue_inspections():
-    """Return buildings where next inspection is overdue (not scheduled)."""
-    today = date.today().isoformat()
-    conn = get_connection()
-    query = _get_inspection_status_query() + """
-        WHERE si.id IS NULL
-        AND (
-            li.last_date IS NULL
-            OR julianday(?) - julianday(li.last_date) > 365.0 / c.visits_per_year
-        )
-        ORDER BY days_since_last DESC
+# Buildings with an active contract and no pending visit whose next
+# inspection falls on or before :horizon, with the status columns of
+# _get_inspection_status_query (:day and :horizon are day numbers, see
+# status_engine.day_number). status is 'overdue' (due before :day),
+# 'upcoming' (due within :days days, by the exact fractional interval, as
+# get_upcoming_inspections) or NULL. Shared by the client summary and the
+# dashboard snapshot.
+_DUE_CTE = """
+    WITH due AS (
+        SELECT
+            b.id as building_id,
+            b.name as building_name,
+            b.area,
+            cl.id as client_id,
+            cl.name as client_name,
+            cl.short_name,
+            c.annual_value,
+            c.visits_per_year,
+            c.id as contract_id,
+            bs.equipment_count,
+            bs.last_inspection_date,
+            CASE
+                WHEN bs.last_inspection_day IS NULL THEN 999
+                ELSE :day - bs.last_inspection_day
+            END as days_since_last,
+            CASE
+                WHEN bs.last_inspection_day IS NULL THEN -999
+                ELSE CAST((365.0 / c.visits_per_year) - (:day - bs.last_inspection_day) AS INTEGER)
+            END as days_until_next,
+            bs.is_scheduled,
+            CASE
+                WHEN bs.next_due_day < :day THEN 'overdue'
+                WHEN (365.0 / c.visits_per_year) - (:day - bs.last_inspection_day) <= :days
+                    THEN 'upcoming'
+            END as status
+        FROM building_status bs
+        JOIN buildings b ON b.id = bs.building_id
+        JOIN clients cl ON cl.id = b.client_id
+        JOIN contracts c ON c.id = bs.contract_id
+        WHERE bs.is_scheduled = 0 AND bs.next_due_day <= :horizon
+    )
+"""
+
+
+@cached
+def get_overdue_inspections(include_scheduled=False):
+    """
+    Return buildings where next inspection is overdue.
+    Scheduled buildings are left out unless include_scheduled is set;
+    every row carries is_scheduled plus the earliest pending visit's
+    scheduled_date and assigned_technician (NULL when not scheduled).
     """
-    df = pd.read_sql_query(query, conn, params=[today, today, today])
-    conn.close()
+    today = day_number(date.today())
+    with connection() as conn:
+        # next_due_day is the last day still inside the visit interval
+        # (a far-past sentinel when never inspected), so "overdue" is a
+        # plain integer range scan on the indexed column
+        query = _get_inspection_status_query(with_schedule=True) + """
+            WHERE bs.is_scheduled IN ({scheduled})
+            AND bs.next_due_day < ?
+            ORDER BY days_since_last DESC
+        """.format(scheduled="0, 1" if include_scheduled else "0")
+        df = pd.read_sql_query(query, conn, params=[today, today, today])
     return df
 
 
+@cached
 def get_upcoming_inspections(days=14):
     """Return buildings due within N days but not yet overdue."""
-    today = date.today().isoformat()
-    conn = get_connection()
-    query = _get_inspection_status_query() + """
-        WHERE si.id IS NULL
-        AND li.last_date IS NOT NULL
-        AND julianday(?) - julianday(li.last_date) <= 365.0 / c.visits_per_year
-        AND (365.0 / c.visits_per_year) - (julianday(?) - julianday(li.last_date)) <= ?
-        ORDER BY days_until_next ASC
-    """
-    df = pd.read_sql_query(query, conn, params=[today, today, today, today, days])
-    conn.close()
+    today = day_number(date.today())
+    horizon = today + days
+    with connection() as conn:
+        # Index range on next_due_day first, then the exact fractional
+        # interval check on the few rows inside the window
+        query = _get_inspection_status_query() + """
+            WHERE bs.is_scheduled = 0
+            AND bs.next_due_day >= ? AND bs.next_due_day <= ?
+            AND (365.0 / c.visits_per_year) - (? - bs.last_inspection_day) <= ?
+            ORDER BY days_until_next ASC
+        """
+        df = pd.read_sql_query(query, conn, params=[today, today, today, horizon, today, days])
     return df
 
 
+@cached
 def get_completed_this_month():
     """Return inspections completed in the current month."""
-    today = date.today()
-    month_start = today.replace(day=1).isoformat()
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT i.*, b.name as building_name, cl.name as client_name
-        FROM inspections i
-        JOIN buildings b ON b.id = i.building_id
-        JOIN clients cl ON cl.id = b.client_id
-        WHERE i.inspection_date >= ?
-        ORDER BY i.inspection_date DESC
-    """, conn, params=[month_start])
-    conn.close()
+    month_start = day_number(date.today().replace(day=1))
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT i.*, b.name as building_name, cl.name as client_name
+            FROM inspections i
+            JOIN buildings b ON b.id = i.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            WHERE i.inspection_day >= ?
+            ORDER BY i.inspection_day DESC
+        """, conn, params=[month_start])
     return df
 
 
+@cached
 def get_recent_inspections(days=30):
     """Return inspections from the last N days."""
-    cutoff = (date.today() - timedelta(days=days)).isoformat()
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT i.*, b.name as building_name, cl.name as client_name, cl.short_name
-        FROM inspections i
-        JOIN buildings b ON b.id = i.building_id
-        JOIN clients cl ON cl.id = b.client_id
-        WHERE i.inspection_date >= ?
-        ORDER BY i.inspection_date DESC
-    """, conn, params=[cutoff])
-    conn.close()
+    cutoff = day_number(date.today()) - days
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT i.*, b.name as building_name, cl.name as client_name, cl.short_name
+            FROM inspections i
+            JOIN buildings b ON b.id = i.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            WHERE i.inspection_day >= ?
+            ORDER BY i.inspection_day DESC
+        """, conn, params=[cutoff])
     return df
 
 
-def get_inspections_by_month(year, month):
-    """Return inspections for a specific year/month."""
-    month_start = f"{year}-{month:02d}-01"
-    if month == 12:
-        month_end = f"{year + 1}-01-01"
-    else:
-        month_end = f"{year}-{month + 1:02d}-01"
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT i.*, b.name as building_name, cl.name as client_name, cl.short_name
-        FROM inspections i
-        JOIN buildings b ON b.id = i.building_id
-        JOIN clients cl ON cl.id = b.client_id
-        WHERE i.inspection_date >= ? AND i.inspection_date < ?
-        ORDER BY i.inspection_date DESC
-    """, conn, params=[month_start, month_end])
-    conn.close()
+_INSPECTIONS_PAGE = """
+    SELECT i.id, i.inspection_date, i.technician, i.items_checked,
+        i.items_passed, i.items_failed,
+        b.name as building_name, cl.name as client_name, cl.short_name
+    FROM inspections i
+    JOIN buildings b ON b.id = i.building_id
+    JOIN clients cl ON cl.id = b.client_id
+    {where}
+    ORDER BY i.inspection_date {order}, i.id {order}
+    LIMIT ?
+"""
+
+
+@cached
+def get_inspections_page(cursor=None, direction="next", page_size=PAGE_SIZE,
+                         start=None, end=None):
+    """
+    Return one Page of inspections, newest first, keyed on
+    (inspection_date, id). start/end optionally bound the date range
+    (start inclusive, end exclusive).
+    """
+    where, params = [], []
+    if start is not None:
+        where.append("i.inspection_date >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("i.inspection_date < ?")
+        params.append(end)
+    return _keyset_page(
+        _INSPECTIONS_PAGE, (("i.inspection_date", "inspection_date"), ("i.id", "id")),
+        cursor, direction, page_size, where, params,
+    )
+
+
+@cached
+def get_inspections_by_month(year, month, client_id=None):
+    """Return inspections for a specific year/month, optionally for one client."""
+    month_start = day_number(date(year, month, 1))
+    month_end = day_number(date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1))
+    client_filter = "AND b.client_id = ?" if client_id is not None else ""
+    params = [month_start, month_end] + ([client_id] if client_id is not None else [])
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            SELECT i.*, b.name as building_name, b.client_id,
+                cl.name as client_name, cl.short_name
+            FROM inspections i
+            JOIN buildings b ON b.id = i.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            WHERE i.inspection_day >= ? AND i.inspection_day < ?
+            {client_filter}
+            ORDER BY i.inspection_day DESC
+        """, conn, params=params)
     return df
 
 
 def insert_inspection(building_id, inspection_date, technician,
-                      items_checked, items_passed, items_failed, notes):
-    """Insert a new inspection record. Returns the new inspection ID."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO inspections
-            (building_id, inspection_date, technician, items_checked,
-             items_passed, items_failed, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (building_id, inspection_date, technician,
-          items_checked, items_passed, items_failed, notes))
-    inspection_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+                      items_checked, items_passed, items_failed, notes,
+                      items=None):
+    """
+    Insert a new inspection record. Returns the new inspection ID.
+    items is an optional list of (equipment_id, passed) pairs, stored in
+    inspection_items in the same transaction as the inspection; each must
+    be equipment of building_id, else ValueError and nothing is stored.
+    """
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO inspections
+                (building_id, inspection_date, technician, items_checked,
+                 items_passed, items_failed, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (building_id, inspection_date, technician,
+              items_checked, items_passed, items_failed, notes))
+        inspection_id = cursor.lastrowid
+        if items:
+            rows = [(inspection_id, int(bool(passed)), int(equipment_id), building_id)
+                    for equipment_id, passed in items]
+            cursor.executemany("""
+                INSERT INTO inspection_items
+                    (inspection_id, equipment_id, building_id, equipment_type, passed)
+                SELECT ?, e.id, e.building_id, e.type, ?
+                FROM equipment e WHERE e.id = ? AND e.building_id = ?
+            """, rows)
+            if cursor.rowcount != len(rows):
+                raise ValueError("Inspection items reference equipment not in this building")
     return inspection_id
 
 
+def _failure_rate_query(group_columns, select_columns, joins="", where=""):
+    """Checks, failures and failure rate from inspection_items, grouped."""
+    return f"""
+        SELECT {select_columns},
+            COUNT(*) as checks,
+            SUM(ii.passed = 0) as failures,
+            ROUND(100.0 * SUM(ii.passed = 0) / COUNT(*), 1) as failure_rate
+        FROM inspection_items ii
+        {joins}
+        {where}
+        GROUP BY {group_columns}
+        ORDER BY failure_rate DESC, failures DESC
+    """
+
+
+def _since_filter(since, where=(), params=()):
+    """Join/WHERE fragments limiting items to inspections on or after since (date or ISO text)."""
+    where, params = list(where), list(params)
+    joins = ""
+    if since:
+        joins = "JOIN inspections i ON i.id = ii.inspection_id"
+        where.append("i.inspection_day >= ?")
+        params.append(day_number(date.fromisoformat(since) if isinstance(since, str) else since))
+    return joins, ("WHERE " + " AND ".join(where)) if where else "", params
+
+
+@cached
+def get_inspection_items(inspection_id):
+    """Return the per-equipment results recorded for one inspection."""
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT equipment_id, equipment_type, passed
+            FROM inspection_items
+            WHERE inspection_id = ?
+            ORDER BY equipment_id
+        """, conn, params=[inspection_id])
+    return df
+
+
+def get_items_for_inspections(inspection_ids):
+    """Return recorded items for many inspections, ordered by inspection then equipment."""
+    ids = [int(i) for i in inspection_ids]
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            SELECT inspection_id, equipment_id, equipment_type, passed
+            FROM inspection_items
+            WHERE inspection_id IN ({",".join("?" * len(ids))})
+            ORDER BY inspection_id, equipment_id
+        """, conn, params=ids)
+    return df
+
+
+@cached
+def get_equipment_history(equipment_id):
+    """Return every recorded check of one equipment item, newest first."""
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT i.id as inspection_id, i.inspection_date, i.technician, ii.passed
+            FROM inspection_items ii
+            JOIN inspections i ON i.id = ii.inspection_id
+            WHERE ii.equipment_id = ?
+            ORDER BY i.inspection_date DESC, i.id DESC
+        """, conn, params=[equipment_id])
+    return df
+
+
+@cached
+def get_failure_rate_by_equipment(building_id=None, since=None):
+    """Return failure rate per equipment item, optionally for one building."""
+    if building_id is None:
+        joins, where, params = _since_filter(since)
+    else:
+        joins, where, params = _since_filter(since, ["ii.building_id = ?"], [building_id])
+    with connection() as conn:
+        df = pd.read_sql_query(_failure_rate_query(
+            "ii.equipment_id",
+            "ii.equipment_id, ii.building_id, ii.equipment_type",
+            joins, where,
+        ), conn, params=params)
+    return df
+
+
+@cached
+def get_failure_rate_by_type(since=None):
+    """Return failure rate per equipment type."""
+    joins, where, params = _since_filter(since)
+    with connection() as conn:
+        df = pd.read_sql_query(_failure_rate_query(
+            "ii.equipment_type", "ii.equipment_type", joins, where,
+        ), conn, params=params)
+    return df
+
+
+@cached
+def get_failure_rate_by_building(since=None):
+    """Return failure rate per building."""
+    joins, where, params = _since_filter(since)
+    joins += """
+        JOIN buildings b ON b.id = ii.building_id
+        JOIN clients cl ON cl.id = b.client_id"""
+    with connection() as conn:
+        df = pd.read_sql_query(_failure_rate_query(
+            "ii.building_id",
+            "ii.building_id, b.name as building_name, cl.name as client_name",
+            joins, where,
+        ), conn, params=params)
+    return df
+
+
+# ---------------------------------------------------------------------------
+# BUILDING STATUS (materialized by triggers, see migrations.py)
+# ---------------------------------------------------------------------------
+
+_BUILDING_STATUS_COLUMNS = (
+    "building_id, contract_id, visits_per_year, equipment_count, "
+    "last_inspection_date, next_due_date, is_scheduled, last_inspection_day, next_due_day"
+)
+
+# What building_status should contain, computed from the base tables
+_BUILDING_STATUS_LIVE_QUERY = """
+    SELECT *,
+        CAST(julianday(last_inspection_date) - 2440587.5 AS INTEGER) as last_inspection_day,
+        CAST(julianday(next_due_date) - 2440587.5 AS INTEGER) as next_due_day
+    FROM (
+        SELECT
+            b.id as building_id,
+            c.id as contract_id,
+            c.visits_per_year,
+            (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id) as equipment_count,
+            li.last_date as last_inspection_date,
+            CASE
+                WHEN li.last_date IS NULL THEN '0001-01-01'
+                ELSE date(julianday(li.last_date) + 365.0 / c.visits_per_year)
+            END as next_due_date,
+            EXISTS (
+                SELECT 1 FROM scheduled_inspections si
+                WHERE si.building_id = b.id AND si.status = 'scheduled'
+            ) as is_scheduled
+        FROM buildings b
+        LEFT JOIN contracts c ON c.id = (
+            SELECT MAX(c2.id) FROM contracts c2
+            WHERE c2.building_id = b.id AND c2.status = 'active'
+        )
+        LEFT JOIN (
+            SELECT building_id, MAX(inspection_date) as last_date
+            FROM inspections GROUP BY building_id
+        ) li ON li.building_id = b.id
+    ) bs
+"""
+
+
+def rebuild_building_status():
+    """Recompute the whole building_status table (recovery). Returns rows written."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM building_status")
+        cursor = conn.execute(
+            f"INSERT INTO building_status ({_BUILDING_STATUS_COLUMNS}) "
+            + _BUILDING_STATUS_LIVE_QUERY
+        )
+    return cursor.rowcount
+
+
+def check_building_status():
+    """
+    Compare building_status with a live recomputation.
+    Returns the differing rows tagged 'live' or 'stored'; empty when consistent.
+    """
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            WITH live AS ({_BUILDING_STATUS_LIVE_QUERY}),
+            stored AS (SELECT {_BUILDING_STATUS_COLUMNS} FROM building_status)
+            SELECT 'live' as source, * FROM (SELECT * FROM live EXCEPT SELECT * FROM stored)
+            UNION ALL
+            SELECT 'stored' as source, * FROM (SELECT * FROM stored EXCEPT SELECT * FROM live)
+            ORDER BY building_id, source
+        """, conn)
+    return df
+
+
+@cached
+def get_status_engine():
+    """
+    Return a StatusEngine over building_status, for classifying every
+    building or forecasting overdue counts without further queries. The
+    overdue and upcoming lists above do not use it; see status_engine.
+    Reloaded after any write; the cached instance is shared, not copied.
+    """
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT bs.building_id, b.client_id, bs.last_inspection_day,
+                bs.visits_per_year, bs.is_scheduled
+            FROM building_status bs
+            JOIN buildings b ON b.id = bs.building_id
+            ORDER BY bs.building_id
+        """, conn)
+    return StatusEngine.from_frame(df)
+
+
 # ---------------------------------------------------------------------------
 # EQUIPMENT QUERIES
 # ---------------------------------------------------------------------------
 
+@cached
 def get_equipment_by_building(building_id):
     """Return all equipment for a building."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT * FROM equipment
-        WHERE building_id = ?
-        ORDER BY type, id
-    """, conn, params=[building_id])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT * FROM equipment
+            WHERE building_id = ?
+            ORDER BY type, id
+        """, conn, params=[building_id])
     return df
 
 
+def get_equipment_for_buildings(building_ids):
+    """Return all equipment for many buildings, in get_equipment_by_building order."""
+    ids = [int(i) for i in building_ids]
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            SELECT * FROM equipment
+            WHERE building_id IN ({",".join("?" * len(ids))})
+            ORDER BY building_id, type, id
+        """, conn, params=ids)
+    return df
+
+
+@cached
 def get_equipment_grouped_by_type(building_id):
     """Return equipment grouped by type with counts."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT type, COUNT(*) as count, GROUP_CONCAT(id) as item_ids
-        FROM equipment
-        WHERE building_id = ?
-        GROUP BY type
-        ORDER BY type
-    """, conn, params=[building_id])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT type, COUNT(*) as count, GROUP_CONCAT(id) as item_ids
+            FROM equipment
+            WHERE building_id = ?
+            GROUP BY type
+            ORDER BY type
+        """, conn, params=[building_id])
     return df
 
 
@@ -472,37 +1175,59 @@ def get_equipment_grouped_by_type(building_id):
 # COMPLAINT QUERIES
 # ---------------------------------------------------------------------------
 
+@cached
 def get_all_complaints():
     """Return all complaints with client/building info."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT comp.*, cl.name as client_name, cl.short_name,
-            b.name as building_name
-        FROM complaints comp
-        JOIN clients cl ON cl.id = comp.client_id
-        JOIN buildings b ON b.id = comp.building_id
-        ORDER BY comp.created_at DESC
-    """, conn)
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT comp.*, cl.name as client_name, cl.short_name,
+                b.name as building_name
+            FROM complaints comp
+            JOIN clients cl ON cl.id = comp.client_id
+            JOIN buildings b ON b.id = comp.building_id
+            ORDER BY comp.created_at DESC
+        """, conn)
     return df
 
 
+@cached
 def get_recent_complaints(limit=5):
     """Return the most recent complaints."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT comp.*, cl.name as client_name, cl.short_name,
-            b.name as building_name
-        FROM complaints comp
-        JOIN clients cl ON cl.id = comp.client_id
-        JOIN buildings b ON b.id = comp.building_id
-        ORDER BY comp.created_at DESC
-        LIMIT ?
-    """, conn, params=[limit])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT comp.*, cl.name as client_name, cl.short_name,
+                b.name as building_name
+            FROM complaints comp
+            JOIN clients cl ON cl.id = comp.client_id
+            JOIN buildings b ON b.id = comp.building_id
+            ORDER BY comp.created_at DESC
+            LIMIT ?
+        """, conn, params=[limit])
     return df
 
 
+_COMPLAINTS_PAGE = """
+    SELECT comp.*, cl.name as client_name, cl.short_name,
+        b.name as building_name
+    FROM complaints comp
+    JOIN clients cl ON cl.id = comp.client_id
+    JOIN buildings b ON b.id = comp.building_id
+    {where}
+    ORDER BY comp.created_at {order}, comp.id {order}
+    LIMIT ?
+"""
+
+
+@cached
+def get_complaints_page(cursor=None, direction="next", page_size=PAGE_SIZE):
+    """Return one Page of complaints, newest first, keyed on (created_at, id)."""
+    return _keyset_page(
+        _COMPLAINTS_PAGE, (("comp.created_at", "created_at"), ("comp.id", "id")),
+        cursor, direction, page_size,
+    )
+
+
+@cached
 def get_complaints_by_month(year, month):
     """Return complaints for a specific year/month."""
     month_start = f"{year}-{month:02d}-01"
@@ -510,69 +1235,498 @@ def get_complaints_by_month(year, month):
         month_end = f"{year + 1}-01-01"
     else:
         month_end = f"{year}-{month + 1:02d}-01"
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT comp.*, cl.name as client_name, b.name as building_name
-        FROM complaints comp
-        JOIN clients cl ON cl.id = comp.client_id
-        JOIN buildings b ON b.id = comp.building_id
-        WHERE comp.created_at >= ? AND comp.created_at < ?
-        ORDER BY comp.created_at DESC
-    """, conn, params=[month_start, month_end])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT comp.*, cl.name as client_name, b.name as building_name
+            FROM complaints comp
+            JOIN clients cl ON cl.id = comp.client_id
+            JOIN buildings b ON b.id = comp.building_id
+            WHERE comp.created_at >= ? AND comp.created_at < ?
+            ORDER BY comp.created_at DESC
+        """, conn, params=[month_start, month_end])
     return df
 
 
+def _reserve_ticket_numbers(conn, count, year):
+    """
+    Reserve `count` consecutive ticket numbers for `year` in one statement.
+    Must run inside the caller's write transaction; the sequence row stays
+    locked until it commits, so concurrent writers never see the same range.
+    """
+    last = conn.execute("""
+        INSERT INTO ticket_sequences (year, last_value) VALUES (?, ?)
+        ON CONFLICT (year) DO UPDATE SET last_value = last_value + excluded.last_value
+        RETURNING last_value
+    """, (year, count)).fetchone()[0]
+    return [f"TTS-{year}-{n:04d}" for n in range(last - count + 1, last + 1)]
+
+
+def allocate_ticket_numbers(count=1, year=None):
+    """Reserve and return `count` ticket numbers without creating complaints."""
+    year = year or date.today().year
+    with transaction() as conn:
+        tickets = _reserve_ticket_numbers(conn, count, year)
+    return tickets
+
+
 def insert_complaint(client_id, building_id, message, priority,
                      assigned_technician=None, inspection_id=None):
     """Insert a new complaint. Auto-generates ticket number. Returns ticket_number."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    return insert_complaints([{
+        "client_id": client_id,
+        "building_id": building_id,
+        "message": message,
+        "priority": priority,
+        "assigned_technician": assigned_technician,
+        "inspection_id": inspection_id,
+    }])[0]
+
+
+def insert_complaints(complaints):
+    """
+    Insert several complaints in one transaction, reserving all their
+    ticket numbers with a single sequence update.
+
+    Args:
+        complaints: List of dicts with keys client_id, building_id, message,
+            priority and optional assigned_technician, inspection_id
+
+    Returns:
+        list: Ticket numbers, in the same order as `complaints`
+    """
+    if not complaints:
+        return []
     year = date.today().year
-    cursor.execute(
-        "SELECT COUNT(*) FROM complaints WHERE ticket_number LIKE ?",
-        (f"TTS-{year}-%",)
+    with transaction() as conn:
+        tickets = _reserve_ticket_numbers(conn, len(complaints), year)
+        rows = []
+        for ticket_number, comp in zip(tickets, complaints):
+            assigned_technician = comp.get("assigned_technician")
+            status = "assigned" if assigned_technician else "open"
+            rows.append((
+                ticket_number, comp["client_id"], comp["building_id"],
+                comp["message"], comp["priority"], status,
+                assigned_technician, comp.get("inspection_id"),
+            ))
+        conn.executemany("""
+            INSERT INTO complaints
+                (ticket_number, client_id, building_id, message, priority,
+                 status, assigned_technician, inspection_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    return tickets
+
+
+# ---------------------------------------------------------------------------
+# MONTHLY ROLLUP (materialized by triggers, see migrations.py)
+# ---------------------------------------------------------------------------
+
+_MONTHLY_ROLLUP_COUNTS = [
+    "inspection_count", "items_checked", "items_passed", "items_failed",
+    "complaint_count", "complaints_high", "complaints_medium", "complaints_low",
+    "complaints_open", "complaints_in_progress", "complaints_resolved",
+]
+_MONTHLY_ROLLUP_COLUMNS = "month, building_id, client_id, " + ", ".join(_MONTHLY_ROLLUP_COUNTS)
+
+# What monthly_rollup should contain, computed from inspections and complaints
+_MONTHLY_ROLLUP_LIVE_QUERY = f"""
+    SELECT month, building_id, client_id,
+        {", ".join(f"SUM({name}) as {name}" for name in _MONTHLY_ROLLUP_COUNTS)}
+    FROM (
+        SELECT
+            substr(i.inspection_date, 1, 7) as month, i.building_id, b.client_id,
+            1 as inspection_count,
+            COALESCE(i.items_checked, 0) as items_checked,
+            COALESCE(i.items_passed, 0) as items_passed,
+            COALESCE(i.items_failed, 0) as items_failed,
+            0 as complaint_count, 0 as complaints_high, 0 as complaints_medium,
+            0 as complaints_low, 0 as complaints_open, 0 as complaints_in_progress,
+            0 as complaints_resolved
+        FROM inspections i
+        JOIN buildings b ON b.id = i.building_id
+        UNION ALL
+        SELECT
+            substr(comp.created_at, 1, 7), comp.building_id, b.client_id,
+            0, 0, 0, 0,
+            1, comp.priority = 'high', comp.priority = 'medium', comp.priority = 'low',
+            comp.status = 'open', comp.status = 'in_progress', comp.status = 'resolved'
+        FROM complaints comp
+        JOIN buildings b ON b.id = comp.building_id
+        WHERE comp.created_at IS NOT NULL
     )
-    count = cursor.fetchone()[0]
-    ticket_number = f"TTS-{year}-{count + 1:04d}"
+    GROUP BY month, building_id, client_id
+"""
+
+
+def rebuild_monthly_rollup():
+    """Recompute the whole monthly_rollup table (recovery). Returns rows written."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM monthly_rollup")
+        cursor = conn.execute(
+            f"INSERT INTO monthly_rollup ({_MONTHLY_ROLLUP_COLUMNS}) "
+            + _MONTHLY_ROLLUP_LIVE_QUERY
+        )
+    return cursor.rowcount
+
+
+def check_monthly_rollup():
+    """
+    Compare monthly_rollup with a live recomputation.
+    Returns the differing rows tagged 'live' or 'stored'; empty when consistent.
+    """
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            WITH live AS ({_MONTHLY_ROLLUP_LIVE_QUERY}),
+            stored AS (
+                SELECT {_MONTHLY_ROLLUP_COLUMNS} FROM monthly_rollup
+                -- rows left at zero when their last inspection/complaint is removed
+                WHERE {" OR ".join(f"{name} != 0" for name in _MONTHLY_ROLLUP_COUNTS)}
+            )
+            SELECT 'live' as source, * FROM (SELECT * FROM live EXCEPT SELECT * FROM stored)
+            UNION ALL
+            SELECT 'stored' as source, * FROM (SELECT * FROM stored EXCEPT SELECT * FROM live)
+            ORDER BY month, building_id, source
+        """, conn)
+    return df
+
+
+def _month_key(year, month):
+    return f"{year}-{month:02d}"
+
+
+_MONTHLY_ROLLUP_SUMS = ", ".join(f"TOTAL({name}) as {name}" for name in _MONTHLY_ROLLUP_COUNTS)
+
+
+@cached
+def get_month_rollup(year, month, client_id=None):
+    """Return one month's inspection and complaint counts as a dict."""
+    client_filter = "AND client_id = ?" if client_id is not None else ""
+    params = [_month_key(year, month)] + ([client_id] if client_id is not None else [])
+    with connection() as conn:
+        row = conn.execute(f"""
+            SELECT {_MONTHLY_ROLLUP_SUMS}
+            FROM monthly_rollup
+            WHERE month = ? {client_filter}
+        """, params).fetchone()
+    return {name: int(row[name]) for name in _MONTHLY_ROLLUP_COUNTS}
+
+
+@cached
+def get_month_rollup_by_client(year, month):
+    """Return one month's counts per client, for clients with any activity."""
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            SELECT r.client_id, cl.name as client_name, cl.short_name,
+                {", ".join(f"SUM(r.{name}) as {name}" for name in _MONTHLY_ROLLUP_COUNTS)}
+            FROM monthly_rollup r
+            JOIN clients cl ON cl.id = r.client_id
+            WHERE r.month = ?
+            GROUP BY r.client_id
+            HAVING SUM(r.inspection_count) > 0 OR SUM(r.complaint_count) > 0
+            ORDER BY cl.name
+        """, conn, params=[_month_key(year, month)])
+    return df
+
+
+@cached
+def get_monthly_trend(months=24, client_id=None):
+    """
+    Return counts per month for the last N months (this month included),
+    oldest first. Months without activity are present with zero counts.
+    """
+    today = date.today()
+    keys = []
+    for i in range(months - 1, -1, -1):
+        y, m = divmod(today.year * 12 + today.month - 1 - i, 12)
+        keys.append(_month_key(y, m + 1))
+    client_filter = "AND client_id = ?" if client_id is not None else ""
+    params = [keys[0], keys[-1]] + ([client_id] if client_id is not None else [])
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            SELECT month, {_MONTHLY_ROLLUP_SUMS}
+            FROM monthly_rollup
+            WHERE month BETWEEN ? AND ? {client_filter}
+            GROUP BY month
+        """, conn, params=params)
+    df = df.set_index("month").reindex(keys, fill_value=0).astype(int)
+    return df.rename_axis("month").reset_index()
+
+
+# ---------------------------------------------------------------------------
+# BULK LOADING
+# ---------------------------------------------------------------------------
+
+# Triggers that keep derived tables current row by row. bulk_load drops
+# them for the load and rebuilds the tables once at the end instead.
+_DERIVED_TABLE_TRIGGERS = (
+    "trg_building_status_*", "trg_contract_ledger_*", "trg_monthly_rollup_*", "trg_day_number_*",
+)
+
+
+@contextmanager
+def bulk_load():
+    """
+    Yield a connection for loading many rows in one write transaction.
+
+    synchronous is OFF for the duration, and the building_status,
+    contract_ledger, monthly_rollup and day-number triggers are dropped.
+    On success the triggers are re-created, the three tables rebuilt and
+    the day numbers filled in before the commit; on error everything,
+    triggers included, rolls back. Stored compliance snapshots are not
+    revisited.
+    """
+    with connection() as conn:
+        if conn.in_transaction:
+            raise RuntimeError("bulk_load cannot join an open transaction")
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        # Cannot be changed inside a transaction
+        conn.execute("PRAGMA synchronous = OFF")
+        try:
+            with transaction():
+                triggers = conn.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND ("
+                    + " OR ".join("name GLOB ?" for _ in _DERIVED_TABLE_TRIGGERS) + ")",
+                    _DERIVED_TABLE_TRIGGERS,
+                ).fetchall()
+                for name, _ in triggers:
+                    conn.execute(f"DROP TRIGGER {name}")
+                yield conn
+                for _, sql in triggers:
+                    conn.execute(sql)
+                rebuild_building_status()
+                rebuild_contract_ledger()
+                rebuild_monthly_rollup()
+                update_day_numbers(conn)
+        finally:
+            conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+
+
+# ---------------------------------------------------------------------------
+# COMPLIANCE SNAPSHOTS
+# ---------------------------------------------------------------------------
+
+# Building status as it stood on :day, reconstructed from history: the
+# latest contract in force (started by then and still active, or running
+# through that day), inspections up to that day, and
+# visits booked by then that had not yet taken place. Same rules as
+# building_status and the Dashboard (due soon = within 14 days).
+_COMPLIANCE_AS_OF_QUERY = """
+    -- MATERIALIZED: otherwise each use of last_inspection_date below
+    -- re-runs its correlated lookup
+    WITH building AS MATERIALIZED (
+        SELECT
+            b.id as building_id,
+            b.client_id,
+            c.visits_per_year,
+            (
+                SELECT MAX(i.inspection_date) FROM inspections i
+                WHERE i.building_id = b.id AND i.inspection_date <= :day
+            ) as last_inspection_date,
+            EXISTS (
+                SELECT 1 FROM scheduled_inspections si
+                WHERE si.building_id = b.id
+                AND COALESCE(substr(si.created_at, 1, 10), '') <= :day
+                AND (si.status = 'scheduled' OR si.scheduled_date >= :day)
+            ) as is_scheduled
+        FROM buildings b
+        JOIN contracts c ON c.id = (
+            SELECT MAX(c2.id) FROM contracts c2
+            WHERE c2.building_id = b.id AND c2.start_date <= :day
+            AND (c2.status = 'active' OR c2.end_date >= :day)
+        )
+    ),
+    due AS MATERIALIZED (
+        SELECT *,
+            CASE
+                WHEN last_inspection_date IS NULL THEN '0001-01-01'
+                ELSE date(julianday(last_inspection_date) + 365.0 / visits_per_year)
+            END as next_due_date
+        FROM building
+    )
+    SELECT
+        :day as snapshot_date,
+        building_id,
+        client_id,
+        CASE
+            WHEN next_due_date < :day THEN 'overdue'
+            WHEN (365.0 / visits_per_year)
+                - (julianday(:day) - julianday(last_inspection_date)) <= 14 THEN 'due_soon'
+            ELSE 'ok'
+        END as status,
+        is_scheduled,
+        last_inspection_date,
+        next_due_date,
+        CASE
+            WHEN last_inspection_date IS NULL THEN NULL
+            WHEN next_due_date < :day
+                THEN CAST(julianday(:day) - julianday(next_due_date) AS INTEGER)
+            ELSE 0
+        END as overdue_days
+    FROM due
+"""
 
-    status = "assigned" if assigned_technician else "open"
-    cursor.execute("""
-        INSERT INTO complaints
-            (ticket_number, client_id, building_id, message, priority,
-             status, assigned_technician, inspection_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (ticket_number, client_id, building_id, message, priority,
-          status, assigned_technician, inspection_id))
-    conn.commit()
-    conn.close()
-    return ticket_number
+_CLIENT_COMPLIANCE_ROLLUP = """
+    SELECT
+        snapshot_date,
+        client_id,
+        COUNT(*) as buildings,
+        SUM(status = 'ok') as ok,
+        SUM(status = 'due_soon') as due_soon,
+        SUM(status = 'overdue') as overdue,
+        SUM(status = 'overdue' AND is_scheduled = 0) as overdue_unscheduled,
+        SUM(last_inspection_date IS NULL) as never_inspected,
+        TOTAL(overdue_days) as overdue_days
+    FROM ({source})
+    GROUP BY snapshot_date, client_id
+"""
+
+_COMPLIANCE_TREND_COUNTS = [
+    "buildings", "ok", "due_soon", "overdue", "overdue_unscheduled",
+    "never_inspected", "overdue_days",
+]
+
+_snapshots_recorded_through = None  # last day record_daily_compliance_snapshot stored
+
+
+def take_compliance_snapshot(day, replace=False):
+    """
+    Store the compliance snapshot for one day (date or ISO string).
+    Idempotent: a day already stored is left alone unless replace is set.
+    Returns the number of buildings written, or None when skipped.
+    """
+    day = day if isinstance(day, str) else day.isoformat()
+    with transaction() as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM client_compliance_snapshots WHERE snapshot_date = ? LIMIT 1", (day,)
+        ).fetchone()
+        if exists and not replace:
+            return None
+        conn.execute("DELETE FROM compliance_snapshots WHERE snapshot_date = ?", (day,))
+        conn.execute("DELETE FROM client_compliance_snapshots WHERE snapshot_date = ?", (day,))
+        cursor = conn.execute(
+            "INSERT INTO compliance_snapshots " + _COMPLIANCE_AS_OF_QUERY, {"day": day}
+        )
+        conn.execute(
+            "INSERT INTO client_compliance_snapshots "
+            + _CLIENT_COMPLIANCE_ROLLUP.format(
+                source="SELECT * FROM compliance_snapshots WHERE snapshot_date = :day"
+            ),
+            {"day": day},
+        )
+    return cursor.rowcount
+
+
+def backfill_compliance_snapshots(start, end, replace=False):
+    """
+    Store snapshots for every day from start to end inclusive (dates),
+    skipping days already stored. Returns {"written": days, "skipped": days}.
+    """
+    written = skipped = 0
+    day = start
+    while day <= end:
+        if take_compliance_snapshot(day, replace) is None:
+            skipped += 1
+        else:
+            written += 1
+        day += timedelta(days=1)
+    return {"written": written, "skipped": skipped}
+
+
+def record_compliance_snapshots(days=90):
+    """
+    Fill in any missing closed days (up to yesterday) in the last N days.
+    Can write N days of snapshots, so it runs from bootstrap() after
+    seeding and from manage.py snapshot-compliance --backfill, never from
+    a page.
+    """
+    yesterday = date.today() - timedelta(days=1)
+    start = yesterday - timedelta(days=days - 1)
+    with connection() as conn:
+        stored = conn.execute(
+            "SELECT COUNT(DISTINCT snapshot_date) FROM client_compliance_snapshots "
+            "WHERE snapshot_date BETWEEN ? AND ?",
+            (start.isoformat(), yesterday.isoformat()),
+        ).fetchone()[0]
+    if stored < days:
+        backfill_compliance_snapshots(start, yesterday)
+
+
+def record_daily_compliance_snapshot():
+    """
+    Store yesterday's snapshot if it is missing. Writes at most one day,
+    on the first call of the day in this process; pages call it before
+    reading the trend so the newest closed day is there without a
+    scheduled job.
+    """
+    global _snapshots_recorded_through
+    yesterday = date.today() - timedelta(days=1)
+    if _snapshots_recorded_through == yesterday:
+        return
+    take_compliance_snapshot(yesterday)
+    _snapshots_recorded_through = yesterday
+
+
+@cached
+def get_compliance_trend(days=90, client_id=None):
+    """
+    Return compliance counts per day for the last N days, oldest first:
+    stored snapshots for past days plus a live point for today. Adds
+    compliance_pct, the share of contracted buildings not overdue. Days
+    without a snapshot are present with missing (NaN) values.
+    """
+    with connection() as conn:
+        return _compliance_trend(conn, date.today(), days, client_id)
+
+
+def _compliance_trend(conn, day, days, client_id=None):
+    """get_compliance_trend for the N days ending on day, on an open connection."""
+    start = day - timedelta(days=days - 1)
+    client_filter = "AND client_id = :client_id" if client_id is not None else ""
+    sums = ", ".join(f"SUM({name}) as {name}" for name in _COMPLIANCE_TREND_COUNTS)
+    params = {"start": start.isoformat(), "day": day.isoformat(), "client_id": client_id}
+    df = pd.read_sql_query(f"""
+        SELECT snapshot_date, {sums}
+        FROM client_compliance_snapshots
+        WHERE snapshot_date >= :start AND snapshot_date < :day {client_filter}
+        GROUP BY snapshot_date
+        UNION ALL
+        SELECT snapshot_date, {sums}
+        FROM ({_CLIENT_COMPLIANCE_ROLLUP.format(source=_COMPLIANCE_AS_OF_QUERY)})
+        WHERE 1 {client_filter}
+        GROUP BY snapshot_date
+    """, conn, params=params)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    df = df.set_index("snapshot_date").reindex(dates)
+    df["compliance_pct"] = (
+        (df["buildings"] - df["overdue"]) / df["buildings"].where(df["buildings"] > 0) * 100
+    )
+    return df.rename_axis("snapshot_date").reset_index()
 
 
 # ---------------------------------------------------------------------------
 # CONTRACT QUERIES
 # ---------------------------------------------------------------------------
 
+@cached
 def get_active_contracts_count():
     """Return count of active contracts."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM contracts WHERE status = 'active'")
-    count = cursor.fetchone()[0]
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM contracts WHERE status = 'active'")
+        count = cursor.fetchone()[0]
     return count
 
 
+@cached
 def get_contract_by_building(building_id):
     """Return the active contract for a building."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM contracts
-        WHERE building_id = ? AND status = 'active'
-    """, (building_id,))
-    row = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM contracts
+            WHERE building_id = ? AND status = 'active'
+        """, (building_id,))
+        row = cursor.fetchone()
     return dict(row) if row else None
 
 
@@ -582,43 +1736,42 @@ def get_contract_by_building(building_id):
 
 def schedule_inspection(building_id, scheduled_date, assigned_technician):
     """Schedule an inspection for an overdue building."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO scheduled_inspections
-            (building_id, scheduled_date, assigned_technician)
-        VALUES (?, ?, ?)
-    """, (building_id, scheduled_date, assigned_technician))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO scheduled_inspections
+                (building_id, scheduled_date, assigned_technician)
+            VALUES (?, ?, ?)
+        """, (building_id, scheduled_date, assigned_technician))
+        conn.commit()
 
 
+@cached
 def get_scheduled_inspections():
     """Return all scheduled (not yet completed) inspections."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT si.*, b.name as building_name, b.area,
-            cl.name as client_name, cl.short_name
-        FROM scheduled_inspections si
-        JOIN buildings b ON b.id = si.building_id
-        JOIN clients cl ON cl.id = b.client_id
-        WHERE si.status = 'scheduled'
-        ORDER BY si.scheduled_date ASC
-    """, conn)
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT si.*, b.name as building_name, b.area,
+                cl.name as client_name, cl.short_name
+            FROM scheduled_inspections si
+            JOIN buildings b ON b.id = si.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            WHERE si.status = 'scheduled'
+            ORDER BY si.scheduled_date ASC
+        """, conn)
     return df
 
 
+@cached
 def is_building_scheduled(building_id):
     """Check if a building has a pending scheduled inspection."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT COUNT(*) FROM scheduled_inspections
-        WHERE building_id = ? AND status = 'scheduled'
-    """, (building_id,))
-    count = cursor.fetchone()[0]
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM scheduled_inspections
+            WHERE building_id = ? AND status = 'scheduled'
+        """, (building_id,))
+        count = cursor.fetchone()[0]
     return count > 0
 
 
@@ -626,205 +1779,386 @@ def is_building_scheduled(building_id):
 # FINANCIAL QUERIES
 # ---------------------------------------------------------------------------
 
+@cached
 def get_financial_summary():
     """
     Return overall financial summary:
     total_contract_value, total_collected, total_outstanding, total_overdue
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT COALESCE(SUM(annual_value), 0) FROM contracts WHERE status = 'active'
-    """)
-    total_contract_value = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COALESCE(SUM(p.amount), 0)
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        WHERE p.status = 'received' AND c.status = 'active'
-    """)
-    total_collected = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COALESCE(SUM(p.amount), 0)
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        WHERE p.status = 'overdue' AND c.status = 'active'
-    """)
-    total_overdue = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COUNT(*)
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        WHERE p.status IN ('pending', 'overdue') AND c.status = 'active'
-    """)
-    outstanding_count = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COUNT(*)
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        WHERE p.status = 'overdue' AND c.status = 'active'
-    """)
-    overdue_count = cursor.fetchone()[0]
-
-    total_outstanding = total_contract_value - total_collected
-
-    conn.close()
+    with connection() as conn:
+        row = conn.execute(f"""
+            SELECT {_FINANCIAL_TOTALS_COLUMNS}
+            FROM contracts c
+            LEFT JOIN contract_ledger l ON l.contract_id = c.id
+            WHERE c.status = 'active'
+        """).fetchone()
+    return _financial_summary(row)
+
+
+# Totals over active contracts (c) joined to their ledger rows (l): one
+# pass, since contract_ledger already holds per-status payment totals
+_FINANCIAL_TOTALS_COLUMNS = """
+    COALESCE(SUM(c.annual_value), 0) as total_contract_value,
+    COALESCE(SUM(l.received_amount), 0) as total_collected,
+    COALESCE(SUM(l.pending_amount), 0) as total_pending,
+    COALESCE(SUM(l.overdue_amount), 0) as total_overdue,
+    COALESCE(SUM(l.pending_count + l.overdue_count), 0) as outstanding_count,
+    COALESCE(SUM(l.overdue_count), 0) as overdue_count
+"""
+
+
+def _financial_summary(row):
+    """The get_financial_summary dict for a row of _FINANCIAL_TOTALS_COLUMNS."""
+    total_contract_value = row["total_contract_value"]
+    total_collected = row["total_collected"]
     return {
         "total_contract_value": total_contract_value,
         "total_collected": total_collected,
-        "total_outstanding": total_outstanding,
-        "total_overdue": total_overdue,
-        "outstanding_count": outstanding_count,
-        "overdue_count": overdue_count,
+        "total_outstanding": total_contract_value - total_collected,
+        "total_pending": row["total_pending"],
+        "total_overdue": row["total_overdue"],
+        "outstanding_count": row["outstanding_count"],
+        "overdue_count": row["overdue_count"],
         "collection_pct": (total_collected / total_contract_value * 100)
         if total_contract_value > 0 else 0,
     }
 
 
+_CONTRACT_LEDGER_COLUMNS = (
+    "contract_id, billed_amount, received_amount, pending_amount, overdue_amount, "
+    "payment_count, received_count, pending_count, overdue_count"
+)
+
+# What contract_ledger should contain, computed from payments
+_CONTRACT_LEDGER_LIVE_QUERY = """
+    SELECT
+        contract_id,
+        SUM(amount) as billed_amount,
+        TOTAL(CASE WHEN status = 'received' THEN amount END) as received_amount,
+        TOTAL(CASE WHEN status = 'pending' THEN amount END) as pending_amount,
+        TOTAL(CASE WHEN status = 'overdue' THEN amount END) as overdue_amount,
+        COUNT(*) as payment_count,
+        SUM(status = 'received') as received_count,
+        SUM(status = 'pending') as pending_count,
+        SUM(status = 'overdue') as overdue_count
+    FROM payments
+    GROUP BY contract_id
+"""
+
+
+def rebuild_contract_ledger():
+    """Recompute the whole contract_ledger table (recovery). Returns rows written."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM contract_ledger")
+        cursor = conn.execute(
+            f"INSERT INTO contract_ledger ({_CONTRACT_LEDGER_COLUMNS}) "
+            + _CONTRACT_LEDGER_LIVE_QUERY
+        )
+    return cursor.rowcount
+
+
+def check_contract_ledger():
+    """
+    Compare contract_ledger with a live recomputation from payments.
+    Amounts are compared to the fils, so float drift from incremental
+    updates is not reported. Returns the differing rows tagged 'live' or
+    'stored'; empty when consistent.
+    """
+    rounded = (
+        "contract_id, ROUND(billed_amount, 2), ROUND(received_amount, 2), "
+        "ROUND(pending_amount, 2), ROUND(overdue_amount, 2), "
+        "payment_count, received_count, pending_count, overdue_count"
+    )
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            WITH live AS (SELECT {rounded} FROM ({_CONTRACT_LEDGER_LIVE_QUERY})),
+            stored AS (
+                SELECT {rounded} FROM contract_ledger
+                -- rows left behind when a contract's last payment is deleted
+                WHERE payment_count != 0
+            )
+            SELECT 'live' as source, * FROM (SELECT * FROM live EXCEPT SELECT * FROM stored)
+            UNION ALL
+            SELECT 'stored' as source, * FROM (SELECT * FROM stored EXCEPT SELECT * FROM live)
+            ORDER BY 2, source
+        """, conn)
+    df.columns = ["source"] + _CONTRACT_LEDGER_COLUMNS.split(", ")
+    return df
+
+
+# Per-client rollup over active contracts and their ledger rows: one pass,
+# with contract value summed per contract (not DISTINCT per value).
+_CLIENT_FINANCIAL_ROLLUP = """
+    WITH client_contracts AS (
+        SELECT
+            b.client_id,
+            TOTAL(CASE WHEN c.status = 'active' THEN c.annual_value END) as total_value,
+            TOTAL(CASE WHEN c.status = 'active' THEN l.received_amount END) as total_paid,
+            TOTAL(l.overdue_count) as overdue_count
+        FROM contracts c
+        JOIN buildings b ON b.id = c.building_id
+        LEFT JOIN contract_ledger l ON l.contract_id = c.id
+        {where}
+        GROUP BY b.client_id
+    )
+    SELECT
+        cl.id as client_id,
+        cl.name as client_name,
+        COALESCE(cc.total_value, 0) as total_value,
+        COALESCE(cc.total_paid, 0) as total_paid,
+        COALESCE(cc.total_value, 0) - COALESCE(cc.total_paid, 0) as outstanding,
+        COALESCE(cc.overdue_count, 0) > 0 as has_overdue
+    FROM clients cl
+    LEFT JOIN client_contracts cc ON cc.client_id = cl.id
+"""
+
+
+@cached
 def get_client_financial_breakdown():
     """Return per-client financial breakdown."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT
-            cl.name as "Client",
-            COALESCE(SUM(DISTINCT c.annual_value), 0) as "Contract Value (AED)",
-            COALESCE(
-                (SELECT SUM(p.amount)
-                 FROM payments p
-                 JOIN contracts c2 ON c2.id = p.contract_id
-                 JOIN buildings b2 ON b2.id = c2.building_id
-                 WHERE b2.client_id = cl.id AND p.status = 'received' AND c2.status = 'active'),
-                0
-            ) as "Paid (AED)",
-            COALESCE(SUM(DISTINCT c.annual_value), 0) -
-            COALESCE(
-                (SELECT SUM(p.amount)
-                 FROM payments p
-                 JOIN contracts c2 ON c2.id = p.contract_id
-                 JOIN buildings b2 ON b2.id = c2.building_id
-                 WHERE b2.client_id = cl.id AND p.status = 'received' AND c2.status = 'active'),
-                0
-            ) as "Outstanding (AED)",
-            CASE
-                WHEN COALESCE(
-                    (SELECT SUM(p.amount)
-                     FROM payments p
-                     JOIN contracts c2 ON c2.id = p.contract_id
-                     JOIN buildings b2 ON b2.id = c2.building_id
-                     WHERE b2.client_id = cl.id AND p.status = 'received' AND c2.status = 'active'),
-                    0
-                ) >= COALESCE(SUM(DISTINCT c.annual_value), 0) THEN 'Fully Paid'
-                WHEN EXISTS (
-                    SELECT 1 FROM payments p
-                    JOIN contracts c2 ON c2.id = p.contract_id
-                    JOIN buildings b2 ON b2.id = c2.building_id
-                    WHERE b2.client_id = cl.id AND p.status = 'overdue'
-                ) THEN 'Payment Overdue'
-                ELSE 'Partially Paid'
-            END as "Status"
-        FROM clients cl
-        LEFT JOIN buildings b ON b.client_id = cl.id
-        LEFT JOIN contracts c ON c.building_id = b.id AND c.status = 'active'
-        GROUP BY cl.id
-        ORDER BY "Contract Value (AED)" DESC
-    """, conn)
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query(f"""
+            SELECT
+                client_name as "Client",
+                total_value as "Contract Value (AED)",
+                total_paid as "Paid (AED)",
+                outstanding as "Outstanding (AED)",
+                CASE
+                    WHEN total_paid >= total_value THEN 'Fully Paid'
+                    WHEN has_overdue THEN 'Payment Overdue'
+                    ELSE 'Partially Paid'
+                END as "Status"
+            FROM ({_CLIENT_FINANCIAL_ROLLUP.format(where="")})
+            ORDER BY "Contract Value (AED)" DESC
+        """, conn)
     return df
 
 
+@cached
 def get_payment_history(limit=20):
     """Return recent payment records."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT
-            p.payment_date as "Date",
-            cl.name as "Client",
-            b.name as "Building",
-            p.amount as "Amount (AED)",
-            p.method as "Method",
-            p.reference_number as "Reference",
-            p.status as "Status"
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        JOIN buildings b ON b.id = c.building_id
-        JOIN clients cl ON cl.id = b.client_id
-        ORDER BY p.payment_date DESC
-        LIMIT ?
-    """, conn, params=[limit])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT
+                p.payment_date as "Date",
+                cl.name as "Client",
+                b.name as "Building",
+                p.amount as "Amount (AED)",
+                p.method as "Method",
+                p.reference_number as "Reference",
+                p.status as "Status"
+            FROM payments p
+            JOIN contracts c ON c.id = p.contract_id
+            JOIN buildings b ON b.id = c.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            ORDER BY p.payment_date DESC, p.id DESC
+            LIMIT ?
+        """, conn, params=[limit])
     return df
 
 
+_PAYMENTS_PAGE = """
+    SELECT
+        p.id,
+        p.payment_date as "Date",
+        cl.name as "Client",
+        b.name as "Building",
+        p.amount as "Amount (AED)",
+        p.method as "Method",
+        p.reference_number as "Reference",
+        p.status as "Status"
+    FROM payments p
+    JOIN contracts c ON c.id = p.contract_id
+    JOIN buildings b ON b.id = c.building_id
+    JOIN clients cl ON cl.id = b.client_id
+    {where}
+    ORDER BY p.payment_date {order}, p.id {order}
+    LIMIT ?
+"""
+
+
+@cached
+def get_payments_page(cursor=None, direction="next", page_size=PAGE_SIZE):
+    """
+    Return one Page of payment records (get_payment_history columns plus
+    id), newest first, keyed on (payment_date, id).
+    """
+    return _keyset_page(
+        _PAYMENTS_PAGE, (("p.payment_date", "Date"), ("p.id", "id")),
+        cursor, direction, page_size,
+    )
+
+
+@cached
 def get_monthly_revenue(months=6):
     """Return monthly revenue aggregation for the last N months."""
-    cutoff = (date.today() - timedelta(days=months * 30)).isoformat()
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT
-            strftime('%Y-%m', p.payment_date) as month,
-            SUM(p.amount) as total
-        FROM payments p
-        WHERE p.status = 'received' AND p.payment_date >= ?
-        GROUP BY strftime('%Y-%m', p.payment_date)
-        ORDER BY month ASC
-    """, conn, params=[cutoff])
-    conn.close()
+    cutoff = day_number(date.today()) - months * 30
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT
+                strftime('%Y-%m', p.payment_date) as month,
+                SUM(p.amount) as total
+            FROM payments p
+            WHERE p.status = 'received' AND p.payment_day >= ?
+            GROUP BY strftime('%Y-%m', p.payment_date)
+            ORDER BY month ASC
+        """, conn, params=[cutoff])
     return df
 
 
+@cached
 def get_outstanding_invoices():
     """Return contracts with pending/overdue payments."""
-    conn = get_connection()
-    df = pd.read_sql_query("""
-        SELECT
-            cl.name as "Client",
-            b.name as "Building",
-            c.annual_value as "Contract Value (AED)",
-            p.amount as "Amount Due (AED)",
-            p.payment_date as "Due Date",
-            CAST(julianday(?) - julianday(p.payment_date) AS INTEGER) as "Days Overdue",
-            p.status as "Status"
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        JOIN buildings b ON b.id = c.building_id
-        JOIN clients cl ON cl.id = b.client_id
-        WHERE p.status IN ('pending', 'overdue') AND c.status = 'active'
-        ORDER BY p.payment_date ASC
-    """, conn, params=[date.today().isoformat()])
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT
+                cl.name as "Client",
+                b.name as "Building",
+                c.annual_value as "Contract Value (AED)",
+                p.amount as "Amount Due (AED)",
+                p.payment_date as "Due Date",
+                ? - p.payment_day as "Days Overdue",
+                p.status as "Status"
+            FROM payments p
+            JOIN contracts c ON c.id = p.contract_id
+            JOIN buildings b ON b.id = c.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            WHERE p.status IN ('pending', 'overdue') AND c.status = 'active'
+            ORDER BY p.payment_date ASC
+        """, conn, params=[day_number(date.today())])
     return df
 
 
+@cached
 def get_client_financial_detail(client_id):
     """Return financial details for a specific client."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        row = conn.execute(
+            _CLIENT_FINANCIAL_ROLLUP.format(where="WHERE b.client_id = :client_id")
+            + " WHERE cl.id = :client_id",
+            {"client_id": client_id},
+        ).fetchone()
+
+    if row is None:
+        return {"total_value": 0, "total_paid": 0, "outstanding": 0}
+    return {
+        "total_value": row["total_value"],
+        "total_paid": row["total_paid"],
+        "outstanding": row["outstanding"],
+    }
 
-    cursor.execute("""
-        SELECT COALESCE(SUM(c.annual_value), 0)
-        FROM contracts c
-        JOIN buildings b ON b.id = c.building_id
-        WHERE b.client_id = ? AND c.status = 'active'
-    """, (client_id,))
-    total_value = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COALESCE(SUM(p.amount), 0)
-        FROM payments p
-        JOIN contracts c ON c.id = p.contract_id
-        JOIN buildings b ON b.id = c.building_id
-        WHERE b.client_id = ? AND p.status = 'received' AND c.status = 'active'
-    """, (client_id,))
-    total_paid = cursor.fetchone()[0]
 
-    conn.close()
+@cached
+def get_all_client_financials():
+    """
+    Return get_client_financial_detail for every client in one pass,
+    as {client_id: {"total_value", "total_paid", "outstanding"}}.
+    """
+    with connection() as conn:
+        rows = conn.execute(_CLIENT_FINANCIAL_ROLLUP.format(where="")).fetchall()
     return {
-        "total_value": total_value,
-        "total_paid": total_paid,
-        "outstanding": total_value - total_paid,
+        row["client_id"]: {
+            "total_value": row["total_value"],
+            "total_paid": row["total_paid"],
+            "outstanding": row["outstanding"],
+        }
+        for row in rows
     }
+
+
+# ---------------------------------------------------------------------------
+# DASHBOARD SNAPSHOT
+# ---------------------------------------------------------------------------
+
+# Everything the Dashboard shows, read in one transaction:
+#   as_of                 date the statuses are measured against
+#   active_contracts      int
+#   overdue               DataFrame, as get_overdue_inspections()
+#   upcoming              DataFrame, as get_upcoming_inspections(UPCOMING_DAYS)
+#   completed_this_month  int, inspections from the first of as_of's month to as_of
+#   financials            dict, as get_financial_summary()
+#   client_summary        DataFrame, as get_client_summary()
+#   compliance_trend      DataFrame, as get_compliance_trend(TREND_DAYS)
+DashboardSnapshot = namedtuple(
+    "DashboardSnapshot",
+    "as_of active_contracts overdue upcoming completed_this_month "
+    "financials client_summary compliance_trend",
+)
+
+UPCOMING_DAYS = 14
+TREND_DAYS = 90
+
+# Overdue then upcoming rows of the due CTE, each in its list's order
+_DASHBOARD_LISTS_QUERY = """
+    SELECT due.*, si.scheduled_date, si.assigned_technician
+    FROM due
+    LEFT JOIN (
+        SELECT building_id, MIN(scheduled_date) as scheduled_date,
+            assigned_technician
+        FROM scheduled_inspections
+        WHERE status = 'scheduled'
+        GROUP BY building_id
+    ) si ON si.building_id = due.building_id
+    WHERE due.status IS NOT NULL
+    ORDER BY
+        due.status,
+        CASE WHEN due.status = 'overdue' THEN -due.days_since_last ELSE due.days_until_next END
+"""
+
+_DASHBOARD_TOTALS_QUERY = f"""
+    SELECT
+        COUNT(*) as active_contracts,
+        {_FINANCIAL_TOTALS_COLUMNS},
+        (
+            SELECT COUNT(*)
+            FROM inspections i
+            JOIN buildings b ON b.id = i.building_id
+            JOIN clients cl ON cl.id = b.client_id
+            WHERE i.inspection_day >= :month_start AND i.inspection_day <= :day
+        ) as completed_this_month
+    FROM contracts c
+    LEFT JOIN contract_ledger l ON l.contract_id = c.id
+    WHERE c.status = 'active'
+"""
+
+
+@cached
+def get_dashboard_snapshot(as_of=None):
+    """
+    Return a DashboardSnapshot as of the given date (default today).
+    Four statements in one read transaction instead of a connection and
+    a query per metric, so every number comes from the same state of the
+    database; statuses use the current building_status against as_of.
+    The tuple holds DataFrames and a dict; the cache hands every caller
+    its own deep copy, so changing them does not affect other sessions.
+    """
+    as_of = as_of or date.today()
+    day = day_number(as_of)
+    params = {
+        "day": day,
+        "horizon": day + UPCOMING_DAYS,
+        "days": UPCOMING_DAYS,
+        "month_start": day_number(as_of.replace(day=1)),
+    }
+    with read_transaction() as conn:
+        totals = conn.execute(_DASHBOARD_TOTALS_QUERY, params).fetchone()
+        lists = pd.read_sql_query(_DUE_CTE + _DASHBOARD_LISTS_QUERY, conn, params=params)
+        client_summary = pd.read_sql_query(
+            _DUE_CTE + _CLIENT_SUMMARY_QUERY, conn, params=params,
+        )
+        compliance_trend = _compliance_trend(conn, as_of, TREND_DAYS)
+
+    overdue = lists[lists["status"] == "overdue"].drop(columns="status")
+    upcoming = lists[lists["status"] == "upcoming"].drop(
+        columns=["status", "is_scheduled", "scheduled_date", "assigned_technician"]
+    )
+    return DashboardSnapshot(
+        as_of=as_of,
+        active_contracts=totals["active_contracts"],
+        overdue=overdue.reset_index(drop=True),
+        upcoming=upcoming.reset_index(drop=True),
+        completed_this_month=totals["completed_this_month"],
+        financials=_financial_summary(totals),
+        client_summary=client_summary,
+        compliance_trend=compliance_trend,
+    )
@@ -0,0 +1,125 @@
+"""
+TTS Guard — Diagnostics View
+Hidden view (start the server with TTS_DIAGNOSTICS=1, then open the app
+with ?view=diagnostics) over page rerun timings from page_metrics and the
+statements recorded by sql_profiler: the slowest ones, totals per
+database function, and query plans that read a whole table.
+"""
+
+import pandas as pd
+import streamlit as st
+
+import page_metrics
+import sql_profiler
+
+TOP_N = 25
+
+
+def _toggle_profiling():
+    if st.session_state.sql_profiling:
+        sql_profiler.enable()
+    else:
+        sql_profiler.disable()
+
+
+def _aggregate(df, key):
+    """Calls, total/mean/p95/max ms and rows per value of key, by total time."""
+    grouped = df.groupby(key)
+    stats = pd.DataFrame({
+        "Calls": grouped.size(),
+        "Total ms": grouped["ms"].sum(),
+        "Mean ms": grouped["ms"].mean(),
+        "p95 ms": grouped["ms"].quantile(0.95),
+        "Max ms": grouped["ms"].max(),
+        "Rows": grouped["rows"].sum(),
+    })
+    return stats.sort_values("Total ms", ascending=False).round(2).reset_index()
+
+
+def _render_page_timings():
+    st.subheader("⏱️ Page Reruns")
+    timings = page_metrics.summary()
+    if not timings:
+        st.info("No page reruns recorded yet.")
+        return
+    df = pd.DataFrame(timings)
+    df["section"] = df["section"].fillna("(total)")
+    st.caption("p95 is estimated from histogram buckets, as Prometheus would")
+    st.dataframe(
+        df.round({"mean_ms": 1, "p95_ms": 1}).rename(columns={
+            "page": "Page", "section": "Section", "reruns": "Reruns",
+            "mean_ms": "Mean ms", "p95_ms": "p95 ms",
+        }),
+        use_container_width=True, hide_index=True,
+    )
+
+
+def render_diagnostics():
+    """Draw the diagnostics view into the current page."""
+    st.markdown('<h1 class="fire-header">🩺 Diagnostics</h1>', unsafe_allow_html=True)
+    st.caption("Page timings and SQL statements recorded in this server process")
+
+    _render_page_timings()
+
+    st.subheader("🗄️ SQL Statements")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.toggle(
+            "Record SQL statements", value=sql_profiler.is_enabled(), key="sql_profiling",
+            on_change=_toggle_profiling,
+            help="Applies to every session on this server; set TTS_SQL_PROFILE=1 to start enabled",
+        )
+    with col2:
+        st.button("Clear", on_click=sql_profiler.clear, use_container_width=True)
+
+    records = sql_profiler.records()
+    if not records:
+        st.info("No statements recorded yet. Turn recording on, then use the app in another tab.")
+        return
+    df = pd.DataFrame(records)
+    plans = sql_profiler.plans()
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Statements", f"{len(df):,}", help=f"Ring buffer keeps the last {sql_profiler.BUFFER_SIZE:,}")
+    col2.metric("Distinct", f"{df['sql'].nunique():,}")
+    col3.metric("Total time", f"{df['ms'].sum():,.0f} ms")
+    col4.metric("Errors", f"{df['error'].notna().sum():,}")
+
+    st.subheader("🐢 Slowest Statements")
+    slowest = df.nlargest(TOP_N, "ms").copy()
+    slowest["time"] = pd.to_datetime(slowest["time"], unit="s").dt.strftime("%H:%M:%S")
+    st.dataframe(
+        slowest[["time", "function", "ms", "rows", "sql", "error"]].round({"ms": 2}).rename(columns={
+            "time": "Time", "function": "Function", "ms": "ms", "rows": "Rows",
+            "sql": "Statement", "error": "Error",
+        }),
+        use_container_width=True, hide_index=True,
+    )
+
+    st.subheader("🧮 By Function")
+    st.dataframe(
+        _aggregate(df, "function").rename(columns={"function": "Function"}),
+        use_container_width=True, hide_index=True,
+    )
+
+    st.subheader("📜 By Statement")
+    by_statement = _aggregate(df, "sql")
+    st.dataframe(
+        by_statement.head(TOP_N).rename(columns={"sql": "Statement"}),
+        use_container_width=True, hide_index=True,
+    )
+
+    st.subheader("🔍 Full Table Scans")
+    scanning = by_statement[by_statement["sql"].map(lambda sql: bool(plans.get(sql, ((), ()))[1]))]
+    if scanning.empty:
+        st.success("No recorded statement reads a whole table.")
+        return
+    st.caption("Plans with a SCAN step that uses no index, by total time")
+    for _, row in scanning.iterrows():
+        lines, tables = plans[row["sql"]]
+        with st.expander(
+            f"{', '.join(tables)} — {row['Calls']} calls, {row['Total ms']:,.1f} ms total"
+        ):
+            st.code(row["sql"], language="sql")
+            st.code("\n".join(lines), language=None)
@@ -0,0 +1,195 @@
+"""
+TTS Guard — Maintenance Commands
+Run from the project root:
+    python manage.py migrate
+    python manage.py rebuild-status
+    python manage.py check-status
+    python manage.py rebuild-ledger
+    python manage.py check-ledger
+    python manage.py rebuild-rollup
+    python manage.py check-rollup
+    python manage.py snapshot-compliance [--date 2026-09-30 | --backfill 90] [--replace]
+    python manage.py monthly-reports 2026-09 [--client ID] [--out FILE]
+    python manage.py --db FILE generate-data --scale large [--seed 42]   (replaces all data)
+    python manage.py build-assets
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+import database
+from migrations import get_schema_version, latest_version
+
+# The live app database; generate-data refuses it without --yes
+APP_DB_PATH = database.DB_PATH
+
+
+def cmd_migrate(args):
+    # First use of the connection runs init_db, which applies pending steps
+    with database.connection() as conn:
+        print(f"Schema version: {get_schema_version(conn)} (latest {latest_version()})")
+    return 0
+
+
+def cmd_rebuild_status(args):
+    rows = database.rebuild_building_status()
+    print(f"Rebuilt building_status: {rows} buildings")
+    return 0
+
+
+def cmd_check_status(args):
+    return _report_check("building_status", database.check_building_status(), "building_id")
+
+
+def cmd_rebuild_ledger(args):
+    rows = database.rebuild_contract_ledger()
+    print(f"Rebuilt contract_ledger: {rows} contracts")
+    return 0
+
+
+def cmd_check_ledger(args):
+    return _report_check("contract_ledger", database.check_contract_ledger(), "contract_id")
+
+
+def cmd_rebuild_rollup(args):
+    rows = database.rebuild_monthly_rollup()
+    print(f"Rebuilt monthly_rollup: {rows} month/building rows")
+    return 0
+
+
+def cmd_check_rollup(args):
+    return _report_check("monthly_rollup", database.check_monthly_rollup(), "building_id")
+
+
+def cmd_snapshot_compliance(args):
+    # Default to yesterday: a closed day, so its snapshot is final
+    end = date.fromisoformat(args.date) if args.date else date.today() - timedelta(days=1)
+    start = end - timedelta(days=args.backfill - 1) if args.backfill else end
+    result = database.backfill_compliance_snapshots(start, end, replace=args.replace)
+    print(f"Compliance snapshots {start} to {end}: {result['written']} written, "
+          f"{result['skipped']} already stored")
+    return 0
+
+
+def cmd_monthly_reports(args):
+    from monthly_reports import generate_monthly_reports
+
+    year, month = (int(part) for part in args.month.split("-"))
+    out = args.out or f"TTS_Reports_{year}-{month:02d}.zip"
+
+    def progress(done, total, failure):
+        if failure is not None:
+            print(f"  FAILED {failure[0]}: {failure[1]}")
+        if done == total or done % 50 == 0:
+            print(f"  {done}/{total} reports")
+
+    result = generate_monthly_reports(
+        year, month, out, client_id=args.client, workers=args.workers, progress=progress,
+    )
+    print(f"Wrote {result['written']}/{result['total']} reports to {out} "
+          f"in {result['seconds']:.1f}s ({len(result['failures'])} failed)")
+    return 1 if result["failures"] else 0
+
+
+def cmd_generate_data(args):
+    import synthetic_data
+
+    if os.path.realpath(database.DB_PATH) == os.path.realpath(APP_DB_PATH) and not args.yes:
+        print(f"generate-data drops every table in {database.DB_PATH}, the app database.\n"
+              "Pass --db FILE to generate into another database, or --yes to replace it.",
+              file=sys.stderr)
+        return 2
+    clients, per_client, per_building, years = synthetic_data.SCALES[args.scale]
+    counts = synthetic_data.generate(
+        clients=args.clients or clients,
+        buildings_per_client=args.buildings_per_client or per_client,
+        equipment_per_building=args.equipment_per_building or per_building,
+        years=args.years or years,
+        seed=args.seed,
+        item_months=args.item_months,
+    )
+    seconds = counts.pop("seconds")
+    for table, rows in counts.items():
+        print(f"  {table:<22}{rows:>12,}")
+    print(f"Generated in {seconds:.1f}s")
+    return 0
+
+
+def cmd_build_assets(args):
+    import theme
+
+    for name, url in theme.build_static_assets().items():
+        print(f"  {name:<8}{url or '(no logo)'}")
+    return 0
+
+
+def _report_check(table, diff, key):
+    if diff.empty:
+        print(f"{table} is consistent")
+        return 0
+    print(f"{table} differs from the live computation ({diff[key].nunique()} rows):")
+    print(diff.to_string(index=False))
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TTS Guard maintenance commands")
+    parser.add_argument("--db", help="Database file (default: tts_guard.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="Apply pending schema migrations").set_defaults(func=cmd_migrate)
+    sub.add_parser("rebuild-status", help="Recompute the building_status table").set_defaults(
+        func=cmd_rebuild_status)
+    sub.add_parser("check-status", help="Compare building_status with live data").set_defaults(
+        func=cmd_check_status)
+    sub.add_parser("rebuild-ledger", help="Recompute the contract_ledger table").set_defaults(
+        func=cmd_rebuild_ledger)
+    sub.add_parser("check-ledger", help="Compare contract_ledger with payments").set_defaults(
+        func=cmd_check_ledger)
+    sub.add_parser("rebuild-rollup", help="Recompute the monthly_rollup table").set_defaults(
+        func=cmd_rebuild_rollup)
+    sub.add_parser("check-rollup", help="Compare monthly_rollup with live data").set_defaults(
+        func=cmd_check_rollup)
+
+    snapshot = sub.add_parser("snapshot-compliance", help="Store daily compliance snapshots")
+    snapshot.add_argument("--date", help="Day to snapshot, YYYY-MM-DD (default: yesterday)")
+    snapshot.add_argument("--backfill", type=int, metavar="DAYS",
+                          help="Also fill the DAYS-1 days before it (pages only store "
+                               "yesterday; use --backfill 90 for trend history)")
+    snapshot.add_argument("--replace", action="store_true", help="Recompute days already stored")
+    snapshot.set_defaults(func=cmd_snapshot_compliance)
+
+    reports = sub.add_parser("monthly-reports", help="Render a month's inspection reports into a ZIP")
+    reports.add_argument("month", help="Month as YYYY-MM")
+    reports.add_argument("--client", type=int, help="Only this client id")
+    reports.add_argument("--out", help="ZIP file (default: TTS_Reports_YYYY-MM.zip)")
+    reports.add_argument("--workers", type=int, help="Render processes (default: all cores)")
+    reports.set_defaults(func=cmd_monthly_reports)
+
+    generate = sub.add_parser("generate-data",
+                              help="Replace all data with a generated load-test data set")
+    generate.add_argument("--scale", choices=["small", "medium", "large"], default="small",
+                          help="Preset sizes; the options below override single values")
+    generate.add_argument("--clients", type=int)
+    generate.add_argument("--buildings-per-client", type=int)
+    generate.add_argument("--equipment-per-building", type=int)
+    generate.add_argument("--years", type=int, help="Years of history")
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--item-months", type=int, default=0,
+                          help="Per-item results for inspections in the last N months")
+    generate.add_argument("--yes", action="store_true",
+                          help="Allow replacing the app database (when --db is not given)")
+    generate.set_defaults(func=cmd_generate_data)
+
+    sub.add_parser("build-assets", help="Write the theme CSS and logo into static/").set_defaults(
+        func=cmd_build_assets)
+
+    args = parser.parse_args(argv)
+    if args.db:
+        database.configure(path=args.db)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
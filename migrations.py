@@ -0,0 +1,771 @@
+"""
+TTS Guard — Schema Migrations
+Ordered, idempotent schema steps on top of the base tables in init_db,
+tracked with PRAGMA user_version so a live database evolves in place.
+"""
+
+import sqlite3
+
+# (version, description, function(conn)) in ascending version order
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a migration step. Versions must be added in order."""
+    def decorator(fn):
+        if MIGRATIONS and version != MIGRATIONS[-1][0] + 1:
+            raise ValueError(f"Migration {version} is out of order")
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return decorator
+
+
+def execute_script(conn, script):
+    """
+    Run a multi-statement SQL script statement by statement.
+    Unlike executescript(), this does not COMMIT, so the script stays
+    inside the migration's transaction.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        raise ValueError(f"Incomplete SQL statement: {statement.strip()[:60]}")
+
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database header."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    """Return the version the code expects."""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def apply_migrations(conn, target=None):
+    """
+    Apply pending migrations up to target (default: latest).
+    Each step runs in its own write transaction together with the
+    user_version bump, so a failed step leaves the previous version intact.
+    Returns the list of (version, description) applied.
+    """
+    target = latest_version() if target is None else target
+    applied = []
+    for version, description, fn in MIGRATIONS:
+        if version > target:
+            break
+        if get_schema_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            fn(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append((version, description))
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# MIGRATION STEPS
+# ---------------------------------------------------------------------------
+
+@migration(1, "Indexes for inspection status, financial and invoice joins")
+def _add_core_indexes(conn):
+    execute_script(conn, """
+        -- Latest inspection per building (covering: MAX(inspection_date) GROUP BY building_id)
+        CREATE INDEX IF NOT EXISTS idx_inspections_building_date
+            ON inspections (building_id, inspection_date);
+        -- Month / recent-activity range scans
+        CREATE INDEX IF NOT EXISTS idx_inspections_date
+            ON inspections (inspection_date);
+
+        -- Equipment counts and grouped checklist per building
+        CREATE INDEX IF NOT EXISTS idx_equipment_building_type
+            ON equipment (building_id, type);
+
+        CREATE INDEX IF NOT EXISTS idx_buildings_client
+            ON buildings (client_id, name);
+
+        -- Active contract per building
+        CREATE INDEX IF NOT EXISTS idx_contracts_building_status
+            ON contracts (building_id, status);
+
+        -- Pending schedule per building
+        CREATE INDEX IF NOT EXISTS idx_scheduled_building_status
+            ON scheduled_inspections (building_id, status);
+
+        -- Received / overdue sums per contract (covering)
+        CREATE INDEX IF NOT EXISTS idx_payments_contract_status
+            ON payments (contract_id, status, amount);
+        -- Outstanding invoices and monthly revenue
+        CREATE INDEX IF NOT EXISTS idx_payments_status_date
+            ON payments (status, payment_date);
+        -- Payment history ordering
+        CREATE INDEX IF NOT EXISTS idx_payments_date
+            ON payments (payment_date);
+
+        CREATE INDEX IF NOT EXISTS idx_complaints_created
+            ON complaints (created_at);
+        CREATE INDEX IF NOT EXISTS idx_complaints_building
+            ON complaints (building_id);
+    """)
+
+
+# Live computation of one building_status row; {where} narrows it to the
+# building(s) being refreshed. Frozen here so later schema changes do not
+# alter what this step installs.
+_BUILDING_STATUS_V2_SELECT = """
+    SELECT
+        b.id,
+        c.id,
+        c.visits_per_year,
+        (SELECT COUNT(*) FROM equipment e WHERE e.building_id = b.id),
+        li.last_date,
+        CASE
+            WHEN li.last_date IS NULL THEN '0001-01-01'
+            ELSE date(julianday(li.last_date) + 365.0 / c.visits_per_year)
+        END,
+        EXISTS (
+            SELECT 1 FROM scheduled_inspections si
+            WHERE si.building_id = b.id AND si.status = 'scheduled'
+        )
+    FROM buildings b
+    LEFT JOIN contracts c ON c.id = (
+        SELECT MAX(c2.id) FROM contracts c2
+        WHERE c2.building_id = b.id AND c2.status = 'active'
+    )
+    LEFT JOIN (
+        SELECT building_id, MAX(inspection_date) as last_date
+        FROM inspections GROUP BY building_id
+    ) li ON li.building_id = b.id
+    {where}
+"""
+
+_BUILDING_STATUS_V2_COLUMNS = """
+    building_status (building_id, contract_id, visits_per_year, equipment_count,
+                     last_inspection_date, next_due_date, is_scheduled)
+"""
+
+
+def _refresh_building_status_sql(building_ref):
+    """INSERT OR REPLACE statement recomputing one building inside a trigger."""
+    return (
+        "INSERT OR REPLACE INTO" + _BUILDING_STATUS_V2_COLUMNS
+        + _BUILDING_STATUS_V2_SELECT.format(where=f"WHERE b.id = {building_ref}")
+        + ";"
+    )
+
+
+@migration(2, "Materialized building_status table maintained by triggers")
+def _add_building_status(conn):
+    execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS building_status (
+            building_id INTEGER PRIMARY KEY,
+            contract_id INTEGER,
+            visits_per_year INTEGER,
+            equipment_count INTEGER NOT NULL DEFAULT 0,
+            last_inspection_date TEXT,
+            -- Last day inside the visit interval; '0001-01-01' when never
+            -- inspected, so "overdue" is always next_due_date < today
+            next_due_date TEXT,
+            is_scheduled INTEGER NOT NULL DEFAULT 0
+        );
+        -- Overdue / upcoming lists are range scans on next_due_date
+        CREATE INDEX IF NOT EXISTS idx_building_status_due
+            ON building_status (is_scheduled, next_due_date);
+    """)
+    conn.execute("DELETE FROM building_status")
+    conn.execute(
+        "INSERT INTO" + _BUILDING_STATUS_V2_COLUMNS
+        + _BUILDING_STATUS_V2_SELECT.format(where="")
+    )
+
+    refresh_new = _refresh_building_status_sql("NEW.building_id")
+    refresh_old = _refresh_building_status_sql("OLD.building_id")
+    execute_script(conn, f"""
+        -- New inspections only ever move the last inspection date forward
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_inspection_insert
+        AFTER INSERT ON inspections
+        BEGIN
+            UPDATE building_status SET
+                last_inspection_date = NEW.inspection_date,
+                next_due_date = date(julianday(NEW.inspection_date) + 365.0 / visits_per_year)
+            WHERE building_id = NEW.building_id
+            AND (last_inspection_date IS NULL OR last_inspection_date < NEW.inspection_date);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_inspection_update
+        AFTER UPDATE OF building_id, inspection_date ON inspections
+        BEGIN
+            {refresh_old}
+            {refresh_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_inspection_delete
+        AFTER DELETE ON inspections
+        BEGIN
+            {refresh_old}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_equipment_insert
+        AFTER INSERT ON equipment
+        BEGIN
+            UPDATE building_status SET equipment_count = equipment_count + 1
+            WHERE building_id = NEW.building_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_equipment_delete
+        AFTER DELETE ON equipment
+        BEGIN
+            UPDATE building_status SET equipment_count = equipment_count - 1
+            WHERE building_id = OLD.building_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_equipment_update
+        AFTER UPDATE OF building_id ON equipment
+        BEGIN
+            {refresh_old}
+            {refresh_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_schedule_insert
+        AFTER INSERT ON scheduled_inspections
+        BEGIN
+            {refresh_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_schedule_update
+        AFTER UPDATE OF building_id, status ON scheduled_inspections
+        BEGIN
+            {refresh_old}
+            {refresh_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_schedule_delete
+        AFTER DELETE ON scheduled_inspections
+        BEGIN
+            {refresh_old}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_contract_insert
+        AFTER INSERT ON contracts
+        BEGIN
+            {refresh_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_contract_update
+        AFTER UPDATE ON contracts
+        BEGIN
+            {refresh_old}
+            {refresh_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_contract_delete
+        AFTER DELETE ON contracts
+        BEGIN
+            {refresh_old}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_building_insert
+        AFTER INSERT ON buildings
+        BEGIN
+            {_refresh_building_status_sql("NEW.id")}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_building_status_building_delete
+        AFTER DELETE ON buildings
+        BEGIN
+            DELETE FROM building_status WHERE building_id = OLD.id;
+        END;
+    """)
+
+
+@migration(3, "Per-year complaint ticket sequence")
+def _add_ticket_sequences(conn):
+    execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS ticket_sequences (
+            year INTEGER PRIMARY KEY,
+            last_value INTEGER NOT NULL
+        );
+
+        -- Start each year after the highest ticket already issued
+        INSERT OR REPLACE INTO ticket_sequences (year, last_value)
+        SELECT
+            CAST(substr(ticket_number, 5, 4) AS INTEGER),
+            MAX(CAST(substr(ticket_number, 10) AS INTEGER))
+        FROM complaints
+        WHERE ticket_number GLOB 'TTS-[0-9][0-9][0-9][0-9]-*'
+        GROUP BY 1;
+
+        -- Tickets inserted with an explicit number (seed data, imports)
+        -- push the sequence past them so allocation never collides
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_sequences_complaint_insert
+        AFTER INSERT ON complaints
+        WHEN NEW.ticket_number GLOB 'TTS-[0-9][0-9][0-9][0-9]-*'
+        BEGIN
+            INSERT INTO ticket_sequences (year, last_value)
+            VALUES (
+                CAST(substr(NEW.ticket_number, 5, 4) AS INTEGER),
+                CAST(substr(NEW.ticket_number, 10) AS INTEGER)
+            )
+            ON CONFLICT (year) DO UPDATE SET last_value = MAX(last_value, excluded.last_value);
+        END;
+    """)
+
+
+def _ledger_upsert_sql(row, sign):
+    """UPSERT adding (sign=1) or removing (sign=-1) one payment row from its contract."""
+    amount = f"{sign} * {row}.amount"
+    return f"""
+        INSERT INTO contract_ledger (
+            contract_id, billed_amount, received_amount, pending_amount, overdue_amount,
+            payment_count, received_count, pending_count, overdue_count
+        ) VALUES (
+            {row}.contract_id,
+            {amount},
+            CASE WHEN {row}.status = 'received' THEN {amount} ELSE 0 END,
+            CASE WHEN {row}.status = 'pending' THEN {amount} ELSE 0 END,
+            CASE WHEN {row}.status = 'overdue' THEN {amount} ELSE 0 END,
+            {sign},
+            {sign} * ({row}.status = 'received'),
+            {sign} * ({row}.status = 'pending'),
+            {sign} * ({row}.status = 'overdue')
+        )
+        ON CONFLICT (contract_id) DO UPDATE SET
+            billed_amount = billed_amount + excluded.billed_amount,
+            received_amount = received_amount + excluded.received_amount,
+            pending_amount = pending_amount + excluded.pending_amount,
+            overdue_amount = overdue_amount + excluded.overdue_amount,
+            payment_count = payment_count + excluded.payment_count,
+            received_count = received_count + excluded.received_count,
+            pending_count = pending_count + excluded.pending_count,
+            overdue_count = overdue_count + excluded.overdue_count;
+    """
+
+
+@migration(4, "Per-contract payment ledger maintained by triggers")
+def _add_contract_ledger(conn):
+    execute_script(conn, f"""
+        CREATE TABLE IF NOT EXISTS contract_ledger (
+            contract_id INTEGER PRIMARY KEY,
+            billed_amount REAL NOT NULL DEFAULT 0,
+            received_amount REAL NOT NULL DEFAULT 0,
+            pending_amount REAL NOT NULL DEFAULT 0,
+            overdue_amount REAL NOT NULL DEFAULT 0,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            received_count INTEGER NOT NULL DEFAULT 0,
+            pending_count INTEGER NOT NULL DEFAULT 0,
+            overdue_count INTEGER NOT NULL DEFAULT 0
+        );
+
+        DELETE FROM contract_ledger;
+        INSERT INTO contract_ledger
+        SELECT
+            contract_id,
+            SUM(amount),
+            TOTAL(CASE WHEN status = 'received' THEN amount END),
+            TOTAL(CASE WHEN status = 'pending' THEN amount END),
+            TOTAL(CASE WHEN status = 'overdue' THEN amount END),
+            COUNT(*),
+            SUM(status = 'received'),
+            SUM(status = 'pending'),
+            SUM(status = 'overdue')
+        FROM payments
+        GROUP BY contract_id;
+
+        CREATE TRIGGER IF NOT EXISTS trg_contract_ledger_payment_insert
+        AFTER INSERT ON payments
+        BEGIN
+            {_ledger_upsert_sql("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_contract_ledger_payment_update
+        AFTER UPDATE OF contract_id, amount, status ON payments
+        BEGIN
+            {_ledger_upsert_sql("OLD", -1)}
+            {_ledger_upsert_sql("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_contract_ledger_payment_delete
+        AFTER DELETE ON payments
+        BEGIN
+            {_ledger_upsert_sql("OLD", -1)}
+        END;
+    """)
+
+
+@migration(5, "Per-item inspection results")
+def _add_inspection_items(conn):
+    # No equipment foreign key: failure history outlives removed equipment,
+    # which is also why the type and building are copied onto each row.
+    # Older inspections only have aggregate counts, so nothing is backfilled.
+    execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS inspection_items (
+            inspection_id INTEGER NOT NULL,
+            equipment_id INTEGER NOT NULL,
+            building_id INTEGER NOT NULL,
+            equipment_type TEXT NOT NULL,
+            passed INTEGER NOT NULL,
+            PRIMARY KEY (inspection_id, equipment_id),
+            FOREIGN KEY (inspection_id) REFERENCES inspections(id) ON DELETE CASCADE
+        );
+        -- Covering indexes: each failure-rate rollup reads only its index
+        CREATE INDEX IF NOT EXISTS idx_inspection_items_equipment
+            ON inspection_items (equipment_id, passed);
+        CREATE INDEX IF NOT EXISTS idx_inspection_items_type
+            ON inspection_items (equipment_type, passed);
+        CREATE INDEX IF NOT EXISTS idx_inspection_items_building
+            ON inspection_items (building_id, passed);
+    """)
+
+
+# Per-source contributions to one monthly_rollup row, as SQL expressions
+# over a trigger's NEW/OLD row ({row}); columns not listed are left alone.
+_ROLLUP_INSPECTION_COLUMNS = {
+    "month": "substr({row}.inspection_date, 1, 7)",
+    "inspection_count": "1",
+    "items_checked": "COALESCE({row}.items_checked, 0)",
+    "items_passed": "COALESCE({row}.items_passed, 0)",
+    "items_failed": "COALESCE({row}.items_failed, 0)",
+}
+_ROLLUP_COMPLAINT_COLUMNS = {
+    "month": "substr({row}.created_at, 1, 7)",
+    "complaint_count": "1",
+    "complaints_high": "({row}.priority = 'high')",
+    "complaints_medium": "({row}.priority = 'medium')",
+    "complaints_low": "({row}.priority = 'low')",
+    "complaints_open": "({row}.status = 'open')",
+    "complaints_in_progress": "({row}.status = 'in_progress')",
+    "complaints_resolved": "({row}.status = 'resolved')",
+}
+
+
+def _rollup_upsert_sql(columns, row, sign):
+    """UPSERT adding (sign=1) or removing (sign=-1) one row's counts from its month/building."""
+    counts = [name for name in columns if name != "month"]
+    values = ", ".join(f"{sign} * {columns[name].format(row=row)}" for name in counts)
+    updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in counts)
+    return f"""
+        INSERT INTO monthly_rollup (month, building_id, client_id, {", ".join(counts)})
+        SELECT {columns["month"].format(row=row)}, b.id, b.client_id, {values}
+        FROM buildings b WHERE b.id = {row}.building_id
+        ON CONFLICT (month, building_id) DO UPDATE SET {updates};
+    """
+
+
+@migration(6, "Monthly inspection/complaint rollup maintained by triggers")
+def _add_monthly_rollup(conn):
+    # Keyed on (month, building): a building belongs to one client, whose
+    # id is stored alongside so client totals and filters need no join.
+    # Complaints count toward the building's client.
+    ins_new = _rollup_upsert_sql(_ROLLUP_INSPECTION_COLUMNS, "NEW", 1)
+    ins_old = _rollup_upsert_sql(_ROLLUP_INSPECTION_COLUMNS, "OLD", -1)
+    comp_new = _rollup_upsert_sql(_ROLLUP_COMPLAINT_COLUMNS, "NEW", 1)
+    comp_old = _rollup_upsert_sql(_ROLLUP_COMPLAINT_COLUMNS, "OLD", -1)
+    execute_script(conn, f"""
+        CREATE TABLE IF NOT EXISTS monthly_rollup (
+            month TEXT NOT NULL,  -- 'YYYY-MM'
+            building_id INTEGER NOT NULL,
+            client_id INTEGER NOT NULL,
+            inspection_count INTEGER NOT NULL DEFAULT 0,
+            items_checked INTEGER NOT NULL DEFAULT 0,
+            items_passed INTEGER NOT NULL DEFAULT 0,
+            items_failed INTEGER NOT NULL DEFAULT 0,
+            complaint_count INTEGER NOT NULL DEFAULT 0,
+            complaints_high INTEGER NOT NULL DEFAULT 0,
+            complaints_medium INTEGER NOT NULL DEFAULT 0,
+            complaints_low INTEGER NOT NULL DEFAULT 0,
+            complaints_open INTEGER NOT NULL DEFAULT 0,
+            complaints_in_progress INTEGER NOT NULL DEFAULT 0,
+            complaints_resolved INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, building_id)
+        );
+        -- One client's months
+        CREATE INDEX IF NOT EXISTS idx_monthly_rollup_client
+            ON monthly_rollup (client_id, month);
+
+        DELETE FROM monthly_rollup;
+        INSERT INTO monthly_rollup
+        SELECT
+            month, building_id, client_id,
+            SUM(inspection_count), SUM(items_checked), SUM(items_passed), SUM(items_failed),
+            SUM(complaint_count), SUM(complaints_high), SUM(complaints_medium),
+            SUM(complaints_low), SUM(complaints_open), SUM(complaints_in_progress),
+            SUM(complaints_resolved)
+        FROM (
+            SELECT
+                substr(i.inspection_date, 1, 7) as month, i.building_id, b.client_id,
+                1 as inspection_count,
+                COALESCE(i.items_checked, 0) as items_checked,
+                COALESCE(i.items_passed, 0) as items_passed,
+                COALESCE(i.items_failed, 0) as items_failed,
+                0 as complaint_count, 0 as complaints_high, 0 as complaints_medium,
+                0 as complaints_low, 0 as complaints_open, 0 as complaints_in_progress,
+                0 as complaints_resolved
+            FROM inspections i
+            JOIN buildings b ON b.id = i.building_id
+            UNION ALL
+            SELECT
+                substr(comp.created_at, 1, 7), comp.building_id, b.client_id,
+                0, 0, 0, 0,
+                1, comp.priority = 'high', comp.priority = 'medium', comp.priority = 'low',
+                comp.status = 'open', comp.status = 'in_progress', comp.status = 'resolved'
+            FROM complaints comp
+            JOIN buildings b ON b.id = comp.building_id
+            WHERE comp.created_at IS NOT NULL
+        )
+        GROUP BY month, building_id, client_id;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_inspection_insert
+        AFTER INSERT ON inspections
+        BEGIN
+            {ins_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_inspection_update
+        AFTER UPDATE OF building_id, inspection_date, items_checked, items_passed, items_failed
+        ON inspections
+        BEGIN
+            {ins_old}
+            {ins_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_inspection_delete
+        AFTER DELETE ON inspections
+        BEGIN
+            {ins_old}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_complaint_insert
+        AFTER INSERT ON complaints
+        WHEN NEW.created_at IS NOT NULL
+        BEGIN
+            {comp_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_complaint_update_old
+        AFTER UPDATE OF building_id, priority, status, created_at ON complaints
+        WHEN OLD.created_at IS NOT NULL
+        BEGIN
+            {comp_old}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_complaint_update_new
+        AFTER UPDATE OF building_id, priority, status, created_at ON complaints
+        WHEN NEW.created_at IS NOT NULL
+        BEGIN
+            {comp_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_complaint_delete
+        AFTER DELETE ON complaints
+        WHEN OLD.created_at IS NOT NULL
+        BEGIN
+            {comp_old}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_building_client
+        AFTER UPDATE OF client_id ON buildings
+        BEGIN
+            UPDATE monthly_rollup SET client_id = NEW.client_id WHERE building_id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_building_delete
+        AFTER DELETE ON buildings
+        BEGIN
+            DELETE FROM monthly_rollup WHERE building_id = OLD.id;
+        END;
+    """)
+
+
+@migration(7, "Daily compliance snapshots per building and per client")
+def _add_compliance_snapshots(conn):
+    # Written by database.take_compliance_snapshot, one day at a time.
+    # WITHOUT ROWID: rows are only ever read by their primary key range.
+    execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS compliance_snapshots (
+            snapshot_date TEXT NOT NULL,
+            building_id INTEGER NOT NULL,
+            client_id INTEGER NOT NULL,
+            status TEXT NOT NULL,  -- 'overdue', 'due_soon' or 'ok'
+            is_scheduled INTEGER NOT NULL,
+            last_inspection_date TEXT,
+            next_due_date TEXT NOT NULL,
+            -- Days past next_due_date; NULL when never inspected
+            overdue_days INTEGER,
+            PRIMARY KEY (snapshot_date, building_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS client_compliance_snapshots (
+            snapshot_date TEXT NOT NULL,
+            client_id INTEGER NOT NULL,
+            buildings INTEGER NOT NULL,
+            ok INTEGER NOT NULL,
+            due_soon INTEGER NOT NULL,
+            overdue INTEGER NOT NULL,
+            overdue_unscheduled INTEGER NOT NULL,
+            never_inspected INTEGER NOT NULL,
+            overdue_days INTEGER NOT NULL,
+            PRIMARY KEY (snapshot_date, client_id)
+        ) WITHOUT ROWID;
+    """)
+
+
+# Days since 1970-01-01 of an ISO date (or timestamp) expression, as an
+# integer; NULL stays NULL. Frozen here like the other steps' SQL.
+_DAY_NUMBER_SQL = "CAST(julianday({}) - 2440587.5 AS INTEGER)"
+
+# table -> (key column, {day column: source date column})
+_DAY_NUMBER_COLUMNS = {
+    "inspections": ("id", {"inspection_day": "inspection_date"}),
+    "payments": ("id", {"payment_day": "payment_date"}),
+    "building_status": ("building_id", {
+        "last_inspection_day": "last_inspection_date",
+        "next_due_day": "next_due_date",
+    }),
+}
+
+# Rows written before migration 8 are filled by backfill_day_numbers
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _day_number_assignments(columns, row=None):
+    """SET list computing each day column from its date column (of NEW/OLD row, if given)."""
+    prefix = f"{row}." if row else ""
+    return ", ".join(
+        f"{day} = {_DAY_NUMBER_SQL.format(prefix + source)}" for day, source in columns.items()
+    )
+
+
+def _day_number_stale(columns, row):
+    """True for a row whose day columns do not match its date columns."""
+    return " OR ".join(
+        f"{row}.{day} IS NOT {_DAY_NUMBER_SQL.format(f'{row}.{source}')}"
+        for day, source in columns.items()
+    )
+
+
+@migration(8, "Integer day-number columns for inspection, payment and due dates")
+def _add_day_numbers(conn):
+    # Plain columns kept current by triggers (a trigger only writes when a
+    # row's day numbers are missing or stale, so inserts that supply them
+    # cost nothing extra). Existing rows are filled afterwards, in batches,
+    # by backfill_day_numbers: this step only adds empty columns, indexes
+    # with no entries yet and the triggers, so its write lock is short.
+    for table, (key, columns) in _DAY_NUMBER_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for day in columns:
+            if day not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {day} INTEGER")
+        sources = ", ".join(columns.values())
+        execute_script(conn, f"""
+            CREATE TRIGGER IF NOT EXISTS trg_day_number_{table}_insert
+            AFTER INSERT ON {table}
+            WHEN {_day_number_stale(columns, "NEW")}
+            BEGIN
+                UPDATE {table} SET {_day_number_assignments(columns, "NEW")}
+                WHERE {key} = NEW.{key};
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_day_number_{table}_update
+            AFTER UPDATE OF {sources} ON {table}
+            WHEN {_day_number_stale(columns, "NEW")}
+            BEGIN
+                UPDATE {table} SET {_day_number_assignments(columns, "NEW")}
+                WHERE {key} = NEW.{key};
+            END;
+        """)
+
+    # Partial indexes: range predicates on a day column imply IS NOT NULL,
+    # and rows still waiting for the backfill add no entries
+    execute_script(conn, """
+        CREATE INDEX IF NOT EXISTS idx_inspections_day
+            ON inspections (inspection_day) WHERE inspection_day IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_payments_status_day
+            ON payments (status, payment_day) WHERE payment_day IS NOT NULL;
+        -- Replaces idx_building_status_due: overdue / upcoming range scans
+        CREATE INDEX IF NOT EXISTS idx_building_status_due_day
+            ON building_status (is_scheduled, next_due_day) WHERE next_due_day IS NOT NULL;
+        DROP INDEX IF EXISTS idx_building_status_due;
+
+        -- Remaining rowid range of each table to backfill
+        CREATE TABLE IF NOT EXISTS day_number_backfill (
+            table_name TEXT PRIMARY KEY,
+            next_rowid INTEGER NOT NULL,
+            last_rowid INTEGER NOT NULL
+        );
+    """)
+    for table in _DAY_NUMBER_COLUMNS:
+        conn.execute(f"""
+            INSERT OR REPLACE INTO day_number_backfill (table_name, next_rowid, last_rowid)
+            SELECT ?, MIN(rowid), MAX(rowid) FROM {table} HAVING COUNT(*) > 0
+        """, (table,))
+
+
+def backfill_day_numbers(conn, batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Fill the day-number columns of rows written before migration 8, one
+    rowid range of batch_size rows per write transaction, so a live
+    database is never locked for long. Several processes may run it at
+    once; each batch claims its range under the write lock. Returns the
+    number of rows updated.
+    """
+    if get_schema_version(conn) < 8:
+        return 0
+    updated = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT table_name, next_rowid, last_rowid FROM day_number_backfill "
+                "ORDER BY table_name LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return updated
+            table, start, last = row
+            end = min(start + batch_size - 1, last)
+            key, columns = _DAY_NUMBER_COLUMNS[table]
+            updated += conn.execute(
+                f"UPDATE {table} SET {_day_number_assignments(columns)} "
+                f"WHERE rowid BETWEEN ? AND ? AND ({_day_number_stale(columns, table)})",
+                (start, end),
+            ).rowcount
+            if end >= last:
+                conn.execute("DELETE FROM day_number_backfill WHERE table_name = ?", (table,))
+            else:
+                conn.execute(
+                    "UPDATE day_number_backfill SET next_rowid = ? WHERE table_name = ?",
+                    (end + 1, table),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def update_day_numbers(conn):
+    """
+    Recompute every missing or stale day number in one pass each, inside
+    the caller's transaction (after a bulk load with the triggers dropped).
+    Returns the number of rows updated.
+    """
+    updated = 0
+    for table, (_, columns) in _DAY_NUMBER_COLUMNS.items():
+        updated += conn.execute(
+            f"UPDATE {table} SET {_day_number_assignments(columns)} "
+            f"WHERE {_day_number_stale(columns, table)}"
+        ).rowcount
+    conn.execute("DELETE FROM day_number_backfill")
+    return updated
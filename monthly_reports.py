@@ -0,0 +1,153 @@
+"""
+TTS Guard — Monthly Report Packs
+Renders one inspection report PDF per inspection in a month, in parallel,
+and streams them into a ZIP archive grouped by client.
+"""
+
+import os
+import re
+import tempfile
+import time
+import zipfile
+from collections import deque
+from datetime import date
+
+import pandas as pd
+
+import database
+from report_service import RenderService, get_service
+
+# Inspections whose equipment rows are loaded at a time
+CHUNK_SIZE = 200
+# Packs built for the app: one file per month and client, replaced on rebuild
+PACK_DIR = os.path.join(tempfile.gettempdir(), "tts_guard_packs")
+
+
+def _safe_name(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(text)).strip("_") or "report"
+
+
+def _iter_jobs(inspections, chunk_size, report_date):
+    """
+    Yield (archive name, report params) per inspection, chunk by chunk.
+    Every report carries report_date, so it is part of the cache key.
+    """
+    for start in range(0, len(inspections), chunk_size):
+        chunk = inspections.iloc[start:start + chunk_size]
+        items = database.get_items_for_inspections(chunk["id"])
+        items_by_inspection = {k: g for k, g in items.groupby("inspection_id")}
+        # Inspections from before per-item results only have counts
+        legacy = chunk[~chunk["id"].isin(items_by_inspection)]
+        equipment = database.get_equipment_for_buildings(legacy["building_id"].unique())
+        equipment_by_building = {k: g for k, g in equipment.groupby("building_id")}
+
+        for _, row in chunk.iterrows():
+            if row["id"] in items_by_inspection:
+                details = [
+                    {"type": item.equipment_type, "status": "Passed" if item.passed else "Failed"}
+                    for item in items_by_inspection[row["id"]].itertuples()
+                ]
+            else:
+                eq = equipment_by_building.get(row["building_id"])
+                details = [] if eq is None else [
+                    {"type": t, "status": "Not recorded"} for t in eq["type"]
+                ]
+            name = (
+                f"{_safe_name(row['short_name'])}/"
+                f"{_safe_name(row['building_name'])}_{row['inspection_date']}_{row['id']}.pdf"
+            )
+            yield name, {
+                "building_name": row["building_name"],
+                "client_name": row["client_name"],
+                "inspection_date": row["inspection_date"],
+                "technician": row["technician"],
+                "items_checked": int(row["items_checked"] or 0),
+                "items_passed": int(row["items_passed"] or 0),
+                "items_failed": int(row["items_failed"] or 0),
+                "equipment_details": details,
+                "notes": "" if pd.isna(row["notes"]) else row["notes"],
+                "report_date": report_date,
+            }
+
+
+def generate_monthly_reports(year, month, output, client_id=None, workers=None,
+                             progress=None, chunk_size=CHUNK_SIZE, report_date=None):
+    """
+    Render every inspection report for year/month into a ZIP archive.
+
+    output is a path or a writable binary file (it need not be seekable).
+    Jobs run on a pool of `workers` processes (default: all cores); only a
+    small window of finished PDFs is held in memory before being written.
+    progress, if given, is called as progress(done, total, failure) where
+    failure is None or (archive name, error message). A failed report is
+    recorded and skipped; the rest of the batch continues. Every report
+    is dated report_date (ISO text, default today).
+
+    Returns {"total", "written", "failures", "seconds"}.
+    """
+    start = time.perf_counter()
+    report_date = report_date or date.today().isoformat()
+    inspections = database.get_inspections_by_month(year, month, client_id)
+    total = len(inspections)
+    workers = workers or os.cpu_count() or 1
+    # Shares the interactive service's on-disk cache, so unchanged
+    # reports are not rendered again
+    service = RenderService(workers, get_service().cache)
+    window = deque()
+    written, failures = 0, []
+
+    def finish_oldest(zf):
+        nonlocal written
+        name, handle = window.popleft()
+        failure = None
+        try:
+            zf.writestr(name, handle.result())
+            written += 1
+        except Exception as e:
+            failure = (name, f"{type(e).__name__}: {e}")
+            failures.append(failure)
+        if progress is not None:
+            progress(written + len(failures), total, failure)
+
+    # PDF streams are already compressed; storing avoids a second pass
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as zf:
+        try:
+            for name, params in _iter_jobs(inspections, chunk_size, report_date):
+                window.append((name, service.submit("inspection", **params)))
+                if len(window) >= workers * 4:
+                    finish_oldest(zf)
+            while window:
+                finish_oldest(zf)
+        finally:
+            service.shutdown(wait=False)
+
+        if failures:
+            zf.writestr("FAILURES.txt", "\n".join(f"{name}: {error}" for name, error in failures) + "\n")
+
+    return {
+        "total": total,
+        "written": written,
+        "failures": failures,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def write_pack(year, month, client_id=None, **kwargs):
+    """
+    Generate a pack into PACK_DIR and return (path, result). There is one
+    file per year/month/client, replaced atomically, so rebuilding a pack
+    does not leave the previous one behind. kwargs go to
+    generate_monthly_reports.
+    """
+    os.makedirs(PACK_DIR, exist_ok=True)
+    name = f"{year}-{month:02d}-{'all' if client_id is None else client_id}.zip"
+    fd, tmp = tempfile.mkstemp(dir=PACK_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            result = generate_monthly_reports(year, month, f, client_id=client_id, **kwargs)
+        os.replace(tmp, os.path.join(PACK_DIR, name))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return os.path.join(PACK_DIR, name), result
@@ -0,0 +1,253 @@
+"""
+TTS Guard — Page Metrics
+Per-rerun page timings, split into named sections, kept in process-wide
+histograms and exported in Prometheus text format to a file and/or a
+local HTTP endpoint.
+
+Export is configured from the environment:
+    TTS_METRICS_FILE=/var/lib/node_exporter/tts_guard.prom
+    TTS_METRICS_PORT=9464   (serves /metrics on TTS_METRICS_HOST, default 127.0.0.1)
+"""
+
+import bisect
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds; +Inf is implied
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0)
+
+METRICS_FILE = os.environ.get("TTS_METRICS_FILE") or None
+METRICS_PORT = int(os.environ.get("TTS_METRICS_PORT") or 0) or None
+METRICS_HOST = os.environ.get("TTS_METRICS_HOST", "127.0.0.1")
+# Minimum seconds between rewrites of METRICS_FILE
+FILE_INTERVAL = 15.0
+
+# name -> (help text, label names)
+METRICS = {
+    "tts_page_rerun_seconds": ("Time to run a page script top to bottom.", ("page",)),
+    "tts_page_section_seconds": ("Time spent in one section of a page rerun.", ("page", "section")),
+}
+
+_histograms = {}  # (metric, label values) -> Histogram
+_lock = threading.Lock()
+_exporters_started = False
+_last_file_write = 0.0
+
+
+class Histogram:
+    """Bucket counts, sum and count of observed values, as Prometheus expects."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound, observations <= bound), ending with +Inf."""
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            yield bound, running
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within its bucket, like histogram_quantile()."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, running in self.cumulative():
+            if running >= rank:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * (rank - below) / max(running - below, 1)
+            lower, below = bound, running
+        return lower
+
+
+def observe(metric, labels, seconds):
+    """Record one observation of metric for the given label values."""
+    key = (metric, tuple(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def reset():
+    """Forget every observation."""
+    with _lock:
+        _histograms.clear()
+
+
+# ---------------------------------------------------------------------------
+# PAGE TIMER
+# ---------------------------------------------------------------------------
+
+class PageTimer:
+    """
+    Times one rerun of a page script. section(name) ends the current
+    section and starts the next; time before the first call counts as
+    "setup", and a name used more than once adds up within the rerun.
+    end() records the total and every section. A rerun cut short by
+    st.stop() is only recorded if end() is called before it; one cut
+    short by an exception or st.rerun() is not recorded.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._start = self._lap = time.perf_counter()
+        self._section = "setup"
+        self._sections = {}
+        self._ended = False
+
+    def section(self, name):
+        now = time.perf_counter()
+        self._sections[self._section] = self._sections.get(self._section, 0.0) + now - self._lap
+        self._section, self._lap = name, now
+
+    def end(self):
+        """Record this rerun. Later calls do nothing."""
+        if self._ended:
+            return
+        self.section(None)
+        self._ended = True
+        observe("tts_page_rerun_seconds", (self.page,), self._lap - self._start)
+        for name, seconds in self._sections.items():
+            observe("tts_page_section_seconds", (self.page, name), seconds)
+        _maybe_write_file()
+
+
+def start_page(page):
+    """Start timing a rerun of page; call at the top of the page script."""
+    _start_exporters()
+    return PageTimer(page)
+
+
+def summary():
+    """Return [{page, section, reruns, mean_ms, p95_ms}] with section None for the totals."""
+    rows = []
+    with _lock:
+        for (metric, labels), histogram in _histograms.items():
+            p95 = histogram.quantile(0.95)
+            rows.append({
+                "page": labels[0],
+                "section": labels[1] if metric == "tts_page_section_seconds" else None,
+                "reruns": histogram.count,
+                "mean_ms": histogram.sum / histogram.count * 1000,
+                "p95_ms": p95 * 1000,
+            })
+    # Each page's total first, then its sections
+    rows.sort(key=lambda row: (row["page"], row["section"] is not None, row["section"] or ""))
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# PROMETHEUS EXPORT
+# ---------------------------------------------------------------------------
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def render_prometheus():
+    """Return every histogram in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for metric, (help_text, label_names) in METRICS.items():
+            series = sorted((labels, h) for (name, labels), h in _histograms.items() if name == metric)
+            if not series:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in series:
+                label_text = ",".join(
+                    f'{name}="{_label_value(value)}"' for name, value in zip(label_names, labels)
+                )
+                for bound, running in histogram.cumulative():
+                    lines.append(f'{metric}_bucket{{{label_text},le="{_format_bound(bound)}"}} {running}')
+                lines.append(f"{metric}_sum{{{label_text}}} {histogram.sum!r}")
+                lines.append(f"{metric}_count{{{label_text}}} {histogram.count}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_prometheus(path):
+    """Write the metrics to path atomically, for a textfile collector."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render_prometheus())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _maybe_write_file():
+    global _last_file_write
+    if METRICS_FILE is None:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_file_write < FILE_INTERVAL:
+            return
+        _last_file_write = now
+    write_prometheus(METRICS_FILE)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds; keep the server log quiet
+
+
+def serve_prometheus(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread and return the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="tts-metrics", daemon=True).start()
+    return server
+
+
+def _start_exporters():
+    # Page scripts run on every interaction; the endpoint starts once per process
+    global _exporters_started
+    if _exporters_started:
+        return
+    with _lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if METRICS_PORT is not None:
+        try:
+            serve_prometheus(METRICS_PORT, METRICS_HOST)
+        except OSError as e:
+            # e.g. a second server process on the same host; pages still run
+            print(f"TTS Guard: metrics endpoint not started on port {METRICS_PORT}: {e}",
+                  file=sys.stderr)
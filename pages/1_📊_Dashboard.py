@@ -5,18 +5,22 @@ recent complaints, and client overview with interactive charts.
 """
 
 import streamlit as st
+import pandas as pd
 import plotly.graph_objects as go
+from datetime import date
 from database import (
-    get_active_contracts_count,
-    get_overdue_inspections,
-    get_upcoming_inspections,
-    get_completed_this_month,
-    get_recent_complaints,
-    get_client_summary,
-    get_financial_summary,
+    TREND_DAYS,
+    UPCOMING_DAYS,
+    get_complaints_page,
+    get_dashboard_snapshot,
+    get_status_engine,
+    record_daily_compliance_snapshot,
 )
+from pagination import current_page, page_controls
+from page_metrics import start_page
 from theme import get_colors, inject_css, plotly_layout
 
+timer = start_page("Dashboard")
 c = get_colors()
 inject_css()
 
@@ -28,14 +32,19 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # TOP ROW — 4 Inspection Metric Cards
 # ---------------------------------------------------------------------------
-contracts_count = get_active_contracts_count()
-overdue_df = get_overdue_inspections()
-overdue_count = len(overdue_df)
-upcoming_df = get_upcoming_inspections(14)
+timer.section("load data")
+record_daily_compliance_snapshot()
+# Lists and counts come from the SQL snapshot (one read transaction); the
+# status engine only supplies the forecast, which SQL does not compute
+snapshot = get_dashboard_snapshot()
+forecast = get_status_engine().overdue_forecast(date.today(), TREND_DAYS)
+contracts_count = snapshot.active_contracts
+overdue_count = len(snapshot.overdue)
+upcoming_df = snapshot.upcoming
 upcoming_count = len(upcoming_df)
-completed_df = get_completed_this_month()
-completed_count = len(completed_df)
+completed_count = snapshot.completed_this_month
 
+timer.section("render metrics")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.metric("Active Contracts", contracts_count)
@@ -47,7 +56,7 @@ with col2:
         delta_color="inverse" if overdue_count > 0 else "normal",
     )
 with col3:
-    st.metric("🟡 Due Within 14 Days", upcoming_count)
+    st.metric(f"🟡 Due Within {UPCOMING_DAYS} Days", upcoming_count)
 with col4:
     st.metric("🟢 Completed This Month", completed_count)
 
@@ -63,6 +72,7 @@ if overdue_count > 0:
 # ---------------------------------------------------------------------------
 # INSPECTION STATUS DISTRIBUTION (stacked horizontal bar)
 # ---------------------------------------------------------------------------
+timer.section("build figures")
 ok_count = max(contracts_count - overdue_count - upcoming_count, 0)
 
 fig_status = go.Figure()
@@ -98,8 +108,78 @@ fig_status.update_layout(**plotly_layout(
     yaxis={"visible": False},
     margin={"l": 0, "r": 0, "t": 30, "b": 0},
 ))
+timer.section("render charts")
 st.plotly_chart(fig_status, use_container_width=True)
 
+# ---------------------------------------------------------------------------
+# OVERDUE TREND (daily compliance snapshots, last 90 days)
+# ---------------------------------------------------------------------------
+timer.section("build figures")
+trend = snapshot.compliance_trend
+trend_dates = pd.to_datetime(trend["snapshot_date"])
+fig_overdue = go.Figure()
+fig_overdue.add_trace(go.Scatter(
+    x=trend_dates,
+    y=trend["overdue_unscheduled"],
+    name="Overdue",
+    mode="lines",
+    stackgroup="overdue",
+    line={"color": c["CHART_TERTIARY"], "width": 2},
+    hovertemplate="%{x|%d %b}<br>Overdue: %{y}<extra></extra>",
+))
+fig_overdue.add_trace(go.Scatter(
+    x=trend_dates,
+    y=trend["overdue"] - trend["overdue_unscheduled"],
+    name="Overdue, visit booked",
+    mode="lines",
+    stackgroup="overdue",
+    line={"color": c["CHART_PRIMARY"], "width": 2},
+    hovertemplate="%{x|%d %b}<br>Booked: %{y}<extra></extra>",
+))
+fig_overdue.update_layout(**plotly_layout(
+    height=220,
+    title=f"Overdue buildings — last {TREND_DAYS} days",
+    showlegend=True,
+    legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1},
+    yaxis_title="Buildings",
+    margin={"l": 0, "r": 0, "t": 50, "b": 0},
+))
+timer.section("render charts")
+st.plotly_chart(fig_overdue, use_container_width=True)
+
+# ---------------------------------------------------------------------------
+# OVERDUE FORECAST (status engine, next 90 days with no further visits)
+# ---------------------------------------------------------------------------
+timer.section("build figures")
+fig_forecast = go.Figure()
+fig_forecast.add_trace(go.Bar(
+    x=forecast["date"],
+    y=forecast["newly_overdue"],
+    name="Falling overdue",
+    marker_color=c["CHART_PRIMARY"],
+    hovertemplate="%{x|%d %b}<br>Falling overdue: %{y}<extra></extra>",
+))
+fig_forecast.add_trace(go.Scatter(
+    x=forecast["date"],
+    y=forecast["overdue"],
+    name="Overdue if not visited",
+    mode="lines",
+    yaxis="y2",
+    line={"color": c["CHART_TERTIARY"], "width": 2},
+    hovertemplate="%{x|%d %b}<br>Overdue: %{y}<extra></extra>",
+))
+fig_forecast.update_layout(**plotly_layout(
+    height=220,
+    title=f"Coming due — next {TREND_DAYS} days",
+    showlegend=True,
+    legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1},
+    yaxis_title="Buildings per day",
+    yaxis2={"overlaying": "y", "side": "right", "showgrid": False, "rangemode": "tozero"},
+    margin={"l": 0, "r": 0, "t": 50, "b": 0},
+))
+timer.section("render charts")
+st.plotly_chart(fig_forecast, use_container_width=True)
+
 st.divider()
 
 # ---------------------------------------------------------------------------
@@ -107,8 +187,8 @@ st.divider()
 # ---------------------------------------------------------------------------
 st.subheader("💰 Financial Health")
 
-financials = get_financial_summary()
-
+timer.section("render metrics")
+financials = snapshot.financials
 fcol1, fcol2, fcol3, fcol4 = st.columns(4)
 with fcol1:
     st.metric(
@@ -137,6 +217,7 @@ with fcol4:
     )
 
 # Collection rate donut chart
+timer.section("build figures")
 collection_pct = financials["collection_pct"]
 collected = financials["total_collected"]
 outstanding = financials["total_outstanding"]
@@ -161,6 +242,7 @@ fig_donut.update_layout(**plotly_layout(
         "showarrow": False,
     }],
 ))
+timer.section("render charts")
 st.plotly_chart(fig_donut, use_container_width=True)
 
 st.caption("→ View full details on the **💰 Financials** page")
@@ -170,6 +252,7 @@ st.divider()
 # ---------------------------------------------------------------------------
 # TWO COLUMNS: Upcoming Inspections + Recent Complaints
 # ---------------------------------------------------------------------------
+timer.section("render tables")
 left, right = st.columns(2)
 
 with left:
@@ -182,11 +265,14 @@ with left:
         display_df = display_df.sort_values("Days Remaining")
         st.dataframe(display_df, use_container_width=True, hide_index=True)
     else:
-        st.success("No inspections due within 14 days.")
+        st.success(f"No inspections due within {UPCOMING_DAYS} days.")
 
 with right:
     st.subheader("🎫 Recent Complaints")
-    complaints_df = get_recent_complaints(5)
+    complaints_page = current_page(
+        "complaints_page", lambda cursor, direction: get_complaints_page(cursor, direction, 5)
+    )
+    complaints_df = complaints_page.rows
     if len(complaints_df) > 0:
         priority_border_map = {
             "high": c["STATUS_RED"],
@@ -214,6 +300,7 @@ with right:
                     f"{comp['client_name']} — {comp['building_name']} · "
                     f"{comp['status'].replace('_', ' ').title()} · {comp['created_at']}"
                 )
+        page_controls("complaints_page", complaints_page)
     else:
         st.info("No recent complaints.")
 
@@ -224,7 +311,8 @@ st.divider()
 # ---------------------------------------------------------------------------
 st.subheader("👥 Client Overview")
 
-client_summary = get_client_summary()
+timer.section("render tables")
+client_summary = snapshot.client_summary
 if len(client_summary) > 0:
     display_cs = client_summary[
         ["Client", "Buildings", "Equipment", "Annual Value (AED)", "overdue_count"]
@@ -239,3 +327,5 @@ if len(client_summary) > 0:
     )
     display_cs = display_cs.drop(columns=["overdue_count"])
     st.dataframe(display_cs, use_container_width=True, hide_index=True)
+
+timer.end()
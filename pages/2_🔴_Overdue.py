@@ -4,16 +4,16 @@ Lists overdue buildings with scheduling capability (date + technician).
 """
 
 import streamlit as st
-import plotly.graph_objects as go
 from datetime import date, timedelta
 from database import (
     get_overdue_inspections,
     schedule_inspection,
-    is_building_scheduled,
     TECHNICIANS,
 )
+from page_metrics import start_page
 from theme import get_colors, inject_css, plotly_layout
 
+timer = start_page("Overdue")
 c = get_colors()
 inject_css()
 
@@ -22,11 +22,19 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-overdue_df = get_overdue_inspections()
+# One query: overdue buildings with their pending schedule, if any. The
+# list is classified in SQL (building_status.next_due_day), not by the
+# status engine, so the page needs no whole-portfolio classification
+timer.section("load data")
+all_overdue_df = get_overdue_inspections(include_scheduled=True)
+scheduled_df = all_overdue_df[all_overdue_df["is_scheduled"] == 1]
+overdue_df = all_overdue_df[all_overdue_df["is_scheduled"] == 0]
 overdue_count = len(overdue_df)
 
+timer.section("render tables")
 if overdue_count == 0:
     st.success("✅ No overdue inspections! All buildings are up to date.")
+    timer.end()
     st.stop()
 
 st.markdown(
@@ -36,15 +44,29 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+if len(scheduled_df) > 0:
+    with st.expander(f"📅 {len(scheduled_df)} overdue building(s) already scheduled"):
+        st.dataframe(
+            scheduled_df[[
+                "building_name", "client_name", "scheduled_date", "assigned_technician",
+            ]].rename(columns={
+                "building_name": "Building",
+                "client_name": "Client",
+                "scheduled_date": "Scheduled For",
+                "assigned_technician": "Technician",
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+
 st.divider()
 
+# Imported here so a rerun with nothing overdue never loads plotly
+import plotly.graph_objects as go
+
 for idx, row in overdue_df.iterrows():
     building_id = row["building_id"]
 
-    # Check if already scheduled
-    if is_building_scheduled(building_id):
-        continue
-
     with st.container(border=True):
         top_left, top_right = st.columns([3, 1])
 
@@ -59,11 +81,13 @@ for idx, row in overdue_df.iterrows():
             )
 
         with top_right:
+            # Days past the visit interval; 999 days since last when never inspected
             days_overdue = max(
                 int(row["days_since_last"]) - int(365 / row["visits_per_year"]),
                 0,
             )
             # Severity gauge
+            timer.section("build figures")
             fig_gauge = go.Figure(go.Indicator(
                 mode="gauge+number",
                 value=days_overdue,
@@ -84,7 +108,9 @@ for idx, row in overdue_df.iterrows():
                 height=160,
                 margin={"l": 15, "r": 15, "t": 30, "b": 0},
             ))
+            timer.section("render charts")
             st.plotly_chart(fig_gauge, use_container_width=True, key=f"gauge_{building_id}")
+            timer.section("render tables")
 
         # Last inspection info
         if row["last_inspection_date"]:
@@ -150,3 +176,5 @@ for idx, row in overdue_df.iterrows():
                 ):
                     st.session_state[schedule_key] = False
                     st.rerun()
+
+timer.end()
@@ -15,9 +15,10 @@ from database import (
     insert_complaint,
     TECHNICIANS,
 )
-from pdf_report import generate_inspection_pdf
+from page_metrics import start_page
 from theme import get_colors, inject_css, plotly_layout
 
+timer = start_page("Inspect")
 c = get_colors()
 inject_css()
 
@@ -29,7 +30,10 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # FORM FIELDS
 # ---------------------------------------------------------------------------
+timer.section("load data")
 buildings_df = get_all_buildings()
+
+timer.section("render form")
 building_options = {
     f"{row['short_name']} — {row['name']}": row["id"]
     for _, row in buildings_df.iterrows()
@@ -44,11 +48,14 @@ selected_label = st.selectbox(
 
 if selected_label is None:
     st.info("Select a building to begin the inspection.")
+    timer.end()
     st.stop()
 
+timer.section("load data")
 building_id = building_options[selected_label]
 building = get_building_details(building_id)
 
+timer.section("render form")
 col1, col2 = st.columns(2)
 with col1:
     technician = st.selectbox("Technician", TECHNICIANS)
@@ -63,9 +70,11 @@ st.divider()
 st.subheader("🔍 Equipment Checklist")
 st.caption(f"**{building['name']}** — {building['equipment_count']} items")
 
+timer.section("load data")
 equipment_df = get_equipment_by_building(building_id)
 grouped_df = get_equipment_grouped_by_type(building_id)
 
+timer.section("render form")
 # Track pass/fail per item using session state
 if "equip_status" not in st.session_state or st.session_state.get("equip_building_id") != building_id:
     st.session_state.equip_status = {
@@ -89,6 +98,7 @@ with pcol3:
     st.metric("⚠️ Failed", failed, delta_color="inverse" if failed > 0 else "off")
 
 # Pass rate gauge (updates in real-time as checkboxes toggle)
+timer.section("build figures")
 pass_rate = (passed / total * 100) if total > 0 else 100
 gauge_color = c["CHART_SECONDARY"] if pass_rate >= 80 else (
     c["CHART_PRIMARY"] if pass_rate >= 50 else c["STATUS_RED"]
@@ -119,8 +129,10 @@ fig_gauge.update_layout(**plotly_layout(
     height=220,
     margin={"l": 30, "r": 30, "t": 40, "b": 0},
 ))
+timer.section("render charts")
 st.plotly_chart(fig_gauge, use_container_width=True)
 
+timer.section("render form")
 st.markdown("---")
 
 # Grouped equipment with expanders
@@ -162,6 +174,7 @@ notes = st.text_area(
 )
 
 if st.button("✅ Submit Inspection", use_container_width=True, type="primary"):
+    timer.section("submit")
     # Insert inspection record
     inspection_id = insert_inspection(
         building_id=building_id,
@@ -171,8 +184,55 @@ if st.button("✅ Submit Inspection", use_container_width=True, type="primary"):
         items_passed=passed,
         items_failed=failed,
         notes=notes,
+        items=[
+            (int(eid), equip_status.get(str(eid), True))
+            for eid in equipment_df["id"]
+        ],
     )
 
+    # Build equipment details for PDF
+    equipment_details = []
+    for _, eq_row in equipment_df.iterrows():
+        eid = str(eq_row["id"])
+        status = "Passed" if equip_status.get(eid, True) else "Failed"
+        equipment_details.append({
+            "type": eq_row["type"],
+            "status": status,
+        })
+
+    report_params = {
+        "building_name": building["name"],
+        "client_name": building["client_name"],
+        "inspection_date": inspection_date.isoformat(),
+        "technician": technician,
+        "items_checked": total,
+        "items_passed": passed,
+        "items_failed": failed,
+        "equipment_details": equipment_details,
+        "notes": notes or "",
+        "report_date": date.today().isoformat(),
+    }
+    # Rendering starts in a worker process while the confirmation shows
+    from report_service import render_inspection_pdf
+    render_inspection_pdf(**report_params)
+
+    # Kept across reruns so the download and ticket buttons keep working
+    st.session_state.submitted_inspection = {
+        "inspection_id": inspection_id,
+        "building_id": building_id,
+        "report_params": report_params,
+    }
+
+timer.section("render form")
+submitted = st.session_state.get("submitted_inspection")
+if submitted and submitted["building_id"] == building_id:
+    inspection_id = submitted["inspection_id"]
+    report_params = submitted["report_params"]
+    total = report_params["items_checked"]
+    passed = report_params["items_passed"]
+    failed = report_params["items_failed"]
+    equipment_details = report_params["equipment_details"]
+
     st.success(f"✅ Inspection for **{building['name']}** submitted successfully!")
 
     st.divider()
@@ -197,30 +257,16 @@ if st.button("✅ Submit Inspection", use_container_width=True, type="primary"):
     # ---- PDF Report Download ----
     st.subheader("📄 Inspection Report")
 
-    # Build equipment details for PDF
-    equipment_details = []
-    for _, eq_row in equipment_df.iterrows():
-        eid = str(eq_row["id"])
-        status = "Passed" if equip_status.get(eid, True) else "Failed"
-        equipment_details.append({
-            "type": eq_row["type"],
-            "status": status,
-        })
+    from report_service import render_inspection_pdf
 
     try:
-        pdf_bytes = generate_inspection_pdf(
-            building_name=building["name"],
-            client_name=building["client_name"],
-            inspection_date=inspection_date.isoformat(),
-            technician=technician,
-            items_checked=total,
-            items_passed=passed,
-            items_failed=failed,
-            equipment_details=equipment_details,
-            notes=notes or "",
-        )
+        timer.section("render pdf")
+        # Same inputs, same cache key: reruns reuse the rendered file
+        report = render_inspection_pdf(**report_params)
+        with st.spinner("Rendering PDF report..."):
+            pdf_bytes = report.result(timeout=120)
 
-        filename = f"TTS_Inspection_{building['name'].replace(' ', '_')}_{inspection_date.isoformat()}.pdf"
+        filename = f"TTS_Inspection_{building['name'].replace(' ', '_')}_{report_params['inspection_date']}.pdf"
         st.download_button(
             label="📥 Download Inspection Report (PDF)",
             data=pdf_bytes,
@@ -233,17 +279,16 @@ if st.button("✅ Submit Inspection", use_container_width=True, type="primary"):
         st.caption("The inspection was saved successfully. PDF report can be regenerated later.")
 
     # ---- Create Complaint Ticket (if failures) ----
+    timer.section("render form")
     if failed > 0:
         st.divider()
         st.subheader("🎫 Create Complaint Ticket")
         st.warning(f"⚠️ {failed} items failed inspection — create a follow-up ticket?")
 
         # Build failure message
-        failed_items = []
-        for _, eq_row in equipment_df.iterrows():
-            eid = str(eq_row["id"])
-            if not equip_status.get(eid, True):
-                failed_items.append(eq_row["type"])
+        failed_items = [
+            item["type"] for item in equipment_details if item["status"] == "Failed"
+        ]
 
         # Count by type
         from collections import Counter
@@ -283,3 +328,5 @@ if st.button("✅ Submit Inspection", use_container_width=True, type="primary"):
                 inspection_id=inspection_id,
             )
             st.success(f"✅ Complaint ticket **{ticket}** created successfully!")
+
+timer.end()
@@ -3,17 +3,21 @@ TTS Guard — Clients Page
 Client directory with buildings, equipment, per-client financials and mini charts.
 """
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
 from datetime import date
 from database import (
     get_all_clients,
-    get_buildings_by_client,
-    get_client_financial_detail,
-    get_overdue_inspections,
+    get_all_client_buildings,
+    get_all_client_financials,
+    get_status_engine,
 )
+from page_metrics import start_page
 from theme import get_colors, inject_css, plotly_layout
 
+timer = start_page("Clients")
 c = get_colors()
 inject_css()
 
@@ -22,14 +26,38 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+
+def building_status_labels(buildings, statuses):
+    """Status label per building row, from the status engine's classification."""
+    status = statuses.reindex(buildings["id"])
+    is_overdue = ((status["status"] == "overdue") & ~status["is_scheduled"]).to_numpy()
+    days_left = status["days_until_next"]
+    due_soon = (days_left <= 14).to_numpy()
+    due_label = "🟡 Due in " + days_left.fillna(0).astype(int).astype(str) + "d"
+
+    return np.select(
+        [is_overdue, buildings["last_inspection"].isna().to_numpy(), due_soon],
+        ["🔴 Overdue", "🔴 No inspection", due_label.to_numpy()],
+        default="✅ OK",
+    )
+
+
+timer.section("load data")
 clients_df = get_all_clients()
-overdue_df = get_overdue_inspections()
-today = date.today()
+statuses = get_status_engine().classify(date.today())
 
+# Two set-based queries for the whole directory instead of two per client
+all_buildings = get_all_client_buildings()
+all_buildings["status"] = building_status_labels(all_buildings, statuses)
+buildings_by_client = dict(tuple(all_buildings.groupby("client_id", sort=False)))
+financials_by_client = get_all_client_financials()
+no_financials = {"total_value": 0, "total_paid": 0, "outstanding": 0}
+
+timer.section("render tables")
 for _, client in clients_df.iterrows():
     client_id = client["id"]
-    buildings_df = get_buildings_by_client(client_id)
-    financials = get_client_financial_detail(client_id)
+    buildings_df = buildings_by_client.get(client_id, all_buildings.iloc[0:0])
+    financials = financials_by_client.get(client_id, no_financials)
 
     # Count total contract value for header
     total_value = financials["total_value"]
@@ -53,35 +81,16 @@ for _, client in clients_df.iterrows():
         # Buildings table
         st.markdown("**Buildings**")
         if len(buildings_df) > 0:
-            display_data = []
-            for _, bld in buildings_df.iterrows():
-                # Check overdue status
-                is_overdue = len(
-                    overdue_df[overdue_df["building_id"] == bld["id"]]
-                ) > 0
-
-                # Compute status
-                if is_overdue:
-                    status = "🔴 Overdue"
-                elif bld["last_inspection"]:
-                    days_since = (today - date.fromisoformat(bld["last_inspection"])).days
-                    interval = 365 / (bld["visits_per_year"] or 4)
-                    days_left = int(interval - days_since)
-                    if days_left <= 14:
-                        status = f"🟡 Due in {days_left}d"
-                    else:
-                        status = "✅ OK"
-                else:
-                    status = "🔴 No inspection"
-
-                display_data.append({
-                    "Building": bld["name"],
-                    "Area": bld["area"],
-                    "Equipment": bld["equipment_count"],
-                    "Last Inspection": bld["last_inspection"] or "—",
-                    "Contract Value": f"AED {bld['annual_value']:,.0f}" if bld["annual_value"] else "—",
-                    "Status": status,
-                })
+            display_data = pd.DataFrame({
+                "Building": buildings_df["name"],
+                "Area": buildings_df["area"],
+                "Equipment": buildings_df["equipment_count"],
+                "Last Inspection": buildings_df["last_inspection"].fillna("—"),
+                "Contract Value": buildings_df["annual_value"].map(
+                    lambda v: f"AED {v:,.0f}" if pd.notna(v) and v else "—"
+                ),
+                "Status": buildings_df["status"],
+            })
 
             st.dataframe(
                 display_data,
@@ -122,6 +131,7 @@ for _, client in clients_df.iterrows():
             paid = financials["total_paid"]
             outstanding_amt = financials["outstanding"]
             if paid > 0 or outstanding_amt > 0:
+                timer.section("build figures")
                 pct = (paid / (paid + outstanding_amt) * 100) if (paid + outstanding_amt) > 0 else 0
                 fig_mini = go.Figure(data=[go.Pie(
                     labels=["Paid", "Outstanding"],
@@ -143,4 +153,8 @@ for _, client in clients_df.iterrows():
                         "showarrow": False,
                     }],
                 ))
+                timer.section("render charts")
                 st.plotly_chart(fig_mini, use_container_width=True, key=f"donut_{client_id}")
+                timer.section("render tables")
+
+timer.end()
@@ -1,19 +1,28 @@
 """
 TTS Guard — Reports Page
-Monthly compliance reports with interactive Plotly charts (6 months depth).
+Monthly compliance reports with interactive Plotly charts (6 months depth)
+and 12/24/36-month trends, read from the pre-aggregated monthly rollup.
 """
 
+import os
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import date
 from database import (
-    get_inspections_by_month,
-    get_complaints_by_month,
+    get_month_rollup,
+    get_month_rollup_by_client,
+    get_monthly_trend,
+    get_compliance_trend,
+    record_daily_compliance_snapshot,
+    get_inspections_page,
     get_all_clients,
 )
+from pagination import current_page, page_controls
+from page_metrics import start_page
 from theme import get_colors, inject_css, plotly_layout
 
+timer = start_page("Reports")
 c = get_colors()
 inject_css()
 
@@ -48,21 +57,23 @@ st.divider()
 # ---------------------------------------------------------------------------
 # DATA
 # ---------------------------------------------------------------------------
-inspections_df = get_inspections_by_month(year, month)
-complaints_df = get_complaints_by_month(year, month)
+timer.section("load data")
+month_totals = get_month_rollup(year, month)
+by_client = get_month_rollup_by_client(year, month)
 
 # ---------------------------------------------------------------------------
 # SUMMARY METRICS
 # ---------------------------------------------------------------------------
+timer.section("render metrics")
 st.subheader(f"📊 Summary — {label}")
 
-total_inspections = len(inspections_df)
-total_equipment = int(inspections_df["items_checked"].sum()) if total_inspections > 0 else 0
-total_passed = int(inspections_df["items_passed"].sum()) if total_inspections > 0 else 0
+total_inspections = month_totals["inspection_count"]
+total_equipment = month_totals["items_checked"]
+total_passed = month_totals["items_passed"]
 compliance_rate = (total_passed / total_equipment * 100) if total_equipment > 0 else 0
 
-total_complaints = len(complaints_df)
-resolved_complaints = len(complaints_df[complaints_df["status"] == "resolved"]) if total_complaints > 0 else 0
+total_complaints = month_totals["complaint_count"]
+resolved_complaints = month_totals["complaints_resolved"]
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
@@ -81,6 +92,7 @@ with col4:
 # COMPLIANCE RATE GAUGE
 # ---------------------------------------------------------------------------
 if total_equipment > 0:
+    timer.section("build figures")
     gauge_color = c["CHART_SECONDARY"] if compliance_rate >= 80 else (
         c["CHART_PRIMARY"] if compliance_rate >= 50 else c["STATUS_RED"]
     )
@@ -101,6 +113,7 @@ if total_equipment > 0:
         title={"text": "Compliance Rate", "font": {"color": c["TEXT_MUTED"]}},
     ))
     fig_compliance.update_layout(**plotly_layout(height=250))
+    timer.section("render charts")
     st.plotly_chart(fig_compliance, use_container_width=True)
 
 st.divider()
@@ -108,19 +121,16 @@ st.divider()
 # ---------------------------------------------------------------------------
 # CHARTS
 # ---------------------------------------------------------------------------
+timer.section("build figures")
 chart_left, chart_right = st.columns(2)
 
 with chart_left:
     st.subheader("Inspections by Client")
     if total_inspections > 0:
-        by_client = (
-            inspections_df.groupby("client_name")
-            .size()
-            .reset_index(name="Inspections")
-        )
+        inspected = by_client[by_client["inspection_count"] > 0]
         fig_client = go.Figure(data=[go.Bar(
-            x=by_client["client_name"],
-            y=by_client["Inspections"],
+            x=inspected["client_name"],
+            y=inspected["inspection_count"],
             marker_color=c["CHART_PRIMARY"],
             hovertemplate="<b>%{x}</b><br>Inspections: %{y}<extra></extra>",
         )])
@@ -129,21 +139,20 @@ with chart_left:
             xaxis_title="",
             yaxis_title="Inspections",
         ))
+        timer.section("render charts")
         st.plotly_chart(fig_client, use_container_width=True)
+        timer.section("build figures")
     else:
         st.info(f"No inspections recorded for {label}.")
 
 with chart_right:
     st.subheader("Complaints by Priority")
     if total_complaints > 0:
-        by_priority = (
-            complaints_df.groupby("priority")
-            .size()
-            .reset_index(name="Count")
-        )
-        priority_order = {"high": 0, "medium": 1, "low": 2}
-        by_priority["order"] = by_priority["priority"].map(priority_order)
-        by_priority = by_priority.sort_values("order").drop(columns=["order"])
+        by_priority = pd.DataFrame({
+            "priority": ["high", "medium", "low"],
+            "Count": [month_totals[f"complaints_{p}"] for p in ("high", "medium", "low")],
+        })
+        by_priority = by_priority[by_priority["Count"] > 0]
 
         # Semantic colors per priority
         priority_colors = {
@@ -164,18 +173,144 @@ with chart_right:
             xaxis_title="",
             yaxis_title="Complaints",
         ))
+        timer.section("render charts")
         st.plotly_chart(fig_priority, use_container_width=True)
     else:
         st.info(f"No complaints recorded for {label}.")
 
 st.divider()
 
+# ---------------------------------------------------------------------------
+# TRENDS
+# ---------------------------------------------------------------------------
+st.subheader("📉 Trends")
+
+trend_months = st.radio(
+    "Trend window",
+    options=[12, 24, 36],
+    index=1,
+    format_func=lambda n: f"{n} months",
+    horizontal=True,
+)
+timer.section("load data")
+trend = get_monthly_trend(trend_months)
+
+timer.section("build figures")
+trend_labels = pd.to_datetime(trend["month"] + "-01").dt.strftime("%b %Y")
+trend_rate = (trend["items_passed"] / trend["items_checked"].where(trend["items_checked"] > 0) * 100).round(1)
+
+trend_left, trend_right = st.columns(2)
+
+with trend_left:
+    fig_trend = go.Figure()
+    fig_trend.add_trace(go.Bar(
+        x=trend_labels,
+        y=trend["inspection_count"],
+        name="Inspections",
+        marker_color=c["CHART_PRIMARY"],
+        hovertemplate="<b>%{x}</b><br>Inspections: %{y}<extra></extra>",
+    ))
+    fig_trend.add_trace(go.Scatter(
+        x=trend_labels,
+        y=trend_rate,
+        name="Compliance %",
+        yaxis="y2",
+        mode="lines+markers",
+        line={"color": c["CHART_SECONDARY"], "width": 2},
+        connectgaps=True,
+        hovertemplate="<b>%{x}</b><br>Compliance: %{y}%<extra></extra>",
+    ))
+    fig_trend.update_layout(**plotly_layout(
+        height=350,
+        xaxis_title="",
+        yaxis_title="Inspections",
+        yaxis2={"title": "Compliance %", "overlaying": "y", "side": "right",
+                "range": [0, 100], "showgrid": False},
+        showlegend=True,
+        legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1},
+    ))
+    timer.section("render charts")
+    st.plotly_chart(fig_trend, use_container_width=True)
+
+with trend_right:
+    timer.section("build figures")
+    fig_complaints = go.Figure()
+    for priority, color in (("high", c["STATUS_RED"]), ("medium", c["CHART_PRIMARY"]),
+                            ("low", c["CHART_SECONDARY"])):
+        fig_complaints.add_trace(go.Bar(
+            x=trend_labels,
+            y=trend[f"complaints_{priority}"],
+            name=priority.title(),
+            marker_color=color,
+            hovertemplate=f"<b>%{{x}}</b><br>{priority.title()}: %{{y}}<extra></extra>",
+        ))
+    fig_complaints.update_layout(**plotly_layout(
+        height=350,
+        barmode="stack",
+        xaxis_title="",
+        yaxis_title="Complaints",
+        showlegend=True,
+        legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1},
+    ))
+    timer.section("render charts")
+    st.plotly_chart(fig_complaints, use_container_width=True)
+
+# Building compliance from the daily snapshots
+timer.section("load data")
+record_daily_compliance_snapshot()
+daily = get_compliance_trend(90)
+
+timer.section("build figures")
+daily_dates = pd.to_datetime(daily["snapshot_date"])
+
+fig_daily = go.Figure()
+fig_daily.add_trace(go.Bar(
+    x=daily_dates,
+    y=daily["overdue"],
+    name="Overdue buildings",
+    marker_color=c["STATUS_RED"],
+    hovertemplate="%{x|%d %b %Y}<br>Overdue: %{y}<extra></extra>",
+))
+fig_daily.add_trace(go.Scatter(
+    x=daily_dates,
+    y=daily["compliance_pct"].round(1),
+    name="Buildings compliant %",
+    yaxis="y2",
+    mode="lines",
+    line={"color": c["CHART_SECONDARY"], "width": 2},
+    hovertemplate="%{x|%d %b %Y}<br>Compliant: %{y}%<extra></extra>",
+))
+fig_daily.update_layout(**plotly_layout(
+    height=300,
+    title="Building compliance — last 90 days",
+    xaxis_title="",
+    yaxis_title="Overdue",
+    yaxis2={"title": "Compliant %", "overlaying": "y", "side": "right",
+            "range": [0, 100], "showgrid": False},
+    showlegend=True,
+    legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1},
+))
+timer.section("render charts")
+st.plotly_chart(fig_daily, use_container_width=True)
+
+st.divider()
+
 # ---------------------------------------------------------------------------
 # INSPECTION DETAIL TABLE
 # ---------------------------------------------------------------------------
+timer.section("render tables")
 st.subheader("Inspection Details")
 if total_inspections > 0:
-    detail_df = inspections_df[
+    month_start = date(year, month, 1)
+    month_end = date(year + month // 12, month % 12 + 1, 1)
+    detail_page = current_page(
+        "inspection_details_page",
+        lambda cursor, direction: get_inspections_page(
+            cursor, direction, start=month_start.isoformat(), end=month_end.isoformat()
+        ),
+        reset_on=(year, month),
+    )
+    detail_df = detail_page.rows[
         ["inspection_date", "client_name", "building_name", "technician",
          "items_checked", "items_passed", "items_failed"]
     ].copy()
@@ -184,5 +319,66 @@ if total_inspections > 0:
         "Checked", "Passed", "Failed",
     ]
     st.dataframe(detail_df, use_container_width=True, hide_index=True)
+    page_controls("inspection_details_page", detail_page)
 else:
     st.info(f"No inspection data for {label}.")
+
+st.divider()
+
+# ---------------------------------------------------------------------------
+# MONTHLY REPORT PACK (one PDF per inspection, zipped)
+# ---------------------------------------------------------------------------
+timer.section("report pack")
+st.subheader("📦 Monthly Report Pack")
+
+clients_df = get_all_clients()
+client_options = {"All clients": None}
+client_options.update({row["name"]: row["id"] for _, row in clients_df.iterrows()})
+pack_client = st.selectbox("Client", list(client_options.keys()), key="pack_client")
+pack_client_id = client_options[pack_client]
+
+if st.button(f"📄 Generate PDF pack for {label}", use_container_width=True):
+    # The report modules load on the first pack, not on every visit
+    from monthly_reports import write_pack
+
+    progress_bar = st.progress(0.0, text="Rendering reports...")
+
+    def on_progress(done, total, failure):
+        progress_bar.progress(done / total, text=f"Rendering reports... {done}/{total}")
+
+    # One file per month and client, replaced on rebuild, not one per click
+    pack_path, result = write_pack(year, month, pack_client_id, progress=on_progress)
+    progress_bar.empty()
+    st.session_state.report_pack = {
+        "key": (year, month, pack_client_id),
+        "path": pack_path,
+        "result": result,
+    }
+
+pack = st.session_state.get("report_pack")
+if pack and pack["key"] == (year, month, pack_client_id):
+    result = pack["result"]
+    if result["total"] == 0:
+        st.info(f"No inspections to report for {label}.")
+    else:
+        st.caption(
+            f"{result['written']} of {result['total']} reports rendered "
+            f"in {result['seconds']:.1f}s"
+        )
+        if result["failures"]:
+            with st.expander(f"⚠️ {len(result['failures'])} report(s) failed"):
+                for name, error in result["failures"]:
+                    st.markdown(f"- **{name}**: {error}")
+        if os.path.exists(pack["path"]):
+            with open(pack["path"], "rb") as f:
+                st.download_button(
+                    label="📥 Download Report Pack (ZIP)",
+                    data=f,
+                    file_name=f"TTS_Reports_{year}-{month:02d}.zip",
+                    mime="application/zip",
+                    use_container_width=True,
+                )
+        else:
+            st.info("The report pack is no longer on the server; generate it again.")
+
+timer.end()
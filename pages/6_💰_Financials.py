@@ -10,12 +10,15 @@ import plotly.graph_objects as go
 from database import (
     get_financial_summary,
     get_client_financial_breakdown,
-    get_payment_history,
+    get_payments_page,
     get_monthly_revenue,
     get_outstanding_invoices,
 )
+from page_metrics import start_page
+from pagination import current_page, page_controls
 from theme import get_colors, inject_css, plotly_layout
 
+timer = start_page("Financials")
 c = get_colors()
 inject_css()
 
@@ -28,8 +31,10 @@ st.caption("Revenue tracking and payment status for all AMC contracts")
 # ---------------------------------------------------------------------------
 # TOP ROW — 4 Financial Metrics
 # ---------------------------------------------------------------------------
+timer.section("load data")
 financials = get_financial_summary()
 
+timer.section("render metrics")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.metric(
@@ -61,6 +66,7 @@ with col4:
 # ---------------------------------------------------------------------------
 # COLLECTION BREAKDOWN DONUT
 # ---------------------------------------------------------------------------
+timer.section("build figures")
 collection_pct = financials["collection_pct"]
 collected = financials["total_collected"]
 outstanding_val = financials["total_outstanding"]
@@ -87,6 +93,7 @@ fig_donut.update_layout(**plotly_layout(
         "showarrow": False,
     }],
 ))
+timer.section("render charts")
 st.plotly_chart(fig_donut, use_container_width=True)
 
 st.divider()
@@ -96,7 +103,10 @@ st.divider()
 # ---------------------------------------------------------------------------
 st.subheader("📊 Client Financial Summary")
 
+timer.section("load data")
 client_fin_raw = get_client_financial_breakdown()
+
+timer.section("render tables")
 if len(client_fin_raw) > 0:
     # Display copy with formatted currency
     client_fin_display = client_fin_raw.copy()
@@ -118,6 +128,7 @@ if len(client_fin_raw) > 0:
 
     # Stacked horizontal bar — paid vs outstanding per client
     st.subheader("📊 Client Revenue Breakdown")
+    timer.section("build figures")
     fig_hbar = go.Figure()
     fig_hbar.add_trace(go.Bar(
         y=client_fin_raw["Client"],
@@ -143,6 +154,7 @@ if len(client_fin_raw) > 0:
         yaxis_title="",
         legend={"orientation": "h", "y": 1.1},
     ))
+    timer.section("render charts")
     st.plotly_chart(fig_hbar, use_container_width=True)
 
 st.divider()
@@ -152,7 +164,10 @@ st.divider()
 # ---------------------------------------------------------------------------
 st.subheader("📈 Monthly Collections")
 
+timer.section("load data")
 monthly_rev = get_monthly_revenue(6)
+
+timer.section("build figures")
 if len(monthly_rev) > 0:
     fig_monthly = go.Figure(data=[go.Bar(
         x=monthly_rev["month"],
@@ -166,6 +181,7 @@ if len(monthly_rev) > 0:
         yaxis_title="Amount (AED)",
         yaxis_tickformat=",",
     ))
+    timer.section("render charts")
     st.plotly_chart(fig_monthly, use_container_width=True)
 else:
     st.info("No payment data available for chart.")
@@ -177,7 +193,11 @@ st.divider()
 # ---------------------------------------------------------------------------
 st.subheader("💳 Recent Payments")
 
-payments_df = get_payment_history(20)
+timer.section("render tables")
+payments_page = current_page(
+    "payments_page", lambda cursor, direction: get_payments_page(cursor, direction, 20)
+)
+payments_df = payments_page.rows.drop(columns=["id"])
 if len(payments_df) > 0:
     # Format amount
     payments_df["Amount (AED)"] = payments_df["Amount (AED)"].apply(
@@ -197,6 +217,7 @@ if len(payments_df) > 0:
         lambda m: m.replace("_", " ").title() if m else "—"
     )
     st.dataframe(payments_df, use_container_width=True, hide_index=True)
+    page_controls("payments_page", payments_page)
 
 st.divider()
 
@@ -222,3 +243,5 @@ with st.expander("📋 View Outstanding Invoices"):
         st.dataframe(outstanding_df, use_container_width=True, hide_index=True)
     else:
         st.success("No outstanding invoices!")
+
+timer.end()
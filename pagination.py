@@ -0,0 +1,56 @@
+"""
+TTS Guard — Table Pagination
+Previous/next controls for tables backed by the keyset-paginated queries
+in database.py, so the browser only ever receives one page of rows.
+"""
+
+import streamlit as st
+
+
+def _state(state_key, reset_on):
+    state = st.session_state.get(state_key)
+    if state is None or state["reset_on"] != reset_on:
+        state = {"cursor": None, "direction": "next", "number": 1, "reset_on": reset_on}
+        st.session_state[state_key] = state
+    return state
+
+
+def current_page(state_key, fetch, reset_on=None):
+    """
+    Return the page this session is looking at.
+
+    fetch(cursor, direction) must return a database.Page. The cursor is
+    kept in st.session_state[state_key]; a change in reset_on (e.g. a
+    selected month) goes back to the first page.
+    """
+    state = _state(state_key, reset_on)
+    page = fetch(state["cursor"], state["direction"])
+    if page.rows.empty and state["cursor"] is not None:
+        # The rows around the cursor were deleted; start over
+        state.update(cursor=None, direction="next", number=1)
+        page = fetch(None, "next")
+    return page
+
+
+def _move(state_key, cursor, direction, step):
+    state = st.session_state[state_key]
+    state.update(cursor=cursor, direction=direction, number=max(1, state["number"] + step))
+
+
+def page_controls(state_key, page):
+    """Draw Previous / page number / Next under a table shown with current_page."""
+    if not (page.has_prev or page.has_next):
+        return
+    number = st.session_state[state_key]["number"]
+    prev_col, label_col, next_col = st.columns([1, 3, 1])
+    prev_col.button(
+        "← Previous", key=f"{state_key}_prev", disabled=not page.has_prev,
+        on_click=_move, args=(state_key, page.first, "prev", -1),
+        use_container_width=True,
+    )
+    label_col.caption(f"Page {number}")
+    next_col.button(
+        "Next →", key=f"{state_key}_next", disabled=not page.has_next,
+        on_click=_move, args=(state_key, page.last, "next", 1),
+        use_container_width=True,
+    )
@@ -3,23 +3,123 @@ TTS Guard — PDF Inspection Report Generator
 Generates professional PDF reports with TTS branding and Civil Defence reference.
 """
 
+import copy
 import os
+import re
+import threading
 from datetime import date
 from fpdf import FPDF
+from fpdf.enums import PDFResourceType
+from fpdf.image_parsing import get_img_info
+from fpdf.util import escape_parens
 
 ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 LOGO_PATH = os.path.join(ASSETS_DIR, "logo.png")
 
+# Header/footer replay, the cached logo and add_table_rows use fpdf2
+# internals (_out, _resource_catalog, image_cache, ...), so requirements.txt
+# pins the tested fpdf2 range and tests/test_pdf_report.py checks them.
+
+# Every report registers these fonts first and in this order, so font
+# resource names (/F1, /F2, ...) are the same in every document and a
+# drawing captured from one document can be replayed into another.
+REPORT_FONTS = [("Helvetica", "B"), ("Helvetica", ""), ("Helvetica", "I")]
+
+
+# ---------------------------------------------------------------------------
+# PROCESS-WIDE ASSETS
+# ---------------------------------------------------------------------------
+
+_assets_lock = threading.Lock()
+_logo_info = None  # parsed logo.png; False when missing or unreadable
+_templates = {}    # "header" / "footer" -> captured drawing
+
+_FONT_RE = re.compile(r"/F(\d+)\s+[\d.]+\s+Tf")
+_IMAGE_RE = re.compile(r"/I(\d+) Do")
+
+
+def _get_logo_info():
+    """Parse the logo once per process."""
+    global _logo_info
+    if _logo_info is None:
+        with _assets_lock:
+            if _logo_info is None:
+                try:
+                    _logo_info = get_img_info(LOGO_PATH) if os.path.exists(LOGO_PATH) else False
+                except Exception:
+                    _logo_info = False
+    return _logo_info
+
+
+def _capture_template(name):
+    """
+    Draw a static page element once on a scratch page and keep the
+    content-stream bytes. The scratch page starts from the default
+    graphics state, so the capture sets every colour and width it uses.
+    """
+    scratch = InspectionReport("", "")
+    scratch.capturing = True
+    scratch.add_page()
+    contents = scratch.pages[scratch.page].contents
+    start = len(contents)
+    getattr(scratch, f"_draw_{name}")()
+    stream = bytes(contents[start:])
+    text = stream.decode("latin-1")
+    return {
+        "stream": stream,
+        "fonts": {int(i) for i in _FONT_RE.findall(text)},
+        "images": {int(i) for i in _IMAGE_RE.findall(text)},
+        "x": scratch.x,
+        "y": scratch.y,
+    }
+
 
 class InspectionReport(FPDF):
     """Custom PDF class for TTS inspection reports."""
 
+    # Set on the scratch document used to capture header/footer templates
+    capturing = False
+
     def __init__(self, building_name, client_name, **kwargs):
         super().__init__(**kwargs)
         self.building_name = building_name
         self.client_name = client_name
+        for family, style in REPORT_FONTS:
+            self.set_font(family, style)
+        self.has_logo = self._add_cached_logo()
+
+    def _add_cached_logo(self):
+        """Reuse the process-wide parsed logo instead of re-reading the file."""
+        info = _get_logo_info()
+        if not info:
+            return False
+        info = copy.copy(info)
+        info["i"] = len(self.image_cache.images) + 1
+        info["usages"] = 0
+        self.image_cache.images[LOGO_PATH] = info
+        return True
+
+    def _draw_template(self, name):
+        """Replay a captured header/footer drawing onto the current page."""
+        template = _templates.get(name)
+        if template is None:
+            template = _templates.setdefault(name, _capture_template(name))
+        # q/Q keeps the replayed colours and fonts from leaking into the page
+        self._out("q")
+        self._out(template["stream"])
+        self._out("Q")
+        for font_id in template["fonts"]:
+            self._resource_catalog.add(PDFResourceType.FONT, font_id, self.page)
+        for image_id in template["images"]:
+            self._resource_catalog.add(PDFResourceType.X_OBJECT, image_id, self.page)
+            self.image_cache.images[LOGO_PATH]["usages"] += 1
+        self.set_xy(template["x"], template["y"])
 
     def header(self):
+        if not self.capturing:
+            self._draw_template("header")
+
+    def _draw_header(self):
         # TTS navy header bar
         self.set_fill_color(1, 47, 93)  # #012f5d
         self.rect(0, 0, 210, 12, "F")
@@ -29,12 +129,9 @@ class InspectionReport(FPDF):
         self.rect(0, 12, 210, 1.5, "F")
 
         # Logo or text fallback
-        if os.path.exists(LOGO_PATH):
-            try:
-                self.image(LOGO_PATH, 10, 16, 35)
-                x_start = 50
-            except Exception:
-                x_start = 10
+        if self.has_logo:
+            self.image(LOGO_PATH, 10, 16, 35)
+            x_start = 50
         else:
             x_start = 10
 
@@ -62,6 +159,13 @@ class InspectionReport(FPDF):
         self.ln(6)
 
     def footer(self):
+        if self.capturing:
+            return
+        self._draw_template("footer")
+        self.set_font("Helvetica", "", 7)
+        self.cell(0, 4, f"Page {self.page_no()}/{{nb}}", align="C")
+
+    def _draw_footer(self):
         self.set_y(-30)
         # Civil Defence reference section
         self.set_draw_color(200, 200, 200)
@@ -79,8 +183,6 @@ class InspectionReport(FPDF):
                   "Report generated by TTS Guard AMC Management System.",
                   ln=True)
         self.ln(2)
-        self.set_font("Helvetica", "", 7)
-        self.cell(0, 4, f"Page {self.page_no()}/{{nb}}", align="C")
 
     def add_section_header(self, title):
         """Add a colored section header."""
@@ -117,6 +219,39 @@ class InspectionReport(FPDF):
             self.cell(width, 6, f" {str(value)}", border=1, fill=fill)
         self.ln()
 
+    def add_table_rows(self, rows, widths):
+        """
+        Add many table data rows, striped like add_table_row with fill on
+        even rows. Writes each row's border and text operators directly
+        rather than going through cell() once per column.
+        """
+        h = 6
+        k = self.k
+        self.set_font("Helvetica", "", 8)
+        text_color = self.text_color.serialize().lower()
+        for idx, values in enumerate(rows):
+            fill = idx % 2 == 0
+            if self.will_page_break(h):
+                self.add_page()
+                self.set_font("Helvetica", "", 8)
+            if fill:
+                self.set_fill_color(248, 248, 248)
+            if not self.current_font_is_set_on_page:
+                self._out(self._set_font_for_page(self.current_font, self.font_size_pt))
+
+            top = (self.h - self.y) * k
+            baseline = (self.h - self.y - 0.5 * h - 0.3 * self.font_size) * k
+            op = "B" if fill else "S"
+            boxes, texts = [], []
+            x = self.x
+            for value, width in zip(values, widths):
+                boxes.append(f"{x * k:.2f} {top:.2f} {width * k:.2f} {-h * k:.2f} re {op}")
+                text = escape_parens(self.normalize_text(f" {value}"))
+                texts.append(f"BT {(x + self.c_margin) * k:.2f} {baseline:.2f} Td ({text}) Tj ET")
+                x += width
+            self._out("\n".join(boxes) + f"\nq {text_color}\n" + "\n".join(texts) + "\nQ")
+            self.set_xy(self.l_margin, self.y + h)
+
 
 def generate_inspection_pdf(
     building_name,
@@ -128,6 +263,7 @@ def generate_inspection_pdf(
     items_failed,
     equipment_details,
     notes="",
+    report_date=None,
 ):
     """
     Generate a professional inspection report PDF.
@@ -140,8 +276,10 @@ def generate_inspection_pdf(
         items_checked: Total items checked
         items_passed: Items that passed
         items_failed: Items that failed
-        equipment_details: List of dicts with keys: type, status ('Passed'/'Failed')
+        equipment_details: List of dicts with keys: type, status ('Passed'/'Failed',
+            anything else is printed as-is with no remark)
         notes: Inspection notes
+        report_date: Date printed as the report date (default: today)
 
     Returns:
         bytes: PDF file content
@@ -156,7 +294,7 @@ def generate_inspection_pdf(
     pdf.add_key_value("Building", building_name, bold_value=True)
     pdf.add_key_value("Inspection Date", str(inspection_date))
     pdf.add_key_value("Inspector", technician)
-    pdf.add_key_value("Report Date", date.today().isoformat())
+    pdf.add_key_value("Report Date", str(report_date or date.today().isoformat()))
     pdf.ln(4)
 
     # ----- SUMMARY -----
@@ -212,14 +350,15 @@ def generate_inspection_pdf(
     widths = [10, 80, 30, 70]
     pdf.add_table_header(headers, widths)
 
-    for idx, item in enumerate(equipment_details):
-        status_text = item.get("status", "Passed")
-        remarks = "OK" if status_text == "Passed" else "Requires attention"
-        pdf.add_table_row(
-            [str(idx + 1), item["type"], status_text, remarks],
-            widths,
-            fill=(idx % 2 == 0),
-        )
+    remarks = {"Passed": "OK", "Failed": "Requires attention"}
+    pdf.add_table_rows(
+        (
+            [str(idx + 1), item["type"], item.get("status", "Passed"),
+             remarks.get(item.get("status", "Passed"), "-")]
+            for idx, item in enumerate(equipment_details)
+        ),
+        widths,
+    )
 
     pdf.ln(6)
 
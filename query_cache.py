@@ -0,0 +1,141 @@
+"""
+TTS Guard — Query Result Cache
+Memoizes read functions keyed on function, arguments and a database
+version token, with LRU, TTL and memory-cap eviction.
+"""
+
+import copy
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_size(value):
+    """Rough size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """
+    LRU cache of query results shared by every session in the process.
+
+    `version` is a callable returning a token that changes whenever the
+    underlying data may have changed. When the token moves, every entry
+    is dropped, so a write from any session invalidates the cache for all
+    of them. `bypass`, if given, returns True when a call must not be
+    cached. Values are copied in and out, so callers can mutate the
+    DataFrames they get back.
+    """
+
+    def __init__(self, version, bypass=None, max_entries=512,
+                 max_bytes=64 * 1024 * 1024, ttl=300.0):
+        self.version = version
+        self.bypass = bypass
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = True
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._current_version = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                       "invalidations": 0}
+        self._by_function = {}
+
+    def cached(self, fn):
+        """Decorator memoizing `fn` on its arguments and the version token."""
+        name = fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or (self.bypass is not None and self.bypass()):
+                return fn(*args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            version = self.version()
+            hit, value = self._get(key, version, name)
+            if hit:
+                return copy.deepcopy(value)
+            value = fn(*args, **kwargs)
+            self._put(key, copy.deepcopy(value), version)
+            return value
+
+        wrapper.uncached = fn
+        return wrapper
+
+    def _get(self, key, version, name):
+        with self._lock:
+            if version != self._current_version:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._drop_all()
+                self._current_version = version
+
+            counts = self._by_function.setdefault(name, {"hits": 0, "misses": 0})
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] > self.ttl:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                counts["misses"] += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            counts["hits"] += 1
+            return True, entry[0]
+
+    def _put(self, key, value, version):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A write landed while the query ran; the result may predate it
+            if version != self._current_version:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _drop_all(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def clear(self):
+        """Drop every entry (statistics are kept)."""
+        with self._lock:
+            self._drop_all()
+
+    def stats(self):
+        """Return hit/miss/eviction counters, size and per-function counts."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "functions": {k: dict(v) for k, v in self._by_function.items()},
+            }
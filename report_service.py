@@ -0,0 +1,317 @@
+"""
+TTS Guard — Report Rendering Service
+Renders PDF reports in a pool of worker processes and keeps finished
+files in an on-disk cache keyed by a hash of the report inputs.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import date
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".report_cache")
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+WORKERS = 2
+
+# Bump when a renderer's output changes, so stale cached files are not served
+REPORT_FORMAT_VERSION = 2
+
+
+class ReportRenderError(Exception):
+    """A renderer failed; carries the original error as text."""
+
+
+def _render_inspection(params):
+    from pdf_report import generate_inspection_pdf
+    return generate_inspection_pdf(**params)
+
+
+# Report kind -> function(params) returning PDF bytes, run in a worker process
+RENDERERS = {
+    "inspection": _render_inspection,
+}
+
+
+def _render(kind, params):
+    # Library exceptions do not always survive pickling back to the
+    # parent, and one that fails to unpickle breaks the whole pool
+    try:
+        return RENDERERS[kind](params)
+    except Exception as e:
+        raise ReportRenderError(f"{type(e).__name__}: {e}") from None
+
+
+@contextmanager
+def _bare_main():
+    """
+    Streamlit runs each page as the __main__ module, and spawned workers
+    re-import __main__ from its file. Hide it while workers start so a
+    worker never re-runs the page script.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        if main is not None:
+            sys.modules["__main__"] = main
+
+
+def report_key(kind, params):
+    """Content hash identifying a report: same inputs, same key."""
+    payload = json.dumps(
+        {"kind": kind, "version": REPORT_FORMAT_VERSION, "params": params},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# ON-DISK CACHE
+# ---------------------------------------------------------------------------
+
+class ReportCache:
+    """
+    Directory of finished PDFs named by report key.
+
+    Reads refresh a file's mtime, and when the directory grows past
+    max_bytes the least recently used files are deleted first, down to
+    90% of the cap so a run of writes does not rescan on every put.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = None  # running total, None until the first scan
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        """Return the cached PDF bytes, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return data
+
+    def put(self, key, data):
+        """Store PDF bytes atomically, then enforce the size cap."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += len(data)
+            if self._bytes is None or self._bytes > self.max_bytes:
+                self._evict()
+
+    def _files(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, entry.path))
+        return files
+
+    def _evict(self):
+        # Caller holds the lock. Rescan: other processes share the directory
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self._stats["evictions"] += 1
+        self._bytes = total
+
+    def clear(self):
+        """Delete every cached file."""
+        with self._lock:
+            for _, _, path in self._files():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters plus file count and size."""
+        with self._lock:
+            files = self._files()
+            return {
+                **self._stats,
+                "files": len(files),
+                "bytes": sum(size for _, size, _ in files),
+            }
+
+
+# ---------------------------------------------------------------------------
+# RENDER SERVICE
+# ---------------------------------------------------------------------------
+
+class ReportHandle:
+    """A submitted report job. result() blocks until the PDF is ready."""
+
+    def __init__(self, key, future, cached=False):
+        self.key = key
+        self.cached = cached
+        self._future = future
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Return the PDF bytes, re-raising any rendering error."""
+        return self._future.result(timeout)
+
+
+class RenderService:
+    """
+    Process pool that renders reports off the Streamlit script thread.
+
+    submit() returns immediately. A cached report comes back as an
+    already finished handle; an identical job that is still rendering
+    returns the same handle instead of being queued twice.
+    """
+
+    def __init__(self, workers=WORKERS, cache=None):
+        self.workers = workers
+        self.cache = cache if cache is not None else ReportCache()
+        self._executor = None
+        self._pending = {}  # key -> ReportHandle
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def submit(self, kind, **params):
+        """Queue a report for rendering and return its ReportHandle."""
+        if kind not in RENDERERS:
+            raise ValueError(f"Unknown report kind: {kind}")
+        key = report_key(kind, params)
+
+        with self._lock:
+            handle = self._pending.get(key)
+            if handle is not None:
+                return handle
+
+        data = self.cache.get(key)
+        if data is not None:
+            future = Future()
+            future.set_result(data)
+            return ReportHandle(key, future, cached=True)
+
+        with self._lock:
+            handle = self._pending.get(key)
+            if handle is not None:
+                return handle
+            # With spawn, submit() starts any missing workers in this thread
+            with _bare_main():
+                try:
+                    future = self._get_executor().submit(_render, kind, params)
+                except BrokenProcessPool:
+                    # A worker died; start a fresh pool for this and later jobs
+                    self._executor = None
+                    future = self._get_executor().submit(_render, kind, params)
+            handle = ReportHandle(key, future)
+            self._pending[key] = handle
+
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return handle
+
+    def _finish(self, key, future):
+        try:
+            if not future.cancelled():
+                if future.exception() is None:
+                    self.cache.put(key, future.result())
+                elif isinstance(future.exception(), BrokenProcessPool):
+                    # Let the next submit start a fresh pool
+                    with self._lock:
+                        self._executor = None
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """Return the process-wide render service, creating it on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RenderService(WORKERS, ReportCache(CACHE_DIR, CACHE_MAX_BYTES))
+        return _service
+
+
+def configure(workers=None, cache_dir=None, max_bytes=None):
+    """Change pool size or cache location; the next job starts a new service."""
+    global _service, WORKERS, CACHE_DIR, CACHE_MAX_BYTES
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown(wait=False)
+            _service = None
+        if workers is not None:
+            WORKERS = workers
+        if cache_dir is not None:
+            CACHE_DIR = cache_dir
+        if max_bytes is not None:
+            CACHE_MAX_BYTES = max_bytes
+
+
+def render_inspection_pdf(**params):
+    """
+    Submit an inspection report (generate_inspection_pdf arguments).
+    report_date defaults to today and is part of the cache key.
+    """
+    params.setdefault("report_date", date.today().isoformat())
+    return get_service().submit("inspection", **params)
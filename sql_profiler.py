@@ -0,0 +1,272 @@
+"""
+TTS Guard — SQL Profiler
+Opt-in statement profiling for pooled connections. Each statement's
+normalized text, calling database.py function, duration, rows and query
+plan are kept in an in-memory ring buffer for the diagnostics view.
+
+Off by default; set TTS_SQL_PROFILE=1 or call enable() at runtime.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+
+BUFFER_SIZE = 5000
+# Plans are looked up once per distinct statement; this caps how many are kept
+MAX_PLANS = 1000
+
+_enabled = os.environ.get("TTS_SQL_PROFILE", "") not in ("", "0")
+_records = deque(maxlen=BUFFER_SIZE)
+_plans = {}  # normalized SQL -> (plan lines, fully scanned tables)
+_lock = threading.Lock()
+
+# Frames from these modules are never reported as the caller
+_SKIP_MODULES = ("sql_profiler", "query_cache", "contextlib", "pandas", "sqlalchemy")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE_RE = re.compile(r"\s+")
+# "SCAN t" with no index: every row of t is read
+_FULL_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+# Subquery results scanned as a whole, which are not tables
+_SUBQUERY_RE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)$")
+
+
+def enable():
+    """Start recording statements on every pooled connection."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    """Drop recorded statements and cached plans."""
+    with _lock:
+        _records.clear()
+        _plans.clear()
+
+
+def configure(buffer_size):
+    """Resize the ring buffer, keeping the most recent records."""
+    global _records, BUFFER_SIZE
+    with _lock:
+        BUFFER_SIZE = buffer_size
+        _records = deque(_records, maxlen=buffer_size)
+
+
+def records():
+    """Return the recorded statements, oldest first, as a list of dicts."""
+    with _lock:
+        return list(_records)
+
+
+def plan(sql):
+    """Return (plan lines, fully scanned tables) for a normalized statement, or None."""
+    with _lock:
+        return _plans.get(sql)
+
+
+def plans():
+    """Return {normalized SQL: (plan lines, fully scanned tables)}."""
+    with _lock:
+        return dict(_plans)
+
+
+def normalize(sql):
+    """Statement text with literals replaced by ? and whitespace collapsed."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _LIST_RE.sub("?, ...", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _caller():
+    """The database.py function issuing the statement, else the nearest app frame."""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        name = frame.f_code.co_qualname
+        if module == "database" and not name.rpartition(".")[2].startswith("_"):
+            return f"database.{name}"
+        if fallback is None and not module.startswith(_SKIP_MODULES):
+            fallback = f"{os.path.basename(frame.f_code.co_filename)}:{name}"
+        frame = frame.f_back
+    return fallback or "?"
+
+
+def _explain(conn, sql, parameters):
+    # A plain cursor, so the EXPLAIN itself is not recorded
+    rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    depth, lines, scans, subqueries = {0: -1}, [], [], set()
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+        subquery = _SUBQUERY_RE.match(detail)
+        if subquery:
+            subqueries.add(subquery.group(1))
+        scan = _FULL_SCAN_RE.match(detail)
+        if scan and scan.group(1) not in subqueries:
+            scans.append(scan.group(1))
+    return lines, scans
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """
+    Cursor that times execute and fetch calls and counts rows. A record is
+    written when the result is exhausted, the cursor is closed or reused,
+    or it is garbage collected.
+    """
+
+    _record = None
+    _elapsed = 0.0
+
+    def _begin(self, sql, parameters):
+        normalized = normalize(sql)
+        if (normalized not in _plans and len(_plans) < MAX_PLANS
+                and normalized.upper().startswith(("SELECT", "WITH"))):
+            try:
+                explained = _explain(self.connection, sql, parameters)
+            except sqlite3.Error:
+                explained = None
+            if explained is not None:
+                with _lock:
+                    _plans[normalized] = explained
+        self._record = {
+            "time": time.time(),
+            "sql": normalized,
+            "function": _caller(),
+            "thread": threading.current_thread().name,
+            "rows": 0,
+            "error": None,
+        }
+        self._elapsed = 0.0
+
+    def _finish(self):
+        record, self._record = self._record, None
+        if record is None:
+            return
+        record["ms"] = self._elapsed * 1000
+        with _lock:
+            _records.append(record)
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        except StopIteration:
+            raise
+        except Exception as e:
+            self._record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def _executed(self, method, sql, *args):
+        self._finish()
+        if not _enabled:
+            return method(self, sql, *args)
+        self._begin(sql, args[0] if args and method is sqlite3.Cursor.execute else ())
+        try:
+            self._timed(method, self, sql, *args)
+        except Exception:
+            self._finish()
+            raise
+        if self.description is None:
+            # Not a query: nothing to fetch, rowcount is the rows affected
+            self._record["rows"] = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def execute(self, sql, parameters=(), /):
+        return self._executed(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self._executed(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script, /):
+        return self._executed(sqlite3.Cursor.executescript, sql_script)
+
+    def fetchone(self):
+        if self._record is None:
+            return super().fetchone()
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        else:
+            self._record["rows"] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        if self._record is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        self._record["rows"] += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        if self._record is None:
+            return super().fetchall()
+        rows = self._timed(super().fetchall)
+        self._record["rows"] += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        if self._record is None:
+            return super().__next__()
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        self._record["rows"] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        if self._record is not None:
+            self._finish()
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """
+    sqlite3 connection whose cursors record statements while profiling is
+    enabled. While it is off, cursors are plain sqlite3 cursors.
+    """
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or (ProfilingCursor if _enabled else sqlite3.Cursor))
+
+    def execute(self, sql, parameters=(), /):
+        if not _enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        if not _enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script, /):
+        if not _enabled:
+            return super().executescript(sql_script)
+        return self.cursor().executescript(sql_script)
@@ -0,0 +1,153 @@
+"""
+TTS Guard — Status Engine
+Inspection status of every building held as compact NumPy arrays (one
+element per building) and classified against any day in a few vectorized
+operations, plus a forecast of how many buildings fall overdue on each of
+the coming days. Same rules as the status queries in database.py.
+
+Scope: the engine backs the Clients page status labels and the Dashboard
+overdue forecast. The overdue and upcoming lists (Overdue page, Dashboard
+snapshot) are still selected in SQL on building_status.next_due_day, so
+they stay inside the snapshot's single read transaction.
+"""
+
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Day numbers count days since 1970-01-01, as datetime64[D] does and as
+# the *_day columns in the database store them
+EPOCH = date(1970, 1, 1)
+# Day number standing in for "never inspected"
+NEVER = np.iinfo(np.int32).min
+# What the status queries report for a building never inspected
+NEVER_DAYS_SINCE = 999
+NEVER_DAYS_UNTIL = -999
+
+OK, DUE_SOON, OVERDUE = range(3)
+NO_CONTRACT = -1
+STATUS_NAMES = ("ok", "due_soon", "overdue")
+
+# One building per element; days_until_next is NaN without a contract,
+# overdue_days is NaN when never inspected (as in compliance snapshots)
+Statuses = namedtuple("Statuses", "status days_since_last days_until_next overdue_days")
+
+
+def day_number(day):
+    """Day number of a date."""
+    return (day - EPOCH).days
+
+
+class StatusEngine:
+    """
+    Read-only status arrays for a set of buildings. A building is overdue
+    once the day is past its next due day (last inspection plus the whole
+    days of 365 / visits_per_year, or always if never inspected), and due
+    soon while the exact fractional interval runs out within upcoming_days.
+    Buildings without an active contract (visits_per_year missing) have
+    no status. Instances are never modified, so they are shared as is.
+    """
+
+    def __init__(self, building_id, client_id, last_day, visits_per_year, is_scheduled):
+        self.building_id = np.asarray(building_id, dtype=np.int64)
+        self.client_id = np.asarray(client_id, dtype=np.int64)
+        self.last_day = np.asarray(last_day, dtype=np.int32)
+        self.is_scheduled = np.asarray(is_scheduled, dtype=bool)
+        visits = np.asarray(visits_per_year, dtype=np.float64)
+        self.has_contract = ~np.isnan(visits)
+        self.inspected = self.last_day != NEVER
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.interval = 365.0 / visits
+        # Last day still inside the interval; NEVER keeps the uninspected overdue
+        self.next_due_day = np.where(
+            self.inspected & self.has_contract,
+            self.last_day.astype(np.int64) + np.floor(np.nan_to_num(self.interval)).astype(np.int64),
+            NEVER,
+        )
+        for array in vars(self).values():
+            array.flags.writeable = False
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build from a frame with building_id, client_id, last_inspection_day
+        (None if never inspected), visits_per_year (None without a contract)
+        and is_scheduled, as read from building_status.
+        """
+        return cls(
+            df["building_id"].to_numpy(),
+            df["client_id"].to_numpy(),
+            pd.to_numeric(df["last_inspection_day"]).fillna(NEVER).to_numpy(dtype=np.int64),
+            pd.to_numeric(df["visits_per_year"]).to_numpy(dtype=np.float64, na_value=np.nan),
+            df["is_scheduled"].to_numpy(),
+        )
+
+    def __len__(self):
+        return len(self.building_id)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(array.nbytes for array in vars(self).values())
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def statuses(self, day, upcoming_days=14):
+        """Classify every building against day; return Statuses of arrays."""
+        today = day_number(day)
+        days_since = np.where(self.inspected, today - self.last_day.astype(np.int64),
+                              NEVER_DAYS_SINCE)
+        remaining = self.interval - days_since
+        overdue = self.has_contract & (self.next_due_day < today)
+        due_soon = self.has_contract & ~overdue & (remaining <= upcoming_days)
+        status = np.select([~self.has_contract, overdue, due_soon],
+                           [NO_CONTRACT, OVERDUE, DUE_SOON], default=OK).astype(np.int8)
+        days_until = np.where(self.inspected, np.trunc(remaining), NEVER_DAYS_UNTIL)
+        days_until[~self.has_contract] = np.nan
+        overdue_days = np.where(
+            overdue, np.maximum(days_since - np.floor(np.nan_to_num(self.interval)), 0), 0,
+        ).astype(np.float64)
+        overdue_days[~self.inspected] = np.nan
+        return Statuses(status, days_since, days_until, overdue_days)
+
+    def classify(self, day, upcoming_days=14):
+        """
+        Return one row per building, indexed by building_id: client_id,
+        status (categorical "ok", "due_soon", "overdue", or NaN without a
+        contract), is_scheduled, days_since_last, days_until_next and
+        overdue_days.
+        """
+        result = self.statuses(day, upcoming_days)
+        return pd.DataFrame({
+            "client_id": self.client_id,
+            "status": pd.Categorical.from_codes(result.status, STATUS_NAMES),
+            "is_scheduled": self.is_scheduled,
+            "days_since_last": result.days_since_last,
+            "days_until_next": result.days_until_next,
+            "overdue_days": result.overdue_days,
+        }, index=pd.Index(self.building_id, name="building_id"))
+
+    def overdue_forecast(self, day, days=90, include_scheduled=False):
+        """
+        Return one row per day from day on: newly_overdue, the buildings
+        whose first overdue day it is, and overdue, all overdue buildings
+        that day, assuming no further inspections. Buildings with a visit
+        booked are left out unless include_scheduled is set. days must be
+        at least 1.
+        """
+        if days < 1:
+            raise ValueError(f"days must be at least 1, got {days}")
+        today = day_number(day)
+        counted = self.has_contract if include_scheduled else self.has_contract & ~self.is_scheduled
+        # Offset from day of each building's first overdue day
+        offsets = self.next_due_day[counted] + 1 - today
+        already = int(np.count_nonzero(offsets <= 0))
+        newly = np.bincount(offsets[(offsets > 0) & (offsets < days)], minlength=days)
+        newly[0] = int(np.count_nonzero(offsets == 0))
+        overdue = already + np.cumsum(newly[1:], dtype=np.int64)
+        return pd.DataFrame({
+            "date": pd.date_range(day, periods=days, freq="D"),
+            "newly_overdue": newly,
+            "overdue": np.concatenate(([already], overdue)),
+        })
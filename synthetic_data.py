@@ -0,0 +1,300 @@
+"""
+TTS Guard — Synthetic Load Data
+Deterministic generator for load testing: any number of clients, buildings,
+equipment and years of history, bulk-loaded in one transaction.
+"""
+
+import itertools
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import database
+from database import TECHNICIANS
+
+CHUNK_SIZE = 10000
+
+# name -> (clients, buildings per client, equipment per building, years of history)
+SCALES = {
+    "small": (20, 10, 20, 1),      # 200 buildings, ~4k equipment
+    "medium": (100, 20, 40, 2),    # 2,000 buildings, ~80k equipment
+    "large": (200, 50, 100, 5),    # 10,000 buildings, ~1M equipment
+}
+
+# Share of buildings in each inspection state on the load date
+STATUS_MIX = {"on_track": 0.68, "due_soon": 0.12, "overdue": 0.15, "never_inspected": 0.05}
+# Share of overdue buildings that already have a visit booked
+SCHEDULED_SHARE = 0.3
+
+VISITS_PER_YEAR = {4: 0.65, 2: 0.15, 6: 0.08, 12: 0.12}
+PAYMENT_TERMS = {"quarterly": (4, 0.45), "semi_annual": (2, 0.35), "annual": (1, 0.20)}
+PAYMENT_METHODS = ["bank_transfer", "cheque", "bank_transfer", "online"]
+
+# Every building has one alarm panel; the rest follows these weights
+EQUIPMENT_MIX = {
+    "Smoke Detector": 0.25,
+    "Fire Extinguisher DCP": 0.15,
+    "Fire Extinguisher CO2": 0.08,
+    "Sprinkler System": 0.05,
+    "Emergency Light": 0.18,
+    "Hose Reel": 0.08,
+    "Exit Sign": 0.15,
+    "FM200 System": 0.06,
+}
+
+AREAS = [
+    "Al Maryah Island", "Al Wahda", "Khalifa City", "Musaffah", "ICAD", "Al Reem Island",
+    "Al Reef", "Hamdan Street", "Corniche Road", "Tourist Club", "Yas Island",
+]
+BUILDING_KINDS = ["Tower", "Villa Cluster", "Branch", "Warehouse", "Residential Block", "Mall"]
+
+NOTES = [
+    "All systems functioning normally.",
+    "Minor issues noted, follow-up recommended.",
+    "Fire extinguishers serviced. New tags attached.",
+    "Emergency lights tested. Two units need bulb replacement.",
+    "Full system check completed. No issues found.",
+]
+COMPLAINT_MESSAGES = [
+    "Fire alarm panel showing a fault code.",
+    "Emergency lights not functioning during monthly test.",
+    "Sprinkler pressure gauge reading below normal.",
+    "Fire extinguisher missing from its bracket.",
+    "Exit sign not illuminated.",
+]
+
+
+def _weighted(rng, mix):
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+def _insert(conn, sql, rows, chunk_size):
+    """executemany in fixed-size chunks from any iterable; returns rows inserted."""
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return total
+        conn.executemany(sql, chunk)
+        total += len(chunk)
+
+
+def _plan_buildings(rng, clients, buildings_per_client, equipment_per_building, today, history_start):
+    """Draw per-building contract, status and equipment count."""
+    plans = []
+    for client_id in range(1, clients + 1):
+        for _ in range(buildings_per_client):
+            visits = _weighted(rng, VISITS_PER_YEAR)
+            interval = 365 / visits
+            status = _weighted(rng, STATUS_MIX)
+            if status == "on_track":
+                last = today - timedelta(days=rng.uniform(0, interval - 15))
+            elif status == "due_soon":
+                last = today - timedelta(days=interval - rng.uniform(1, 14))
+            elif status == "overdue":
+                last = today - timedelta(days=interval + rng.uniform(1, 90))
+            else:
+                last = None
+            if last is None:
+                # A new contract with no visit yet
+                start = today - timedelta(days=rng.randint(10, 60))
+            else:
+                start = history_start - timedelta(days=rng.randint(0, 180))
+            low = max(1, equipment_per_building // 2)
+            equipment = rng.randint(low, equipment_per_building * 2 - low)
+            plans.append({
+                "id": len(plans) + 1,
+                "client_id": client_id,
+                "visits": visits,
+                "last": last,
+                "scheduled": status == "overdue" and rng.random() < SCHEDULED_SHARE,
+                "start": start,
+                "terms": _weighted(rng, {k: v[1] for k, v in PAYMENT_TERMS.items()}),
+                "equipment": equipment,
+                "value": (15 + equipment // 2 + rng.randint(0, 10)) * 1000,
+            })
+    return plans
+
+
+def generate(clients=20, buildings_per_client=10, equipment_per_building=20, years=1,
+             seed=42, today=None, item_months=0, chunk_size=CHUNK_SIZE):
+    """
+    Replace the database contents with generated data and return row counts.
+
+    The same arguments (seed and today included; today defaults to the
+    current date) always produce the same rows. item_months adds per-item
+    results for inspections in the last N months; older inspections carry
+    counts only, like those recorded before per-item results existed.
+    """
+    start_time = time.perf_counter()
+    today = today or date.today()
+    history_start = today - timedelta(days=round(365.25 * years))
+    rng = random.Random(seed)
+    plans = _plan_buildings(rng, clients, buildings_per_client, equipment_per_building,
+                            today, history_start)
+    item_cutoff = today - timedelta(days=round(30.44 * item_months))
+    counts = {}
+
+    database.reset_db()
+    with database.bulk_load() as conn:
+        counts["clients"] = _insert(conn, """
+            INSERT INTO clients (id, name, short_name, contact_person, phone, email)
+            VALUES (?,?,?,?,?,?)
+        """, (
+            (c, f"Client {c:05d} LLC", f"C{c:05d}", f"Facilities Manager {c}",
+             f"+971 2 {600 + c % 400:03d} {c % 10000:04d}", f"fm@client{c:05d}.ae")
+            for c in range(1, clients + 1)
+        ), chunk_size)
+
+        counts["buildings"] = _insert(conn, """
+            INSERT INTO buildings (id, client_id, name, area) VALUES (?,?,?,?)
+        """, (
+            (p["id"], p["client_id"], f"{rng.choice(BUILDING_KINDS)} {p['id']:05d}", rng.choice(AREAS))
+            for p in plans
+        ), chunk_size)
+
+        # One-year contracts renewed back to back; the one covering today is active
+        contracts = []
+        for p in plans:
+            term_start = p["start"]
+            while term_start <= today:
+                term_end = term_start + timedelta(days=364)
+                contracts.append((
+                    len(contracts) + 1, p["id"], term_start, term_end, p["visits"], p["value"],
+                    p["terms"], "active" if term_end >= today else "expired",
+                ))
+                term_start = term_end + timedelta(days=1)
+        counts["contracts"] = _insert(conn, """
+            INSERT INTO contracts (id, building_id, start_date, end_date, visits_per_year,
+                                   annual_value, payment_terms, status)
+            VALUES (?,?,?,?,?,?,?,?)
+        """, (
+            (c[0], c[1], c[2].isoformat(), c[3].isoformat(), *c[4:]) for c in contracts
+        ), chunk_size)
+
+        # Equipment ids are consecutive per building, which item rows rely on
+        equipment_types = list(EQUIPMENT_MIX)
+        equipment_weights = list(EQUIPMENT_MIX.values())
+        first_equipment, next_id = {}, 1
+        building_types = {}
+        for p in plans:
+            first_equipment[p["id"]] = next_id
+            building_types[p["id"]] = ["Fire Alarm Panel"] + rng.choices(
+                equipment_types, weights=equipment_weights, k=p["equipment"] - 1)
+            next_id += p["equipment"]
+        counts["equipment"] = _insert(conn, """
+            INSERT INTO equipment (id, building_id, type, status) VALUES (?,?,?,'OK')
+        """, (
+            (first_equipment[p["id"]] + n, p["id"], eq_type)
+            for p in plans for n, eq_type in enumerate(building_types[p["id"]])
+        ), chunk_size)
+
+        # Inspections step back from the last visit at the contract interval
+        inspections, items = [], []
+        for p in plans:
+            if p["last"] is None:
+                continue
+            interval = 365 / p["visits"]
+            visit = p["last"]
+            while visit >= max(history_start, p["start"]):
+                failed = int(p["equipment"] * rng.uniform(0, 0.10))
+                inspection_id = len(inspections) + 1
+                inspections.append((
+                    inspection_id, p["id"], visit.isoformat(), rng.choice(TECHNICIANS),
+                    p["equipment"], p["equipment"] - failed, failed, rng.choice(NOTES),
+                    f"{visit.isoformat()} 17:00:00",
+                ))
+                if visit >= item_cutoff:
+                    failed_items = set(rng.sample(range(p["equipment"]), failed))
+                    types = building_types[p["id"]]
+                    items.extend(
+                        (inspection_id, first_equipment[p["id"]] + n, p["id"], types[n],
+                         int(n not in failed_items))
+                        for n in range(p["equipment"])
+                    )
+                visit -= timedelta(days=interval + rng.uniform(-7, 7))
+        counts["inspections"] = _insert(conn, """
+            INSERT INTO inspections (id, building_id, inspection_date, technician,
+                                     items_checked, items_passed, items_failed, notes, created_at)
+            VALUES (?,?,?,?,?,?,?,?,?)
+        """, inspections, chunk_size)
+        counts["inspection_items"] = _insert(conn, """
+            INSERT INTO inspection_items (inspection_id, equipment_id, building_id,
+                                          equipment_type, passed)
+            VALUES (?,?,?,?,?)
+        """, items, chunk_size)
+        del inspections, items
+
+        counts["scheduled_inspections"] = _insert(conn, """
+            INSERT INTO scheduled_inspections (building_id, scheduled_date, assigned_technician,
+                                               status, created_at)
+            VALUES (?,?,?,'scheduled',?)
+        """, (
+            (p["id"], (today + timedelta(days=rng.randint(1, 14))).isoformat(),
+             rng.choice(TECHNICIANS),
+             f"{(today - timedelta(days=rng.randint(0, 5))).isoformat()} 09:00:00")
+            for p in plans if p["scheduled"]
+        ), chunk_size)
+
+        # Installments through each contract year; recent ones are still open
+        client_of = {p["id"]: p["client_id"] for p in plans}
+
+        def payments():
+            for contract_id, building_id, term_start, term_end, _, value, terms, _ in contracts:
+                installments = PAYMENT_TERMS[terms][0]
+                step = 365 / installments
+                due = term_start
+                while due <= min(today, term_end):
+                    if (today - due).days > 60:
+                        status = _weighted(rng, {"received": 0.96, "partial": 0.02, "overdue": 0.02})
+                    else:
+                        status = _weighted(rng, {"received": 0.6, "pending": 0.3, "overdue": 0.1})
+                    amount = value / installments
+                    if status == "partial":
+                        amount = round(amount * rng.uniform(0.6, 0.8), 2)
+                    yield (contract_id, due.isoformat(), amount, rng.choice(PAYMENT_METHODS),
+                           f"C{client_of[building_id]:05d}-TRF-{due.year}-{due.month:02d}", status,
+                           f"{due.isoformat()} 10:00:00")
+                    due += timedelta(days=step)
+        counts["payments"] = _insert(conn, """
+            INSERT INTO payments (contract_id, payment_date, amount, method,
+                                  reference_number, status, created_at)
+            VALUES (?,?,?,?,?,?,?)
+        """, payments(), chunk_size)
+
+        # About one complaint per building-year, numbered per year in date order
+        complaints = []
+        for p in plans:
+            opened = max(p["start"], history_start)
+            span = (today - opened).days
+            for _ in range(round(rng.expovariate(1.0) * span / 365)):
+                created = datetime.combine(opened, datetime.min.time()) + timedelta(
+                    seconds=rng.randint(0, span * 86400))
+                age = (today - created.date()).days
+                if age > 30:
+                    status = _weighted(rng, {"resolved": 0.9, "in_progress": 0.05, "open": 0.05})
+                else:
+                    status = _weighted(rng, {"open": 0.5, "in_progress": 0.3, "resolved": 0.2})
+                complaints.append((
+                    created.strftime("%Y-%m-%d %H:%M:%S"), p["client_id"], p["id"],
+                    rng.choice(COMPLAINT_MESSAGES),
+                    _weighted(rng, {"high": 0.2, "medium": 0.5, "low": 0.3}), status,
+                    None if status == "open" else rng.choice(TECHNICIANS),
+                ))
+        complaints.sort()
+        sequence = {}
+
+        def numbered():
+            for created, *rest in complaints:
+                year = int(created[:4])
+                sequence[year] = sequence.get(year, 0) + 1
+                yield (f"TTS-{year}-{sequence[year]:04d}", *rest, created)
+        counts["complaints"] = _insert(conn, """
+            INSERT INTO complaints (ticket_number, client_id, building_id, message,
+                                    priority, status, assigned_technician, created_at)
+            VALUES (?,?,?,?,?,?,?,?)
+        """, numbered(), chunk_size)
+
+    counts["seconds"] = time.perf_counter() - start_time
+    return counts
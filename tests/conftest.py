@@ -0,0 +1,34 @@
+"""
+TTS Guard — Test Fixtures
+Each test gets its own seeded database and report cache in a temporary
+directory, so nothing touches tts_guard.db or .report_cache.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import report_service  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Point the database layer at a fresh seeded file for one test."""
+    original = database.DB_PATH
+    database.configure(path=str(tmp_path / "tts_guard.db"))
+    database.bootstrap()
+    yield database
+    database.configure(path=original)
+
+
+@pytest.fixture
+def report_cache(tmp_path):
+    """Point the render service at an empty cache directory for one test."""
+    original = report_service.CACHE_DIR
+    report_service.configure(cache_dir=str(tmp_path / "report_cache"))
+    yield report_service.get_service().cache
+    report_service.configure(cache_dir=original)
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _open(view):
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.query_params["view"] = view
+    return at.run()
+
+
+def _is_diagnostics(at):
+    return any("Diagnostics" in md.value for md in at.markdown)
+
+
+def test_diagnostics_view_is_off_by_default(db, monkeypatch):
+    monkeypatch.delenv("TTS_DIAGNOSTICS", raising=False)
+    at = _open("diagnostics")
+    assert not at.exception
+    assert not _is_diagnostics(at)
+    assert not [t for t in at.toggle if t.key == "sql_profiling"]
+
+
+@pytest.mark.parametrize("flag", ["1", "yes"])
+def test_diagnostics_view_opens_with_the_flag(db, monkeypatch, flag):
+    monkeypatch.setenv("TTS_DIAGNOSTICS", flag)
+    at = _open("diagnostics")
+    assert not at.exception
+    assert _is_diagnostics(at)
@@ -0,0 +1,33 @@
+from datetime import date
+
+
+def test_snapshot_counts_only_inspections_up_to_as_of(db):
+    building = int(db.get_all_buildings()["id"].iloc[0])
+    for day in ("2030-05-05", "2030-05-10", "2030-05-20"):
+        db.insert_inspection(building, day, "Tech One", 1, 1, 0, "")
+
+    assert db.get_dashboard_snapshot(date(2030, 5, 10)).completed_this_month == 2
+    assert db.get_dashboard_snapshot(date(2030, 5, 31)).completed_this_month == 3
+
+
+def test_client_annual_value_counts_every_active_contract(db):
+    with db.transaction() as conn:
+        client_id, = conn.execute("""
+            SELECT b.client_id FROM contracts c JOIN buildings b ON b.id = c.building_id
+            WHERE c.status = 'active' GROUP BY b.client_id HAVING COUNT(*) > 1 LIMIT 1
+        """).fetchone()
+        conn.execute("""
+            UPDATE contracts SET annual_value = 50000
+            WHERE status = 'active'
+            AND building_id IN (SELECT id FROM buildings WHERE client_id = ?)
+        """, (client_id,))
+        expected, = conn.execute("""
+            SELECT SUM(c.annual_value) FROM contracts c JOIN buildings b ON b.id = c.building_id
+            WHERE c.status = 'active' AND b.client_id = ?
+        """, (client_id,)).fetchone()
+
+    name = db.get_client_by_id(client_id)["name"]
+    breakdown = db.get_client_financial_breakdown().set_index("Client")
+    for summary in (db.get_client_summary(), db.get_dashboard_snapshot().client_summary):
+        value = summary.set_index("client_id").loc[client_id, "Annual Value (AED)"]
+        assert value == expected == breakdown.loc[name, "Contract Value (AED)"]
@@ -0,0 +1,39 @@
+import pytest
+
+
+def _two_buildings(db):
+    with db.connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT DISTINCT building_id FROM equipment ORDER BY building_id LIMIT 2"
+        )]
+
+
+def test_items_are_stored_with_the_inspection(db):
+    building, _ = _two_buildings(db)
+    equipment = db.get_equipment_for_buildings([building])
+    items = [(int(eid), i % 2 == 0) for i, eid in enumerate(equipment["id"])]
+
+    inspection_id = db.insert_inspection(building, "2025-03-04", "Tech One",
+                                         len(items), 0, 0, "", items=items)
+
+    stored = db.get_inspection_items(inspection_id)
+    assert len(stored) == len(items)
+
+
+def test_item_from_another_building_is_rejected(db):
+    building, other = _two_buildings(db)
+    own = int(db.get_equipment_for_buildings([building])["id"].iloc[0])
+    foreign = int(db.get_equipment_for_buildings([other])["id"].iloc[0])
+    with db.connection() as conn:
+        before = conn.execute("SELECT COUNT(*) FROM inspections").fetchone()[0]
+
+    with pytest.raises(ValueError):
+        db.insert_inspection(building, "2025-03-04", "Tech One", 2, 2, 0, "",
+                             items=[(own, True), (foreign, True)])
+
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM inspections").fetchone()[0] == before
+        assert conn.execute(
+            "SELECT COUNT(*) FROM inspection_items WHERE equipment_id = ? AND building_id = ?",
+            (foreign, building),
+        ).fetchone()[0] == 0
@@ -0,0 +1,34 @@
+import manage
+
+TINY = ["--clients", "1", "--buildings-per-client", "1", "--equipment-per-building", "1",
+        "--years", "1"]
+
+
+def _clients(db):
+    with db.connection() as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM clients ORDER BY id")]
+
+
+def test_generate_data_refuses_the_app_database(db, monkeypatch, capsys):
+    monkeypatch.setattr(manage, "APP_DB_PATH", db.DB_PATH)
+    before = _clients(db)
+
+    assert manage.main(["generate-data", *TINY]) == 2
+    assert "--db FILE" in capsys.readouterr().err
+    assert _clients(db) == before
+
+
+def test_generate_data_replaces_the_app_database_with_yes(db, monkeypatch):
+    monkeypatch.setattr(manage, "APP_DB_PATH", db.DB_PATH)
+    before = _clients(db)
+
+    assert manage.main(["generate-data", *TINY, "--yes"]) == 0
+    assert len(_clients(db)) == 1 and _clients(db) != before
+
+
+def test_generate_data_runs_against_another_database(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(manage, "APP_DB_PATH", db.DB_PATH)
+    target = str(tmp_path / "load.db")
+
+    assert manage.main(["--db", target, "generate-data", *TINY]) == 0
+    assert len(_clients(db)) == 1
@@ -0,0 +1,85 @@
+import io
+import os
+import re
+import zipfile
+import zlib
+from datetime import date
+
+import database
+import monthly_reports
+from monthly_reports import generate_monthly_reports
+
+
+def _latest_month():
+    """Year and month of the most recent seeded inspection."""
+    with database.connection() as conn:
+        latest = date.fromisoformat(conn.execute("SELECT MAX(inspection_date) FROM inspections").fetchone()[0])
+    return latest.year, latest.month
+
+
+def _pdf_text(data):
+    """Page content streams of a PDF, inflated, as text."""
+    text = []
+    for stream in re.findall(rb"stream\r?\n(.*?)\r?\nendstream", data, re.S):
+        try:
+            text.append(zlib.decompress(stream))
+        except zlib.error:
+            text.append(stream)
+    return b"\n".join(text).decode("latin-1")
+
+
+def _pack(report_date=None):
+    output = io.BytesIO()
+    result = generate_monthly_reports(*_latest_month(), output, workers=1, report_date=report_date)
+    assert result["failures"] == []
+    with zipfile.ZipFile(output) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_regenerated_pack_carries_the_new_report_date(db, report_cache):
+    first = _pack("2030-01-15")
+    second = _pack("2030-02-15")
+
+    assert first and first.keys() == second.keys()
+    for name in first:
+        assert "2030-01-15" in _pdf_text(first[name])
+        assert "2030-02-15" in _pdf_text(second[name])
+        assert "2030-01-15" not in _pdf_text(second[name])
+
+
+def test_pack_is_dated_today_by_default(db, report_cache):
+    pack = _pack()
+    assert pack
+    for data in pack.values():
+        assert date.today().isoformat() in _pdf_text(data)
+
+
+def test_rebuilding_a_pack_replaces_its_file(db, report_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(monthly_reports, "PACK_DIR", str(tmp_path / "packs"))
+    first, _ = monthly_reports.write_pack(*_latest_month(), workers=1)
+    second, result = monthly_reports.write_pack(*_latest_month(), workers=1)
+
+    assert first == second
+    assert os.listdir(tmp_path / "packs") == [os.path.basename(first)]
+    with zipfile.ZipFile(second) as zf:
+        assert len(zf.namelist()) == result["written"] > 0
+
+
+def test_failures_name_the_archive_entry(db, report_cache):
+    year, month = _latest_month()
+    inspections = db.get_inspections_by_month(year, month)
+    building = int(inspections["building_id"].iloc[0])
+    with db.transaction() as conn:
+        # Helvetica cannot draw this, so every report for the building fails
+        conn.execute("UPDATE buildings SET name = name || ' ✓' WHERE id = ?", (building,))
+
+    output = io.BytesIO()
+    result = generate_monthly_reports(year, month, output, workers=1)
+
+    failed = [name for name, _ in result["failures"]]
+    assert len(failed) == (inspections["building_id"] == building).sum()
+    with zipfile.ZipFile(output) as zf:
+        written = set(zf.namelist())
+    for name in failed:
+        assert name.endswith(".pdf") and name not in written
+        assert f"{name}: " in zipfile.ZipFile(output).read("FAILURES.txt").decode()
@@ -0,0 +1,78 @@
+import re
+import zlib
+
+import fpdf
+import pytest
+
+import pdf_report
+from pdf_report import InspectionReport, generate_inspection_pdf
+
+# fpdf2 internals that header/footer replay, the cached logo and
+# add_table_rows rely on; none of them is public API
+PRIVATE_FPDF_API = [
+    "_out", "_resource_catalog", "_set_font_for_page", "current_font_is_set_on_page",
+    "image_cache", "pages", "k", "c_margin", "normalize_text",
+]
+
+REPORT = dict(
+    building_name="Tower A", client_name="Khidmah LLC", inspection_date="2025-03-04",
+    technician="Tech One", items_checked=120, items_passed=117, items_failed=3,
+    equipment_details=[
+        {"type": f"Extinguisher {i}", "status": "Failed" if i % 40 == 0 else "Passed"}
+        for i in range(120)
+    ],
+    notes="Zone 3 sensor cleaned.", report_date="2025-03-05",
+)
+
+
+class PublicReport(InspectionReport):
+    """The same report drawn through cell()/image() only, for comparison."""
+
+    def header(self):
+        self._draw_header()
+
+    def footer(self):
+        self._draw_footer()
+        self.set_font("Helvetica", "", 7)
+        self.cell(0, 4, f"Page {self.page_no()}/{{nb}}", align="C")
+
+    def add_table_rows(self, rows, widths):
+        for idx, values in enumerate(rows):
+            self.add_table_row(values, widths, fill=idx % 2 == 0)
+
+
+def _pages(data):
+    """Shown text strings of each page, in drawing order."""
+    streams = []
+    for stream in re.findall(rb"stream\r?\n(.*?)\r?\nendstream", data, re.S):
+        try:
+            streams.append(zlib.decompress(stream).decode("latin-1"))
+        except zlib.error:
+            continue
+    return [re.findall(r"\((.*?)\) Tj", s) for s in streams if " Tj" in s]
+
+
+def test_private_fpdf_api_is_present():
+    pdf = InspectionReport("", "")
+    missing = [name for name in PRIVATE_FPDF_API if not hasattr(pdf, name)]
+    assert not missing, f"fpdf2 {fpdf.__version__} lacks {missing}; check requirements.txt pin"
+    assert isinstance(pdf.image_cache.images, dict)
+    if pdf.has_logo:
+        assert {"i", "usages"} <= set(pdf.image_cache.images[pdf_report.LOGO_PATH])
+
+
+def test_replayed_report_matches_public_rendering(monkeypatch):
+    fast = generate_inspection_pdf(**REPORT)
+    monkeypatch.setattr(pdf_report, "InspectionReport", PublicReport)
+    reference = generate_inspection_pdf(**REPORT)
+
+    fast_pages, reference_pages = _pages(fast), _pages(reference)
+    assert len(fast_pages) > 1
+    assert fast_pages == reference_pages
+    assert fast.count(b"/Subtype /Image") == reference.count(b"/Subtype /Image")
+
+
+@pytest.mark.parametrize("name", ["header", "footer"])
+def test_template_uses_only_report_fonts(name):
+    template = pdf_report._capture_template(name)
+    assert template["fonts"] <= set(range(1, len(pdf_report.REPORT_FONTS) + 1))
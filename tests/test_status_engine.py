@@ -0,0 +1,49 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from status_engine import NEVER, OVERDUE, StatusEngine, day_number
+
+TODAY = date(2026, 3, 1)
+
+
+def _engine():
+    # Overdue by 10 days, never inspected, fine, no contract
+    last = [day_number(TODAY) - 101, NEVER, day_number(TODAY) - 5, day_number(TODAY) - 500]
+    return StatusEngine([1, 2, 3, 4], [1, 1, 1, 1], last, [4, 4, 4, np.nan],
+                        [False, False, False, False])
+
+
+def test_overdue_days_follow_the_visit_interval():
+    result = _engine().statuses(TODAY)
+    assert list(result.status[:2]) == [OVERDUE, OVERDUE]
+    assert result.overdue_days[0] == 101 - 91
+    # Never inspected: no day count, as compliance snapshots store NULL
+    assert np.isnan(result.overdue_days[1])
+    assert result.overdue_days[2] == 0
+
+
+@pytest.mark.parametrize("days", [0, -1])
+def test_forecast_needs_at_least_one_day(days):
+    with pytest.raises(ValueError):
+        _engine().overdue_forecast(TODAY, days)
+
+
+def test_forecast_of_one_day():
+    forecast = _engine().overdue_forecast(TODAY, 1)
+    assert list(forecast["overdue"]) == [2]
+
+
+def test_engine_agrees_with_sql_lists(db):
+    today = date.today()
+    classified = db.get_status_engine().classify(today)
+    overdue = db.get_overdue_inspections(include_scheduled=True)
+    upcoming = db.get_upcoming_inspections(14)
+
+    assert set(classified.index[classified["status"] == "overdue"]) == set(overdue["building_id"])
+    due_soon = classified[(classified["status"] == "due_soon") & ~classified["is_scheduled"]]
+    assert set(due_soon.index) == set(upcoming["building_id"])
+    inspected = overdue[overdue["last_inspection_date"].notna()]
+    gauge = (inspected["days_since_last"] - (365 // inspected["visits_per_year"])).clip(lower=0)
+    assert list(classified.loc[inspected["building_id"], "overdue_days"]) == list(gauge)
@@ -1,10 +1,37 @@
 """
 TTS Guard — Shared Theme Module
-Provides theme-aware color tokens, CSS injection, and Plotly layout helpers.
+Provides theme-aware color tokens, CSS injection, Plotly layout helpers,
+and the logo.
+
+The CSS for each theme and the logo are written to static/ once per
+process and served by Streamlit (server.enableStaticServing), so a rerun
+only sends a <link> tag. Fonts are bundled in static/fonts.
 """
 
+import base64
+import hashlib
+import os
+import sys
+import tempfile
+from functools import lru_cache
+
 import streamlit as st
 
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOGO_PATH = os.path.join(ROOT, "assets", "logo.png")
+STATIC_DIR = os.path.join(ROOT, "static")
+# Where Streamlit serves STATIC_DIR, relative to the page URL
+STATIC_URL = "app/static"
+
+# (family, weight, file in static/fonts)
+FONT_FACES = (
+    ("Roboto", 400, "roboto-400.woff2"),
+    ("Roboto", 500, "roboto-500.woff2"),
+    ("Roboto", 700, "roboto-700.woff2"),
+    ("Open Sans", 400, "open-sans-400.woff2"),
+    ("Open Sans", 600, "open-sans-600.woff2"),
+)
+
 
 def is_dark_mode():
     """Check current theme from session state. Defaults to True (dark)."""
@@ -13,9 +40,10 @@ def is_dark_mode():
     return st.session_state.dark_mode
 
 
-def get_colors():
-    """Return a dict of all color tokens based on current theme."""
-    dark = is_dark_mode()
+def get_colors(dark=None):
+    """Return a dict of all color tokens for a theme, by default the current one."""
+    if dark is None:
+        dark = is_dark_mode()
     if dark:
         return {
             "BG": "#0e1117", "BG2": "#1a1f2e", "SIDEBAR_BG": "#131720",
@@ -53,12 +81,27 @@ def get_colors():
 
 
 def inject_css():
-    """Inject the full TTS Guard CSS. Call at the top of every page."""
-    c = get_colors()
-    st.markdown(f"""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&family=Open+Sans:wght@400;600&display=swap');
+    """Link the TTS Guard CSS for the current theme. Call at the top of every page."""
+    urls = static_urls()
+    if urls is None:
+        st.markdown(f"<style>{theme_css(get_colors())}</style>", unsafe_allow_html=True)
+        return
+    href = urls["dark" if is_dark_mode() else "light"]
+    st.markdown(f'<link rel="stylesheet" href="{href}">', unsafe_allow_html=True)
+
 
+def _font_faces_css(font_url):
+    return "".join(
+        f"@font-face {{ font-family: '{family}'; font-style: normal; font-weight: {weight}; "
+        f"font-display: swap; src: url('{font_url}/{filename}') format('woff2'); }}\n"
+        for family, weight, filename in FONT_FACES
+    )
+
+
+def theme_css(c, font_url=None):
+    """The TTS Guard stylesheet for color tokens c, with @font-face rules if font_url is given."""
+    fonts = _font_faces_css(font_url) if font_url else ""
+    return fonts + f"""
     html, body, [class*="css"] {{
         font-family: 'Open Sans', sans-serif;
         color: {c['TEXT']};
@@ -194,8 +237,7 @@ def inject_css():
     .stAlert [data-testid="stNotificationContentError"] {{
         border-left-color: {c['STATUS_RED']} !important;
     }}
-</style>
-""", unsafe_allow_html=True)
+"""
 
 
 def plotly_layout(height=350, **kwargs):
@@ -214,3 +256,85 @@ def plotly_layout(height=350, **kwargs):
     }
     defaults.update(kwargs)
     return defaults
+
+
+@lru_cache(maxsize=1)
+def logo_base64():
+    """Base64 of the logo PNG, read once per process; None if the file is missing."""
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with open(LOGO_PATH, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+
+def logo_src():
+    """URL for an <img> of the logo: static if served, else a data URI; None without a logo."""
+    urls = static_urls()
+    if urls is not None:
+        return urls["logo"]
+    logo_b64 = logo_base64()
+    return None if logo_b64 is None else f"data:image/png;base64,{logo_b64}"
+
+
+# ---------------------------------------------------------------------------
+# STATIC ASSETS
+# ---------------------------------------------------------------------------
+
+def _write_if_changed(path, data):
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)  # served to anyone; mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _versioned(path, data):
+    # A content hash in the URL: browsers refetch only after the file changes
+    return f"{STATIC_URL}/{path}?v={hashlib.sha256(data).hexdigest()[:12]}"
+
+
+def build_static_assets():
+    """
+    Write the stylesheet of each theme and a copy of the logo into static/.
+    Return {"dark": URL, "light": URL, "logo": URL or None}.
+    """
+    urls = {}
+    for name, dark in (("dark", True), ("light", False)):
+        # Relative to the stylesheet, so it also works under a baseUrlPath
+        css = theme_css(get_colors(dark), font_url="../fonts").encode("utf-8")
+        _write_if_changed(os.path.join(STATIC_DIR, "css", f"theme-{name}.css"), css)
+        urls[name] = _versioned(f"css/theme-{name}.css", css)
+    urls["logo"] = None
+    if os.path.exists(LOGO_PATH):
+        with open(LOGO_PATH, "rb") as f:
+            logo = f.read()
+        _write_if_changed(os.path.join(STATIC_DIR, "logo.png"), logo)
+        urls["logo"] = _versioned("logo.png", logo)
+    return urls
+
+
+@lru_cache(maxsize=1)
+def static_urls():
+    """
+    build_static_assets(), once per process. None if static serving is off
+    or static/ is not writable; pages then inline the CSS and logo.
+    """
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    try:
+        return build_static_assets()
+    except OSError as e:
+        print(f"TTS Guard: static assets not written, inlining CSS instead: {e}", file=sys.stderr)
+        return None